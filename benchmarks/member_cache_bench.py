@@ -0,0 +1,136 @@
+# benchmarks/member_cache_bench.py
+# -*- coding: utf-8 -*-
+"""
+Member-Cache auf einer synthetischen großen Guild: ``full`` gegen ``bounded``.
+
+Gemessen wird die Client-Seite des Starts – GUILD_CREATE und die Member-Chunks
+so verarbeiten, wie discord.py es beim Chunking tut (ohne Netzwerk) – sowie
+in einem zweiten Lauf den Speicher, den die gecachten Member + Presences danach
+belegen (tracemalloc).
+
+- full:    alle Member in Chunks à 1000 mit Presence (chunk_guilds_at_startup)
+- bounded: nur der Staff per query_members (ein Chunk), danach ``--interactions``
+           Interaktionen zufälliger Nutzer durch den LRU (``recent_size``)
+
+Die Gateway-Wartezeit kommt beim echten Start noch hinzu. Bei ``full`` sind das
+``members / 1000`` Chunks, bei ``bounded`` ein Request pro 100 Staff-Member.
+
+    python -m benchmarks.member_cache_bench --members 50000 --staff 40
+"""
+
+import argparse
+import asyncio
+import gc
+import random
+import time
+import tracemalloc
+
+import discord
+from discord.state import ChunkRequest
+
+from utils.member_cache import MemberCache
+
+GUILD_ID = 1_000_000
+BOT_ID = 999
+CHUNK_SIZE = 1000
+
+
+def _user(uid):
+    return {"id": str(uid), "username": f"user{uid}", "discriminator": "0", "global_name": f"User {uid}",
+            "avatar": None}
+
+
+def _member(uid):
+    return {"user": _user(uid), "roles": [], "joined_at": "2024-01-01T00:00:00+00:00", "deaf": False,
+            "mute": False, "nick": None, "flags": 0}
+
+
+def _presence(uid, rng):
+    return {"user": {"id": str(uid)}, "guild_id": str(GUILD_ID),
+            "status": rng.choice(["online", "idle", "dnd", "offline"]),
+            "activities": [], "client_status": {"desktop": "online"}}
+
+
+def _guild_payload(member_count):
+    return {"id": str(GUILD_ID), "name": "Bench", "owner_id": str(BOT_ID), "member_count": member_count,
+            "roles": [{"id": str(GUILD_ID), "name": "@everyone", "permissions": "0", "position": 0,
+                       "color": 0, "hoist": False, "managed": False, "mentionable": False}],
+            "channels": [], "emojis": [], "stickers": [], "features": [], "voice_states": [],
+            "members": [_member(BOT_ID)], "presences": [], "threads": [], "stage_instances": [],
+            "guild_scheduled_events": []}
+
+
+def _client(policy):
+    intents = discord.Intents.default()
+    intents.members = True
+    intents.presences = True
+    client = discord.Client(intents=intents, **policy.client_options())
+    state = client._connection
+    state.user = discord.ClientUser(state=state, data={**_user(BOT_ID), "bot": True})
+    return client, state
+
+
+def _feed_chunks(state, guild, ids, rng, loop):
+    """Chunks so einspielen, wie sie bei chunk()/query_members ankommen."""
+    request = ChunkRequest(guild.id, 0, loop, state._get_guild, cache=True)
+    state._chunk_requests[request.nonce] = request
+    batches = [ids[i:i + CHUNK_SIZE] for i in range(0, len(ids), CHUNK_SIZE)]
+    for index, batch in enumerate(batches):
+        state.parse_guild_members_chunk({
+            "guild_id": str(GUILD_ID), "members": [_member(uid) for uid in batch],
+            "presences": [_presence(uid, rng) for uid in batch],
+            "chunk_index": index, "chunk_count": len(batches), "nonce": request.nonce,
+        })
+    return len(batches)
+
+
+def run(mode, members, staff, recent_size, interactions, trace=False, seed=1):
+    rng = random.Random(seed)
+    policy = MemberCache()
+    policy.configure({"member_cache": {"mode": mode, "recent_size": recent_size}})
+    loop = asyncio.new_event_loop()
+    client, state = _client(policy)
+    all_ids = list(range(10_000, 10_000 + members))
+    staff_ids = all_ids[:staff]
+
+    gc.collect()
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    guild = discord.Guild(data=_guild_payload(members), state=state)
+    state._add_guild(guild)
+    if mode == "full":
+        chunks = _feed_chunks(state, guild, all_ids, rng, loop)
+    else:
+        chunks = _feed_chunks(state, guild, staff_ids, rng, loop)
+        policy._pinned[guild.id] = set(staff_ids)
+        for uid in rng.choices(all_ids, k=interactions):
+            policy.remember(discord.Member(data=_member(uid), guild=guild, state=state))
+    elapsed = time.perf_counter() - start
+    memory = 0
+    if trace:
+        gc.collect()
+        memory = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+    cached = len(guild.members)
+    loop.close()
+    return {"seconds": elapsed, "bytes": memory, "cached": cached, "chunks": chunks}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Member-Cache: full vs. bounded")
+    parser.add_argument("--members", type=int, default=50_000)
+    parser.add_argument("--staff", type=int, default=40)
+    parser.add_argument("--recent-size", type=int, default=1000)
+    parser.add_argument("--interactions", type=int, default=5000)
+    args = parser.parse_args()
+
+    print(f"Synthetische Guild: {args.members} Member, {args.staff} Staff, "
+          f"LRU {args.recent_size}, {args.interactions} Interaktionen\n")
+    print(f"{'Modus':<9} {'gecacht':>8} {'Chunks':>7} {'Verarbeitung':>13} {'Speicher':>10}")
+    for mode in ("full", "bounded"):
+        # Zeit und Speicher getrennt messen – tracemalloc bremst die Verarbeitung stark
+        timed = run(mode, args.members, args.staff, args.recent_size, args.interactions)
+        traced = run(mode, args.members, args.staff, args.recent_size, args.interactions, trace=True)
+        print(f"{mode:<9} {timed['cached']:>8} {timed['chunks']:>7} {timed['seconds'] * 1000:>10.0f} ms "
+              f"{traced['bytes'] / 2**20:>7.1f} MiB")
@@ -0,0 +1,131 @@
+# benchmarks/message_dispatch_bench.py
+# -*- coding: utf-8 -*-
+"""
+Kosten pro eingehender Nachricht: Prefix-Bot (bisher) gegen Slash-only-Bot.
+
+Beide Bots verarbeiten dieselben synthetischen MESSAGE_CREATE-Events so, wie
+discord.py sie vom Gateway bekommt (``parse_message_create`` → Message-Objekt
+→ ``dispatch("message")``), ohne Netzwerk. Gemessen wird bis alle dadurch
+gestarteten Handler fertig sind.
+
+- prefix: ``command_prefix="!"``, Standard-``on_message`` → ``process_commands``
+          (get_prefix + get_context für jede Nachricht), ein paar Prefix-Commands
+- slash:  wie bot.py jetzt – ``on_message`` als No-op, Befehle im CommandTree
+
+In beiden hängt ein Cog-Listener wie in cogs/ticket_timers.py an ``on_message``.
+``--command-ratio`` ist der Anteil der Nachrichten, die mit ``!`` beginnen.
+
+    python -m benchmarks.message_dispatch_bench --messages 20000
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+import discord
+from discord import app_commands
+from discord.ext import commands
+
+GUILD_ID = 1_000_000
+CHANNEL_ID = 2_000_000
+BOT_ID = 999
+
+
+def _user(uid):
+    return {"id": str(uid), "username": f"user{uid}", "discriminator": "0", "global_name": None, "avatar": None}
+
+
+def _guild_payload():
+    return {"id": str(GUILD_ID), "name": "Bench", "owner_id": str(BOT_ID), "member_count": 1,
+            "roles": [{"id": str(GUILD_ID), "name": "@everyone", "permissions": "0", "position": 0,
+                       "color": 0, "hoist": False, "managed": False, "mentionable": False}],
+            "channels": [{"id": str(CHANNEL_ID), "type": 0, "name": "ticket-1", "position": 0,
+                          "permission_overwrites": []}],
+            "emojis": [], "stickers": [], "features": [], "voice_states": [], "members": [],
+            "presences": [], "threads": [], "stage_instances": [], "guild_scheduled_events": []}
+
+
+def _message(index, rng, command_ratio):
+    uid = 10_000 + rng.randrange(500)
+    content = "!kategorie" if rng.random() < command_ratio else f"Nachricht {index} im Ticket"
+    return {"id": str(5_000_000 + index), "channel_id": str(CHANNEL_ID), "guild_id": str(GUILD_ID),
+            "author": _user(uid), "member": {"roles": [], "joined_at": None, "deaf": False, "mute": False,
+                                             "flags": 0},
+            "content": content, "timestamp": "2024-01-01T00:00:00+00:00", "edited_timestamp": None,
+            "tts": False, "mention_everyone": False, "mentions": [], "mention_roles": [],
+            "attachments": [], "embeds": [], "pinned": False, "type": 0}
+
+
+class _Activity(commands.Cog):
+    def __init__(self):
+        self.seen = 0
+
+    @commands.Cog.listener()
+    async def on_message(self, message):
+        self.seen += 1
+
+
+def _bot(mode):
+    intents = discord.Intents.default()
+    intents.members = True
+    intents.message_content = mode == "prefix"
+    if mode == "prefix":
+        bot = commands.Bot(command_prefix="!", intents=intents)
+        for name in ("kategorie", "perf", "reload", "ticket_backfill"):
+            async def callback(ctx):
+                pass
+            bot.add_command(commands.Command(callback, name=name))
+    else:
+        bot = commands.Bot(command_prefix=commands.when_mentioned, help_command=None, intents=intents)
+
+        async def on_message(message):
+            pass
+        bot.on_message = on_message
+
+        for name in ("kategorie", "perf", "reload", "ticket_backfill"):
+            async def callback(interaction: discord.Interaction):
+                pass
+            bot.tree.add_command(app_commands.Command(name=name, description=name, callback=callback))
+    return bot
+
+
+async def run(mode, messages, command_ratio, seed=1):
+    rng = random.Random(seed)
+    bot = _bot(mode)
+    async with bot:  # setzt bot.loop, ohne einzuloggen
+        activity = _Activity()
+        await bot.add_cog(activity)
+        state = bot._connection
+        state.user = discord.ClientUser(state=state, data={**_user(BOT_ID), "bot": True})
+        state._add_guild(discord.Guild(data=_guild_payload(), state=state))
+        payloads = [_message(i, rng, command_ratio) for i in range(messages)]
+
+        me = asyncio.current_task()
+        start = time.perf_counter()
+        for data in payloads:
+            state.parse_message_create(data)
+        # Handler laufen als Tasks – warten, bis alle durch sind
+        pending = [t for t in asyncio.all_tasks() if t is not me]
+        await asyncio.gather(*pending)
+        elapsed = time.perf_counter() - start
+        assert activity.seen == messages
+    return elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Nachrichtenverarbeitung: Prefix- vs. Slash-Bot")
+    parser.add_argument("--messages", type=int, default=20_000)
+    parser.add_argument("--command-ratio", type=float, default=0.02)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{args.messages} Nachrichten, {args.command_ratio:.0%} davon mit Prefix, "
+          f"bestes von {args.rounds} Läufen\n")
+    print(f"{'Modus':<7} {'gesamt':>9} {'pro Nachricht':>14}")
+    results = {}
+    for mode in ("prefix", "slash"):
+        best = min(asyncio.run(run(mode, args.messages, args.command_ratio)) for _ in range(args.rounds))
+        results[mode] = best
+        print(f"{mode:<7} {best * 1000:>6.0f} ms {best / args.messages * 1e6:>10.1f} µs")
+    print(f"\nslash spart {(1 - results['slash'] / results['prefix']) * 100:.0f} % pro Nachricht")
@@ -0,0 +1,123 @@
+# benchmarks/single_process_bench.py
+# -*- coding: utf-8 -*-
+"""
+Vergleich Zwei-Prozess-Betrieb (bot.py + main.py) gegen run_all.py.
+
+1. Speicher: RSS nach dem Import von Web (main) und Bot (discord + Cogs) – einzeln
+   in zwei Prozessen bzw. zusammen in einem.
+2. Latenz Web → Bot für eine neue Abwesenheit: ``ipc.publish`` wartet auf die
+   Bestätigung nach dem Dispatch, misst also bis zum Listener im Bot.
+   - zwei Prozesse: Socket zu einem IPCServer in einem Kindprozess
+   - ein Prozess: ``ipc.set_local_handler``
+   Zum Vergleich: das frühere 30-s-Polling lag im Mittel bei ~15 s.
+
+    python -m benchmarks.single_process_bench --messages 2000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from utils import ipc
+
+BOT_MODULES = [
+    "cogs.role_cacher", "cogs.ticket_button_category_flow", "cogs.ticket_category_button",
+    "cogs.absence_poster", "cogs.perf_monitor", "cogs.ticket_timers", "cogs.ticket_assignment",
+    "cogs.transcript_archiver", "cogs.event_log_maintenance",
+]
+
+_RSS_SNIPPET = """
+import importlib, json, sys
+for name in sys.argv[1:]:
+    importlib.import_module(name)
+try:
+    import psutil
+    rss = psutil.Process().memory_info().rss
+except ImportError:
+    import resource
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # Linux: KiB
+print(json.dumps(rss))
+"""
+
+_SERVER_SNIPPET = """
+import asyncio, sys
+from utils import ipc
+
+async def main():
+    server = ipc.IPCServer(lambda topic, payload: None)
+    await server.start()
+    print("ready", flush=True)
+    await asyncio.get_running_loop().run_in_executor(None, sys.stdin.read)
+    await server.stop()
+
+asyncio.run(main())
+"""
+
+
+def rss_after_import(modules):
+    out = subprocess.run([sys.executable, "-c", _RSS_SNIPPET, *modules],
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def _summary(samples):
+    samples = sorted(samples)
+    return (f"p50 {statistics.median(samples) * 1e6:7.0f} µs   "
+            f"p95 {samples[int(len(samples) * 0.95)] * 1e6:7.0f} µs")
+
+
+async def _publish_many(n):
+    samples = []
+    for i in range(n):
+        start = time.perf_counter()
+        assert await ipc.publish(ipc.ABSENCES_CHANGED, {"added": i})
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def latency_two_process(n):
+    env = dict(os.environ)
+    address = env.get("BOT_IPC_ADDRESS") or (
+        "127.0.0.1:8799" if os.name == "nt" else "unix:" + os.path.join(tempfile.mkdtemp(), "bench.sock"))
+    env["BOT_IPC_ADDRESS"] = os.environ["BOT_IPC_ADDRESS"] = address
+    proc = subprocess.Popen([sys.executable, "-c", _SERVER_SNIPPET], env=env,
+                            stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+    try:
+        proc.stdout.readline()  # "ready"
+        return asyncio.run(_publish_many(n))
+    finally:
+        proc.stdin.close()
+        proc.wait(10)
+
+
+def latency_one_process(n):
+    received = []
+    ipc.set_local_handler(lambda topic, payload: received.append(payload))
+    try:
+        return asyncio.run(_publish_many(n))
+    finally:
+        ipc.set_local_handler(None)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ein- vs. Zwei-Prozess-Betrieb")
+    parser.add_argument("--messages", type=int, default=2000)
+    args = parser.parse_args()
+
+    web = rss_after_import(["main"])
+    bot = rss_after_import(BOT_MODULES)
+    both = rss_after_import(["main", *BOT_MODULES])
+    print("Speicher (RSS nach Import)")
+    print(f"  zwei Prozesse: {(web + bot) / 2**20:6.1f} MiB  (Web {web / 2**20:.1f} + Bot {bot / 2**20:.1f})")
+    print(f"  ein Prozess:   {both / 2**20:6.1f} MiB")
+
+    print(f"\nLatenz Web → Bot-Listener ({args.messages} Nachrichten)")
+    print(f"  zwei Prozesse (Socket): {_summary(latency_two_process(args.messages))}")
+    print(f"  ein Prozess (direkt):   {_summary(latency_one_process(args.messages))}")
+    print("  früher (30-s-Polling):  Mittel ~15 s")
@@ -0,0 +1,87 @@
+# benchmarks/ticket_assignment_sim.py
+# -*- coding: utf-8 -*-
+"""
+Simulation der automatischen Ticket-Zuweisung (utils/ticket_assignment.py).
+
+Misst Durchsatz von pick() und die Fairness der Verteilung bei zufälligen
+Online-Wechseln und Ticket-Abschlüssen.
+
+    python -m benchmarks.ticket_assignment_sim --supporters 40 --tickets 200000
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+from utils.ticket_assignment import AssignmentScheduler
+
+
+def jain_index(values):
+    """1.0 = perfekt gleich verteilt, 1/n = alles bei einer Person."""
+    total = sum(values)
+    squares = sum(v * v for v in values)
+    return (total * total) / (len(values) * squares) if squares else 1.0
+
+
+def simulate(supporters: int, tickets: int, cap: int, online_ratio: float, close_prob: float, seed: int):
+    rng = random.Random(seed)
+    sched = AssignmentScheduler(cap=cap)
+    ids = list(range(1, supporters + 1))
+    sched.set_supporters(ids, {"Technik": ids[: supporters // 4]})
+    for uid in ids:
+        sched.set_online(uid, rng.random() < online_ratio)
+
+    open_tickets = []
+    handled = {uid: 0 for uid in ids}
+    unassigned = 0
+    pick_time = 0.0
+
+    for n in range(tickets):
+        # Gelegentliche Statuswechsel
+        if n % 50 == 0:
+            uid = rng.choice(ids)
+            sched.set_online(uid, rng.random() < online_ratio)
+
+        category = "Technik" if rng.random() < 0.2 else "Support"
+        start = time.perf_counter()
+        uid = sched.pick(category)
+        pick_time += time.perf_counter() - start
+        if uid is None:
+            unassigned += 1
+        else:
+            handled[uid] += 1
+            open_tickets.append(uid)
+
+        # Tickets werden zufällig abgeschlossen
+        while open_tickets and rng.random() < close_prob:
+            sched.released(open_tickets.pop(rng.randrange(len(open_tickets))))
+
+    counts = [c for c in handled.values() if c]
+    return {
+        "picks_per_second": tickets / pick_time if pick_time else float("inf"),
+        "mean_pick_us": pick_time / tickets * 1e6,
+        "unassigned": unassigned,
+        "jain_handled": jain_index(counts),
+        "stdev_handled": statistics.pstdev(counts) if counts else 0.0,
+        "max_open_load": max(sched.load.values() or [0]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--supporters", type=int, default=40)
+    parser.add_argument("--tickets", type=int, default=100_000)
+    parser.add_argument("--cap", type=int, default=5)
+    parser.add_argument("--online", type=float, default=0.6)
+    parser.add_argument("--close-prob", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    result = simulate(args.supporters, args.tickets, args.cap, args.online, args.close_prob, args.seed)
+    for key, value in result.items():
+        print(f"{key:>18}: {value:,.3f}" if isinstance(value, float) else f"{key:>18}: {value}")
+
+
+if __name__ == "__main__":
+    main()
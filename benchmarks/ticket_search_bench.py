@@ -0,0 +1,81 @@
+# benchmarks/ticket_search_bench.py
+# -*- coding: utf-8 -*-
+"""
+Latenz der Ticket-Volltextsuche (utils/ticket_search.py) über ein synthetisches
+Archiv. Legt den Index in einem Temp-Verzeichnis an – echte Daten bleiben unberührt.
+
+    python -m benchmarks.ticket_search_bench --messages 300000
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from utils import ticket_search
+
+TOPICS = ("bitte hilfe server login passwort cheater report ban spiel fehler absturz "
+          "rechnung zahlung account gesperrt discord rolle clan turnier bug lag update").split()
+
+
+def vocabulary(size: int, seed: int):
+    """Themenwörter + synthetisches Vokabular mit Zipf-Verteilung (wie echter Chat-Text)."""
+    rng = random.Random(seed)
+    words = TOPICS + ["".join(rng.choices("abcdefghijklmnopqrstuvwxyz", k=rng.randint(3, 9)))
+                      for _ in range(size - len(TOPICS))]
+    rng.shuffle(words)
+    return words, [1 / (rank + 1) for rank in range(len(words))]
+
+
+def build(messages: int, per_ticket: int, seed: int, vocab_size: int = 20_000) -> float:
+    """Erzeugt die Nachrichten vorab und misst nur das Indexieren (seitenweise wie im Bot)."""
+    rng = random.Random(seed)
+    words, weights = vocabulary(vocab_size, seed)
+    lengths = [rng.randint(4, 20) for _ in range(messages)]
+    stream = iter(rng.choices(words, weights, k=sum(lengths)))
+    records = [
+        {"id": n + 1, "author": f"user{rng.randrange(500)}", "created_at": "2025-01-01T00:00:00",
+         "content": " ".join(next(stream) for _ in range(length))}
+        for n, length in enumerate(lengths)
+    ]
+
+    conn = ticket_search._connect()
+    start = time.perf_counter()
+    for offset in range(0, messages, per_ticket):
+        ticket_id = offset // per_ticket
+        ticket_search.index_messages(ticket_id, 1000 + ticket_id, records[offset:offset + per_ticket], conn)
+        conn.commit()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=200_000)
+    parser.add_argument("--per-ticket", type=int, default=40)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        ticket_search.SEARCH_DB = os.path.join(tmp, "search.db")
+        seconds = build(args.messages, args.per_ticket, args.seed)
+        print(f"Index: {args.messages:,} Nachrichten in {seconds:.1f} s "
+              f"({args.messages / seconds:,.0f}/s), {os.path.getsize(ticket_search.SEARCH_DB) / 1e6:.1f} MB")
+
+        rng = random.Random(args.seed + 1)
+        timings = []
+        for _ in range(args.queries):
+            query = " ".join(rng.sample(TOPICS, rng.randint(1, 3)))
+            page = rng.randint(1, 5)
+            start = time.perf_counter()
+            ticket_search.search(query, page=page)
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        print(f"Suche: p50 {statistics.median(timings):.1f} ms · "
+              f"p95 {timings[int(len(timings) * 0.95) - 1]:.1f} ms · max {timings[-1]:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,11 @@ import logging
 import os
 import asyncio
 
+from utils.bot_telemetry import install_http_instrumentation
+from utils.loop_watchdog import maybe_start_watchdog
+from utils import async_storage, ticket_search, ticket_index, ticket_analytics, ipc, startup_profile, command_sync
+from utils.member_cache import member_cache
+
 # Logging konfigurieren
 logging.basicConfig(level=logging.INFO)
 log = logging.getLogger(__name__)
@@ -33,27 +38,60 @@ if not token:
 intents = discord.Intents.default()
 intents.members = True
 intents.guilds = True
-intents.message_content = True
+# Nur noch für Transkripte (Nachrichteninhalt aus der Kanal-History) nötig, nicht
+# mehr für Befehle – ohne Transkripte per config.json → "message_content_intent": false
+intents.message_content = bool(config.get("message_content_intent", True))
 intents.presences = True
 
 # ==== BOT INITIALISIEREN ====
-bot = commands.Bot(command_prefix="!", intents=intents)
-
-# ==== Ticket-Button-View importieren ====
-try:
-    from cogs.ticket_button_category_flow import TicketButtonView
-except ImportError as e:
-    log.error(f"❌ Konnte TicketButtonView nicht importieren – bitte cogs/ticket_button_category_flow.py prüfen. Fehler: {e}")
-    TicketButtonView = None
+# Chunking/Member-Cache je nach config.json → "member_cache" (utils/member_cache.py)
+member_cache.configure(config)
+# Viele Guilds: config.json → "auto_shard": true (optional "shard_count") startet
+# AutoShardedBot – ein Prozess, mehrere Gateway-Verbindungen. Einstellungen, Tickets,
+# Zähler und Rollen-Cache sind pro Guild getrennt (utils/guild_config.py).
+bot_class, shard_options = commands.Bot, {}
+if config.get("auto_shard"):
+    bot_class = commands.AutoShardedBot
+    if config.get("shard_count"):
+        shard_options["shard_count"] = int(config["shard_count"])  # sonst empfiehlt Discord die Anzahl
+# Alle Befehle sind Slash-Commands; ein Prefix gibt es nicht mehr (siehe on_message)
+bot = bot_class(command_prefix=commands.when_mentioned, help_command=None, intents=intents,
+                **shard_options, **member_cache.client_options())
+force_sync = False
+
+# Ausgehende Discord-API-Calls + Rate-Limits messen
+install_http_instrumentation(bot)
+
+# Volltextindex mit Events + Transkripten mitführen (tickets/search.db),
+# Abfrage-Index für /admin/tickets mit jedem Ticket-Schreibvorgang (tickets/index.db)
+ticket_search.install()
+ticket_index.install()
+# Kennzahlen (Time-to-Claim/-Close, Volumen) laufend aus den Events (logs/ticket_analytics.json)
+ticket_analytics.install()
 
 
 @bot.event
 async def on_ready():
-    log.info(f"✅ Bot ist online als {bot.user} ({bot.user.id})")
-    if TicketButtonView:
-        # Persistent View registrieren (wichtig für Buttons nach Restart)
-        bot.add_view(TicketButtonView())
-        log.info("✅ Ticket-Button-Views registriert")
+    log.info(f"✅ Bot ist online als {bot.user} ({bot.user.id}) – {len(bot.guilds)} Guilds, "
+             f"{bot.shard_count or 1} Shard(s)")
+    # Persistente Views registrieren die Cogs selbst in setup() – so auch nach einem Hot-Reload
+
+
+@bot.event
+async def setup_hook():
+    # Läuft nach dem Login (application_id bekannt) und vor dem Gateway-Connect.
+    # Sync nur, wenn sich der Command-Baum seit dem letzten Start geändert hat.
+    try:
+        await command_sync.sync_if_changed(bot, force=force_sync)
+    except discord.HTTPException as e:
+        log.error(f"❌ Slash-Commands konnten nicht synchronisiert werden: {e}")
+
+
+@bot.event
+async def on_message(message):
+    # Ersetzt Bot.on_message → kein Prefix-Parsing (get_context) pro Nachricht mehr.
+    # Cog-Listener (z.B. ticket_timers) bekommen die Nachrichten weiterhin.
+    pass
 
 
 async def load_cogs():
@@ -63,22 +101,75 @@ async def load_cogs():
         "cogs.ticket_button_category_flow",
         "cogs.ticket_category_button",
         "cogs.absence_poster",  # ⬅️ NEU: Abwesenheiten automatisch posten
+        "cogs.perf_monitor",    # Telemetrie + /perf
+        "cogs.ticket_timers",   # Erinnerungen + Auto-Close
+        "cogs.ticket_assignment",  # optionale Auto-Zuweisung
+        "cogs.transcript_archiver",  # Transkripte beim Schließen sichern
+        "cogs.event_log_maintenance",  # Event-Partitionen migrieren/kompaktieren
+        "cogs.cog_reloader",    # Cogs nach Self-Update neu laden
+        "cogs.member_cache_manager",  # Chunking/Staff-Cache für große Server
     ]
-    for cog in cogs:
+
+    async def load(cog):
         try:
-            await bot.load_extension(cog)
+            with startup_profile.phase(cog):
+                await bot.load_extension(cog)
             log.info(f"✅ Cog geladen: {cog}")
         except Exception as e:
             log.error(f"❌ Fehler beim Laden von {cog}: {e}")
 
+    # Gleichzeitig: wartet ein setup()/cog_load() auf I/O, laden die anderen weiter.
+    # Cogs dürfen sich deshalb nicht auf die Reihenfolge in dieser Liste verlassen.
+    await asyncio.gather(*(load(cog) for cog in cogs))
+
 
 async def main():
+    async with bot:
+        # Optional: Loop-Lag überwachen (config.json → "loop_watchdog")
+        maybe_start_watchdog("bot", config.get("loop_watchdog"))
+        await load_cogs()
+        # Änderungen aus dem Webpanel kommen als on_ipc_<topic>-Events (utils/ipc.py)
+        # Zugestellt wird erst nach dem Login – vorher sind bot.guilds/get_channel() leer
+        ipc_server = ipc.IPCServer(lambda topic, payload: bot.dispatch(f"ipc_{topic}", payload), ready=False)
+        await ipc_server.start()
+
+        async def open_ipc():
+            await bot.wait_until_ready()
+            await ipc_server.open()
+        ipc_task = asyncio.create_task(open_ipc())
+        try:
+            await bot.start(token)
+        finally:
+            ipc_task.cancel()
+            await ipc_server.stop()
+            # Offene Hintergrund-Schreibvorgänge (Logs, Tickets) nicht verlieren
+            await async_storage.drain()
+            ticket_analytics.flush()  # gedrosselt gespeicherte Kennzahlen sichern
+
+
+async def profile_startup():
+    """Cogs laden wie beim Start, aber ohne Login – für ``--profile-startup``."""
     async with bot:
         await load_cogs()
-        await bot.start(token)
+        for cog in list(bot.extensions):
+            await bot.unload_extension(cog)
 
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Discord-Bot")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Import- und Cog-Ladezeiten ausgeben und beenden (ohne Login)")
+    parser.add_argument("--force-sync", action="store_true",
+                        help="Slash-Commands beim Start auch ohne Änderung synchronisieren")
+    args = parser.parse_args()
+    force_sync = args.force_sync
+    if args.profile_startup:
+        asyncio.run(profile_startup())
+        startup_profile.print_report("bot")
+        raise SystemExit(0)
+
     log.info("=== STARTE bot.py ===")
     log.info("✅ config.json geladen")
     log.info("→ Starte bot …")
@@ -1,6 +1,8 @@
 # cogs/absence_poster.py
 # -*- coding: utf-8 -*-
 
+import asyncio
+
 import discord
 from discord.ext import commands, tasks
 import json
@@ -8,6 +10,7 @@ from typing import Optional, List
 from datetime import datetime
 
 from utils.absence_storage import list_absences, mark_posted
+from utils.bot_telemetry import track_task
 
 SETTINGS_FILE = "settings.json"
 
@@ -29,13 +32,31 @@ class AbsencePoster(commands.Cog):
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        # IPC-Event und 5-Minuten-Schleife dürfen nicht gleichzeitig posten,
+        # sonst sehen beide dieselben Einträge als "posted == False"
+        self._post_lock = asyncio.Lock()
         self.check_new_absences.start()
 
     def cog_unload(self):
         self.check_new_absences.cancel()
 
-    @tasks.loop(seconds=30)
+    @commands.Cog.listener()
+    async def on_ipc_absences_changed(self, payload: dict):
+        if payload.get("added"):
+            await self.post_pending()
+
+    # Neue Einträge kommen sofort per IPC (on_ipc_absences_changed);
+    # die Schleife fängt nur ab, was ohne Webpanel in absences.json gelandet ist.
+    @tasks.loop(minutes=5)
+    @track_task("check_new_absences")
     async def check_new_absences(self):
+        await self.post_pending()
+
+    async def post_pending(self):
+        async with self._post_lock:
+            await self._post_pending()
+
+    async def _post_pending(self):
         settings = load_settings()
         channel_id = int(settings.get("absence_channel_id") or 0)
         if not channel_id:
@@ -0,0 +1,301 @@
+# cogs/cog_reloader.py
+# -*- coding: utf-8 -*-
+
+import ast
+import asyncio
+import importlib
+import logging
+import os
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import discord
+from discord import app_commands
+from discord.ext import commands, tasks
+
+from utils import async_storage, command_sync, metrics
+
+CONFIG_FILE = "config.json"
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PACKAGES = ("cogs", "utils")
+
+# Module mit prozessweitem Zustand (Registries, Thread-Pools, Scheduler, installierte
+# Listener, offene DB-Verbindungen). Neu laden würde den Zustand verlieren oder
+# verdoppeln – Änderungen daran brauchen weiterhin einen Neustart.
+STATEFUL_MODULES = {
+    "utils.async_storage", "utils.bot_telemetry", "utils.channel_pool", "utils.file_lock",
+    "utils.ipc", "utils.loop_watchdog", "utils.member_cache", "utils.metrics", "utils.rename_scheduler",
+    "utils.self_update", "utils.startup_profile", "utils.ticket_analytics",
+    "utils.ticket_assignment", "utils.ticket_index", "utils.ticket_log",
+    "utils.ticket_search", "utils.ticket_storage", "utils.transcripts",
+    # Der Reloader selbst: cog_unload bricht watch_files ab – und damit genau den
+    # Task, der gerade reload_extension ausführt (CancelledError, kein Rollback)
+    "cogs.cog_reloader",
+}
+
+RELOAD_SECONDS = metrics.histogram(
+    "cog_reload_seconds", "Dauer eines Hot-Reloads (Module + Cogs)", ("result",),
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+RELOADED_MODULES = metrics.counter("cog_reload_modules", "Neu geladene Module", ("module", "result"))
+MEMBER_RETENTION = metrics.gauge(
+    "cog_reload_member_retention_ratio", "Anteil gecachter Member, die den letzten Reload überstanden haben"
+)
+
+log = logging.getLogger(__name__)
+
+
+# ---------------------------
+# Abhängigkeiten
+# ---------------------------
+def module_name(path: str) -> str:
+    """'cogs/ticket_timers.py' → 'cogs.ticket_timers'"""
+    return os.path.splitext(path.replace("\\", "/"))[0].replace("/", ".")
+
+
+def _project_imports(path: str) -> Set[str]:
+    """Alle cogs.*/utils.*-Module, die eine Datei importiert (auch in Funktionen)."""
+    with open(path, "r", encoding="utf-8") as f:
+        tree = ast.parse(f.read(), path)
+    found = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            found.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            found.add(node.module)
+            # from utils import async_storage → utils.async_storage
+            found.update(f"{node.module}.{alias.name}" for alias in node.names)
+    return {name for name in found if name.split(".")[0] in PACKAGES and name.count(".") == 1}
+
+
+def import_graph(base_dir: str = BASE_DIR) -> Dict[str, Set[str]]:
+    """Modul → direkt importierte Projektmodule."""
+    graph = {}
+    for package in PACKAGES:
+        folder = os.path.join(base_dir, package)
+        for filename in sorted(os.listdir(folder)):
+            if filename.endswith(".py") and filename != "__init__.py":
+                name = f"{package}.{filename[:-3]}"
+                graph[name] = _project_imports(os.path.join(folder, filename))
+    for deps in graph.values():
+        deps.intersection_update(graph)
+    return graph
+
+
+def reload_plan(changed: Iterable[str], extensions: Iterable[str],
+                graph: Dict[str, Set[str]]) -> Tuple[List[str], List[str], List[str]]:
+    """
+    (utils-Module, Extensions, nur per Neustart) – jeweils Abhängigkeiten zuerst.
+
+    Betroffen ist jedes geänderte Modul und alles, was es (transitiv) importiert.
+    Zustandsbehaftete Module werden nicht neu geladen; ihre Importeure behalten
+    ohnehin das alte, unveränderte Objekt und müssen deshalb nicht mit.
+    """
+    importers: Dict[str, Set[str]] = {name: set() for name in graph}
+    for name, deps in graph.items():
+        for dep in deps:
+            importers[dep].add(name)
+
+    changed = [name for name in changed if name in graph]
+    restart = sorted(name for name in changed if name in STATEFUL_MODULES)
+    affected: Set[str] = set()
+    todo = [name for name in changed if name not in STATEFUL_MODULES]
+    while todo:
+        name = todo.pop()
+        if name in affected or name in STATEFUL_MODULES:
+            continue
+        affected.add(name)
+        todo.extend(importers[name])
+
+    order: List[str] = []
+    visiting: Set[str] = set()
+
+    def visit(name):
+        if name in order or name in visiting:
+            return  # Zyklen: Reihenfolge innerhalb des Zyklus egal
+        visiting.add(name)
+        for dep in sorted(graph[name]):
+            if dep in affected:
+                visit(dep)
+        visiting.discard(name)
+        order.append(name)
+
+    for name in sorted(affected):
+        visit(name)
+    extensions = set(extensions)
+    modules = [name for name in order if name.startswith("utils.")]
+    cogs = [name for name in order if name in extensions]
+    return modules, cogs, restart
+
+
+# ---------------------------
+# Neu laden
+# ---------------------------
+def reload_module(name: str) -> None:
+    """importlib.reload mit Rollback: schlägt der Import fehl, bleibt die alte Version aktiv."""
+    module = sys.modules.get(name)
+    if module is None:
+        return  # nie importiert – der nächste Import liest ohnehin die neue Datei
+    previous = dict(module.__dict__)
+    try:
+        importlib.reload(module)
+    except BaseException:
+        module.__dict__.clear()
+        module.__dict__.update(previous)
+        raise
+
+
+class CogReloader(commands.Cog):
+    """
+    Hot-Reload geänderter Cogs ohne Neustart (kein Gateway-Reconnect, kein
+    erneutes Member-Chunking):
+    - nach einem Self-Update per ``ipc.CODE_UPDATED`` (utils/self_update.py)
+    - per ``/reload`` (nur Admins)
+    - optional automatisch bei Dateiänderungen (config.json → "cog_autoreload": true)
+
+    Geänderte utils-Module werden in Abhängigkeitsreihenfolge per importlib
+    neu geladen, danach alle Cogs, die sie (transitiv) importieren. Persistente
+    Views und DynamicItems registrieren die Cogs in ihrem ``setup`` – sie sind
+    damit nach dem Reload automatisch wieder aktiv. Schlägt ein Schritt fehl,
+    bleibt die alte Version des Moduls bzw. Cogs geladen.
+    """
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self._lock = asyncio.Lock()
+        self._mtimes = self._scan()
+
+    async def cog_load(self):
+        config = await async_storage.load_json(CONFIG_FILE)
+        if config.get("cog_autoreload"):
+            self.watch_files.start()
+
+    def cog_unload(self):
+        self.watch_files.cancel()
+
+    def _scan(self) -> Dict[str, int]:
+        mtimes = {}
+        for package in PACKAGES:
+            folder = os.path.join(BASE_DIR, package)
+            for filename in os.listdir(folder):
+                if filename.endswith(".py"):
+                    path = os.path.join(folder, filename)
+                    try:
+                        mtimes[f"{package}.{filename[:-3]}"] = os.stat(path).st_mtime_ns
+                    except FileNotFoundError:
+                        continue
+        return mtimes
+
+    def _changed_since_scan(self) -> List[str]:
+        current = self._scan()
+        changed = [name for name, mtime in current.items() if self._mtimes.get(name) != mtime]
+        self._mtimes = current
+        return changed
+
+    async def reload_modules(self, changed: Iterable[str]) -> Optional[Dict]:
+        """Neu laden und Bericht zurückgeben (None = nichts zu tun)."""
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            graph = await loop.run_in_executor(None, import_graph)
+            modules, cogs, restart = reload_plan(changed, self.bot.extensions, graph)
+            for name in restart:
+                log.warning(f"⚠️ {name} hält Prozesszustand – Änderung greift erst nach einem Neustart")
+            if not modules and not cogs:
+                if not restart:
+                    return None
+                return {"ok": [], "failed": [], "restart": restart, "seconds": 0.0, "members": (0, 0)}
+
+            members_before = sum(len(g.members) for g in self.bot.guilds)
+            start = time.perf_counter()
+            ok: List[str] = []
+            failed: List[Tuple[str, str]] = []
+            broken: Set[str] = set()
+            for name in modules + cogs:
+                if graph[name] & broken:
+                    # Baut auf einem Modul auf, das nicht neu geladen werden konnte
+                    failed.append((name, "Abhängigkeit fehlgeschlagen"))
+                    broken.add(name)
+                    continue
+                try:
+                    if name in modules:
+                        reload_module(name)
+                    else:
+                        await self.bot.reload_extension(name)
+                    ok.append(name)
+                    RELOADED_MODULES.labels(module=name, result="ok").inc()
+                except Exception as e:
+                    # reload_extension stellt bei Fehlern im Setup die alte Version wieder her
+                    failed.append((name, str(e.__cause__ or e)))
+                    broken.add(name)
+                    RELOADED_MODULES.labels(module=name, result="rollback").inc()
+                    log.error(f"❌ Neuladen von {name} fehlgeschlagen, alte Version bleibt aktiv: {e}")
+            seconds = time.perf_counter() - start
+            members_after = sum(len(g.members) for g in self.bot.guilds)
+
+            RELOAD_SECONDS.labels(result="error" if failed else "ok").observe(seconds)
+            if members_before:
+                MEMBER_RETENTION.set(members_after / members_before)
+            self._mtimes = self._scan()
+            if ok and cogs:
+                await self._sync_commands()
+            log.info(f"🔄 Hot-Reload: {len(ok)} Module in {seconds * 1000:.0f} ms, "
+                     f"{len(failed)} Fehler, Member-Cache {members_after}/{members_before}")
+            return {"ok": ok, "failed": failed, "restart": restart, "seconds": seconds,
+                    "members": (members_before, members_after)}
+
+    async def _sync_commands(self):
+        # Neu geladene Cogs können Slash-Commands ändern – Sync nur bei anderem Hash
+        try:
+            await command_sync.sync_if_changed(self.bot)
+        except discord.HTTPException as e:
+            log.warning(f"⚠️ Slash-Command-Sync nach Hot-Reload fehlgeschlagen: {e}")
+
+    @commands.Cog.listener()
+    async def on_ipc_code_updated(self, payload):
+        await self.reload_modules(module_name(p) for p in payload.get("files") or [])
+
+    @tasks.loop(seconds=2)
+    async def watch_files(self):
+        changed = self._changed_since_scan()
+        if changed:
+            await self.reload_modules(changed)
+
+    @app_commands.command(name="reload", description="Geänderte Cogs/utils-Module neu laden (nur Admins)")
+    @app_commands.describe(names="Optional: Module, durch Leerzeichen getrennt (z.B. ticket_timers utils.metrics)")
+    @app_commands.default_permissions(administrator=True)
+    @app_commands.checks.has_permissions(administrator=True)
+    async def reload(self, interaction: discord.Interaction, names: Optional[str] = None):
+        """Lädt geänderte (oder die genannten) Cogs/utils-Module neu (nur Admins)"""
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        if names:
+            changed = [n if "." in n else f"cogs.{n}" for n in names.split()]
+        else:
+            changed = self._changed_since_scan()
+        report = await self.reload_modules(changed)
+        if report is None:
+            return await interaction.followup.send("ℹ️ Keine geänderten Module gefunden.")
+
+        before, after = report["members"]
+        color = discord.Color.red() if report["failed"] else discord.Color.green()
+        embed = discord.Embed(title="🔄 Hot-Reload", color=color)
+        embed.add_field(name="Neu geladen", value="\n".join(report["ok"])[:1024] or "–", inline=False)
+        if report["failed"]:
+            embed.add_field(name="Fehlgeschlagen (alte Version aktiv)",
+                            value="\n".join(f"{n}: {e}" for n, e in report["failed"])[:1024], inline=False)
+        if report["restart"]:
+            embed.add_field(name="Nur per Neustart", value="\n".join(report["restart"])[:1024], inline=False)
+        embed.add_field(name="Dauer", value=f"{report['seconds'] * 1000:.0f} ms", inline=True)
+        embed.add_field(name="Member-Cache", value=f"{after}/{before}", inline=True)
+        await interaction.followup.send(embed=embed)
+
+    @reload.error
+    async def reload_error(self, interaction: discord.Interaction, error):
+        if isinstance(error, app_commands.MissingPermissions):
+            await interaction.response.send_message("❌ Nur Admins dürfen /reload verwenden.", ephemeral=True)
+        else:
+            raise error
+
+
+async def setup(bot):
+    await bot.add_cog(CogReloader(bot))
@@ -0,0 +1,55 @@
+# cogs/event_log_maintenance.py
+# -*- coding: utf-8 -*-
+
+import logging
+
+from discord.ext import commands, tasks
+
+from utils import async_storage, event_store
+from utils.bot_telemetry import track_task
+
+CONFIG_FILE = "config.json"
+
+log = logging.getLogger(__name__)
+
+
+class EventLogMaintenance(commands.Cog):
+    """
+    Pflege des partitionierten Event-Logs (utils/event_store.py):
+    - beim ersten Start logs/ticket_events.json in Tagespartitionen aufteilen
+    - täglich abgeschlossene Monate komprimieren und alte Archive löschen
+      (config.json → "event_archive_days", "event_retention_days"; 0 = nie löschen)
+
+    Läuft über die ticket_log-Queue, damit nichts parallel zu neuen Events schreibt.
+    """
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.compact_events.start()
+
+    def cog_unload(self):
+        self.compact_events.cancel()
+
+    @tasks.loop(hours=24)
+    @track_task("event_log_compact")
+    async def compact_events(self):
+        config = await async_storage.load_json(CONFIG_FILE)
+        migrated = await async_storage.run_io(async_storage.KEY_TICKET_LOG, event_store.migrate_legacy)
+        if migrated:
+            log.info(f"🗃️ {migrated} Events aus ticket_events.json nach logs/events/ übernommen")
+        stats = await async_storage.run_io(
+            async_storage.KEY_TICKET_LOG, event_store.compact,
+            int(config.get("event_archive_days", event_store.ARCHIVE_AFTER_DAYS)),
+            int(config.get("event_retention_days", event_store.RETENTION_DAYS)),
+        )
+        if stats["archived_months"] or stats["deleted"]:
+            log.info(f"🗃️ Event-Log kompaktiert: {stats}")
+
+    @compact_events.before_loop
+    async def before_compact(self):
+        # Migration/Kompaktierung nicht parallel zum Start (Cogs laden, Login) laufen lassen
+        await self.bot.wait_until_ready()
+
+
+async def setup(bot):
+    await bot.add_cog(EventLogMaintenance(bot))
@@ -0,0 +1,98 @@
+# cogs/member_cache_manager.py
+# -*- coding: utf-8 -*-
+
+import asyncio
+import logging
+import time
+from typing import Optional
+
+import discord
+from discord.ext import commands
+
+from utils import async_storage
+from utils.member_cache import member_cache, MODE_FULL, MODE_LAZY
+from cogs.ticket_button_category_flow import _load_staff_ids
+
+log = logging.getLogger(__name__)
+
+
+class MemberCacheManager(commands.Cog):
+    """
+    Setzt die Member-Cache-Richtlinie aus utils/member_cache.py um:
+    - ``lazy``: Guilds nach on_ready nacheinander im Hintergrund chunken
+    - ``bounded``: Staff (Admins/Supporter aus der User-DB) anheften und mit
+      Presence laden; Nutzer, die mit dem Bot interagieren, kommen in den LRU
+    Nach dem Laden des Staffs wird ``staff_cached`` dispatcht (z.B. für die
+    Auto-Zuweisung, die Presence braucht).
+    """
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self._chunker: Optional[asyncio.Task] = None
+
+    def cog_unload(self):
+        if self._chunker is not None:
+            self._chunker.cancel()
+
+    async def _pin_staff(self, guilds):
+        admin_ids, support_ids = await async_storage.run_io(None, _load_staff_ids)
+        staff = set(admin_ids) | set(support_ids)
+        for guild in guilds:
+            start = time.perf_counter()
+            try:
+                loaded = await member_cache.pin(guild, staff)
+            except (asyncio.TimeoutError, discord.HTTPException) as e:
+                log.warning(f"[MemberCache] Staff für {guild.name} nicht geladen: {e}")
+                continue
+            log.info(f"👥 {guild.name}: {loaded} Staff-Member in {(time.perf_counter() - start) * 1000:.0f} ms "
+                     f"geladen, Cache {len(guild.members)}/{guild.member_count}")
+        self.bot.dispatch("staff_cached")
+
+    async def _chunk_lazily(self, guilds):
+        for guild in guilds:
+            if guild.chunked:
+                continue
+            start = time.perf_counter()
+            await guild.chunk()
+            log.info(f"👥 {guild.name}: {len(guild.members)} Member in "
+                     f"{time.perf_counter() - start:.1f} s nachgeladen")
+        self.bot.dispatch("staff_cached")
+
+    async def _prepare(self, guilds):
+        if member_cache.bounded:
+            await self._pin_staff(guilds)
+        elif member_cache.mode == MODE_LAZY:
+            await self._chunk_lazily(guilds)
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        if member_cache.mode == MODE_FULL:
+            return  # discord.py hat beim Start schon alles gechunkt
+        if self._chunker is None or self._chunker.done():
+            # Im Hintergrund – on_ready der anderen Cogs wartet nicht darauf
+            self._chunker = asyncio.create_task(self._prepare(list(self.bot.guilds)))
+
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild: discord.Guild):
+        if member_cache.mode != MODE_FULL:
+            await self._prepare([guild])
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        member_cache.forget_guild(guild.id)
+
+    @commands.Cog.listener()
+    async def on_ipc_users_changed(self, payload: dict):
+        # Staff im Webpanel geändert → neue Supporter anheften, entfernte freigeben
+        if member_cache.bounded:
+            await self._pin_staff(list(self.bot.guilds))
+
+    @commands.Cog.listener()
+    async def on_interaction(self, interaction: discord.Interaction):
+        # Ticket-Nutzer: das Member-Objekt kommt mit der Interaction, kein API-Call
+        if interaction.guild is not None:
+            member_cache.remember(interaction.user)
+
+
+async def setup(bot):
+    await bot.add_cog(MemberCacheManager(bot))
@@ -0,0 +1,101 @@
+# cogs/perf_monitor.py
+# -*- coding: utf-8 -*-
+
+import os
+import discord
+from discord import app_commands
+from discord.ext import commands, tasks
+
+from utils import metrics
+from utils.bot_telemetry import (
+    sample_bot_gauges,
+    GATEWAY_LATENCY,
+    INTERACTION_SECONDS,
+    TASK_SECONDS,
+    HTTP_SECONDS,
+    RATE_LIMITS,
+)
+
+METRICS_FILE = os.path.join("logs", "bot_metrics.prom")
+
+
+def _fmt_ms(seconds) -> str:
+    if seconds is None:
+        return "—"
+    if seconds == float("inf"):
+        return ">10 s"
+    return f"{seconds * 1000:.0f} ms"
+
+
+def _summarise(histogram, limit: int = 8) -> str:
+    """Eine Zeile pro Label-Kombination: Anzahl, p50, p95 (nach Anzahl sortiert)."""
+    rows = []
+    for values, child in histogram._children.items():
+        if not child.count:
+            continue
+        label = " ".join(values)
+        rows.append((child.count, f"`{label}` – {child.count}× · p50 {_fmt_ms(child.quantile(0.5))}"
+                                  f" · p95 {_fmt_ms(child.quantile(0.95))}"))
+    rows.sort(key=lambda r: r[0], reverse=True)
+    return "\n".join(r[1] for r in rows[:limit]) or "—"
+
+
+class PerfMonitor(commands.Cog):
+    """
+    Sammelt periodisch Gateway-Latenz und Cache-Größen, schreibt alle Bot-Metriken
+    als Prometheus-Textfile nach logs/bot_metrics.prom (node_exporter textfile-Collector)
+    und stellt mit /perf eine Kurzübersicht für Admins bereit.
+    """
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.export_metrics.start()
+
+    def cog_unload(self):
+        self.export_metrics.cancel()
+
+    @tasks.loop(seconds=30)
+    async def export_metrics(self):
+        sample_bot_gauges(self.bot)
+        os.makedirs(os.path.dirname(METRICS_FILE), exist_ok=True)
+        tmp_path = METRICS_FILE + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(metrics.render())
+        os.replace(tmp_path, METRICS_FILE)
+
+    @export_metrics.before_loop
+    async def before_export(self):
+        await self.bot.wait_until_ready()
+
+    @app_commands.command(name="perf", description="Latenzen von Handlern, Task-Loops und Discord-API (nur Admins)")
+    @app_commands.default_permissions(administrator=True)
+    @app_commands.checks.has_permissions(administrator=True)
+    async def perf(self, interaction: discord.Interaction):
+        """Zeigt Latenzen der Handler, Task-Loops und Discord-API-Calls (nur Admins)"""
+        sample_bot_gauges(self.bot)
+        rate_limits = sum(child.value for child in RATE_LIMITS._children.values())
+
+        embed = discord.Embed(title="📈 Bot-Performance", color=discord.Color.blurple())
+        embed.add_field(name="Gateway-Latenz", value=_fmt_ms(GATEWAY_LATENCY.labels().value), inline=True)
+        embed.add_field(name="Rate-Limits (429)", value=str(int(rate_limits)), inline=True)
+        embed.add_field(
+            name="Cache",
+            value=(f"{len(self.bot.guilds)} Guilds · {sum(len(g.members) for g in self.bot.guilds)} Member · "
+                   f"{len(self.bot.cached_messages)} Nachrichten"),
+            inline=False,
+        )
+        embed.add_field(name="Interactions", value=_summarise(INTERACTION_SECONDS)[:1024], inline=False)
+        embed.add_field(name="Task-Loops", value=_summarise(TASK_SECONDS)[:1024], inline=False)
+        embed.add_field(name="Discord-API", value=_summarise(HTTP_SECONDS, limit=6)[:1024], inline=False)
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @perf.error
+    async def perf_error(self, interaction: discord.Interaction, error):
+        if isinstance(error, app_commands.MissingPermissions):
+            await interaction.response.send_message("❌ Nur Admins dürfen /perf verwenden.", ephemeral=True)
+        else:
+            raise error
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(PerfMonitor(bot))
@@ -1,11 +1,16 @@
 import discord
 from discord.ext import commands, tasks
-import json
-import os
 
-ROLE_CACHE_PATH = "utils/roles_cache.json"
+from utils import async_storage
+from utils.bot_telemetry import track_task
+from utils.guild_config import write_roles, register_guilds, forget_guild
 
 class RoleCacher(commands.Cog):
+    """
+    Rollen jeder Guild für das Webpanel cachen (utils/roles_cache/<guild_id>.json)
+    und die Liste der Guilds für den Guild-Wähler pflegen (utils/guilds.json).
+    """
+
     def __init__(self, bot):
         self.bot = bot
         self.update_roles.start()
@@ -13,21 +18,50 @@ class RoleCacher(commands.Cog):
     def cog_unload(self):
         self.update_roles.cancel()
 
-    @tasks.loop(minutes=10)
+    # Rollenänderungen kommen über die Guild-Events unten; die Schleife ist nur Absicherung
+    @tasks.loop(minutes=60)
+    @track_task("update_roles")
     async def update_roles(self):
         for guild in self.bot.guilds:
             await self.cache_roles(guild)
 
     @commands.Cog.listener()
     async def on_ready(self):
+        await async_storage.run_io(None, register_guilds, list(self.bot.guilds), True)
         for guild in self.bot.guilds:
             await self.cache_roles(guild)
 
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild):
+        await async_storage.run_io(None, register_guilds, [guild])
+        await self.cache_roles(guild)
+
+    @commands.Cog.listener()
+    async def on_guild_update(self, before, after):
+        if before.name != after.name:
+            await async_storage.run_io(None, register_guilds, [after])
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild):
+        await async_storage.run_io(None, forget_guild, guild.id)
+
+    @commands.Cog.listener()
+    async def on_guild_role_create(self, role):
+        await self.cache_roles(role.guild)
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role):
+        await self.cache_roles(role.guild)
+
+    @commands.Cog.listener()
+    async def on_guild_role_update(self, before, after):
+        if before.name != after.name:
+            await self.cache_roles(after.guild)
+
     async def cache_roles(self, guild):
+        # Nur die Datei dieser Guild neu schreiben – die anderen bleiben unberührt
         role_data = [{"id": role.id, "name": role.name} for role in guild.roles if not role.managed and role.name != "@everyone"]
-        os.makedirs(os.path.dirname(ROLE_CACHE_PATH), exist_ok=True)
-        with open(ROLE_CACHE_PATH, "w", encoding="utf-8") as f:
-            json.dump(role_data, f, ensure_ascii=False, indent=4)
+        await async_storage.run_io(None, write_roles, guild.id, role_data)
         print(f"✅ Rollen aus {guild.name} gecached ({len(role_data)} Rollen)")
 
 async def setup(bot):
@@ -0,0 +1,155 @@
+# cogs/ticket_assignment.py
+# -*- coding: utf-8 -*-
+
+import logging
+
+import discord
+from discord.ext import commands
+
+from utils import async_storage
+from utils.ticket_storage import get_tickets
+from utils.ticket_claim_close import build_ticket_view, STATUS_CLOSED
+from utils.ticket_assignment import assignment_scheduler
+from utils.member_cache import member_cache
+from utils.bot_telemetry import track_task
+from cogs.ticket_button_category_flow import _load_staff_ids
+
+CONFIG_FILE = "config.json"
+
+log = logging.getLogger(__name__)
+
+
+def _is_online(member: discord.Member) -> bool:
+    return member.status != discord.Status.offline
+
+
+class TicketAssignment(commands.Cog):
+    """
+    Optionale automatische Zuweisung neuer Tickets (config.json):
+
+        "ticket_auto_assign": true,
+        "ticket_assign_cap": 5,                       # max. offene Tickets pro Supporter
+        "ticket_category_supporters": {"Technik": [123, 456]}   # optional
+
+    Last und Online-Status werden im Speicher gehalten (utils/ticket_assignment.py)
+    und über Ticket-Events bzw. on_presence_update aktuell gehalten.
+    """
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.scheduler = assignment_scheduler
+        self.enabled = False
+
+    async def cog_load(self):
+        # Hot-Reload (/reload): on_ready kommt nicht noch einmal, enabled sonst bis zum Neustart aus
+        if self.bot.is_ready():
+            await self._refresh_config()
+
+    async def _refresh_config(self):
+        config = await async_storage.load_json(CONFIG_FILE)
+        self.enabled = bool(config.get("ticket_auto_assign"))
+        self.scheduler.cap = int(config.get("ticket_assign_cap") or 5)
+        _, support_ids = await async_storage.run_io(None, _load_staff_ids)
+        self.scheduler.set_supporters(support_ids, config.get("ticket_category_supporters") or {})
+
+    def _sync_presence(self):
+        for guild in self.bot.guilds:
+            for uid in self.scheduler.supporters:
+                member = guild.get_member(uid)
+                if member is not None:
+                    self.scheduler.set_online(uid, _is_online(member))
+
+    @commands.Cog.listener()
+    async def on_ipc_users_changed(self, payload: dict):
+        # Supporter im Webpanel angelegt/entfernt → sofort berücksichtigen
+        await self._refresh_config()
+        self._sync_presence()
+
+    @commands.Cog.listener()
+    async def on_ipc_settings_changed(self, payload: dict):
+        # Einstellungen gespeichert → config.json (auto_assign, Cap) neu einlesen
+        await self._refresh_config()
+
+    @commands.Cog.listener()
+    @track_task("ticket_assignment_restore")
+    async def on_ready(self):
+        await self._refresh_config()
+        tickets = await async_storage.run_io(async_storage.KEY_TICKETS, get_tickets)
+        self.scheduler.rebuild_load(tickets, STATUS_CLOSED)
+        self._sync_presence()
+        log.info(f"🤝 Ticket-Zuweisung {'aktiv' if self.enabled else 'aus'}: "
+                 f"{len(self.scheduler.online)} Supporter online")
+
+    @commands.Cog.listener()
+    async def on_staff_cached(self):
+        # Ohne Chunking beim Start (member_cache lazy/bounded) kommt der Staff erst jetzt in den Cache
+        self._sync_presence()
+
+    @commands.Cog.listener()
+    async def on_presence_update(self, before: discord.Member, after: discord.Member):
+        if after.id in self.scheduler.supporters:
+            self.scheduler.set_online(after.id, _is_online(after))
+
+    # ---------------------------
+    # Ticket-Events (Last pflegen)
+    # ---------------------------
+    @commands.Cog.listener()
+    async def on_ticket_claimed(self, ticket: dict, user):
+        # Manuell: ticket ist der Stand vor dem Claim. Automatisch: pick() hat schon gebucht.
+        previous = ticket.get("claimed_by")
+        if previous != user.id:
+            if previous:
+                # Übernahme von einem anderen Supporter → dessen Last wieder freigeben
+                self.scheduler.released(previous)
+            self.scheduler.assigned(user.id)
+
+    @commands.Cog.listener()
+    async def on_ticket_closed(self, ticket: dict):
+        current = await async_storage.find_ticket(channel_id=ticket["channel_id"])
+        if current and current.get("claimed_by"):
+            self.scheduler.released(current["claimed_by"])
+
+    @commands.Cog.listener()
+    @track_task("ticket_auto_assign")
+    async def on_ticket_created(self, ticket: dict):
+        # Config wird bei on_ready und per IPC aktualisiert – nicht bei jedem Ticket lesen
+        if not self.enabled:
+            return
+        uid = self.scheduler.pick(ticket.get("category"))
+        if uid is None:
+            return  # niemand frei → bleibt für manuelles "Übernehmen"
+
+        channel = self.bot.get_channel(int(ticket["channel_id"]))
+        if channel is None:
+            self.scheduler.released(uid)
+            return
+        member = await member_cache.get_member(channel.guild, uid)
+        name = member.display_name if member else str(uid)
+        status = f"Geclaimt von {name}"
+
+        updated = await async_storage.update_ticket(channel.id, {"status": status, "claimed_by": uid, "auto_assigned": True})
+        if updated is None:
+            # Nicht in tickets.json → nichts melden, was der Store nicht abbildet
+            log.warning(f"⚠️ Ticket {ticket.get('ticket_id')} nicht gefunden – keine automatische Zuweisung")
+            self.scheduler.released(uid)
+            return
+        async_storage.log_event("ticket_claimed", {
+            "ticket_id": ticket.get("ticket_id"),
+            "channel_name": channel.name,
+            "user_id": uid,
+            "username": name,
+            "channel_id": channel.id,
+            "auto_assigned": True,
+        })
+
+        if ticket.get("message_id"):
+            await channel.get_partial_message(int(ticket["message_id"])).edit(
+                view=build_ticket_view(ticket.get("ticket_id"), status)
+            )
+        await channel.send(f"🤝 Ticket wurde automatisch <@{uid}> zugewiesen.")
+        self.bot.dispatch("ticket_claimed", {**ticket, "claimed_by": uid, "auto_assigned": True},
+                          member or discord.Object(id=uid))
+
+
+async def setup(bot):
+    await bot.add_cog(TicketAssignment(bot))
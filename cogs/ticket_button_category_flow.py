@@ -2,20 +2,26 @@
 # -*- coding: utf-8 -*-
 
 import discord
+from discord import app_commands
 from discord.ext import commands, tasks
 from discord.utils import get
+import asyncio
 import json
+import logging
 from datetime import datetime
 
-from utils.ticket_counter import get_next_ticket_number
-from utils.ticket_storage import save_ticket
-from utils.ticket_log import log_ticket_event
-from utils.ticket_claim_close import TicketActionView  # ✅ Richtige View für Buttons
-from database import SessionLocal
-from models import User, RoleEnum
+from utils import async_storage
+from utils.guild_config import for_guild
+from utils.ticket_storage import get_guild_tickets
+from utils.channel_pool import ticket_pool
+from utils.ticket_claim_close import build_ticket_view, TicketControl  # ✅ Persistente Ticket-Buttons
+from utils.bot_telemetry import track_interaction, track_task, StageTimer, TICKET_STAGE_SECONDS, TIME_TO_REPLY_SECONDS
 
 SETTINGS_FILE = "settings.json"
 CONFIG_FILE = "config.json"
+BACKFILL_MAX_LISTED = 20  # fehlgeschlagene Kanäle in der Antwort (2000-Zeichen-Limit)
+
+log = logging.getLogger(__name__)
 
 
 # ---------------------------
@@ -59,6 +65,8 @@ def _fetch_user_ids_by_role(session, role_enum_value):
     Holt alle User.discord_id für eine bestimmte Rolle aus der DB
     und gibt eine Liste gültiger ints zurück (robust gegen '', None, 'abc').
     """
+    from models import User
+
     users = (
         session.query(User)
         .filter(User.discord_id.isnot(None), User.role == role_enum_value)
@@ -68,12 +76,80 @@ def _fetch_user_ids_by_role(session, role_enum_value):
     return [i for i in (_to_int_or_none(u.discord_id) for u in users) if i is not None]
 
 
+def _load_staff_ids():
+    """(admin_ids, support_ids) – synchron, daher nur über async_storage.run_io aufrufen."""
+    # SQLAlchemy erst hier importieren: spart dem Bot-Start ~⅓ s, und der Import läuft im I/O-Thread
+    from database import SessionLocal
+    from models import RoleEnum
+
+    with SessionLocal() as session:
+        return (
+            _fetch_user_ids_by_role(session, RoleEnum.admin),
+            _fetch_user_ids_by_role(session, RoleEnum.support),
+        )
+
+
+def _count_online(guild: discord.Guild, user_ids) -> int:
+    """Staff mit Status != offline – pro ID nachschlagen statt alle Guild-Member zu durchlaufen."""
+    members = (guild.get_member(uid) for uid in set(user_ids))
+    return sum(1 for m in members if m is not None and m.status != discord.Status.offline)
+
+
+ADMIN_OVERWRITE = dict(view_channel=True, manage_messages=True)
+SUPPORT_OVERWRITE = dict(view_channel=True)
+
+
+def _staff_role_overwrites(guild: discord.Guild, settings: dict):
+    """
+    Overwrites für die in settings.json gepflegten Staff-Rollen
+    (admin_roles / support_roles). Admin-Rechte gewinnen bei Doppelbelegung.
+    """
+    overwrites = {}
+    for role_id in settings.get("support_roles") or []:
+        role = guild.get_role(_to_int_or_none(role_id) or 0)
+        if role:
+            overwrites[role] = discord.PermissionOverwrite(**SUPPORT_OVERWRITE)
+    for role_id in settings.get("admin_roles") or []:
+        role = guild.get_role(_to_int_or_none(role_id) or 0)
+        if role:
+            overwrites[role] = discord.PermissionOverwrite(**ADMIN_OVERWRITE)
+    return overwrites
+
+
+def _build_overwrites(guild: discord.Guild, opener, settings: dict, admin_ids, support_ids):
+    # Basis-Kanalrechte
+    overwrites = {
+        guild.default_role: discord.PermissionOverwrite(view_channel=False),
+        opener: discord.PermissionOverwrite(
+            view_channel=True, send_messages=True, attach_files=True, read_message_history=True
+        ),
+    }
+
+    # Bevorzugt: Staff-Zugriff über Rollen → konstante Größe, Rollenänderungen wirken sofort
+    role_overwrites = _staff_role_overwrites(guild, settings)
+    if role_overwrites:
+        overwrites.update(role_overwrites)
+        return overwrites
+
+    # Fallback (keine Rollen konfiguriert): einzelne Admin-/Support-Mitglieder aus der DB
+    for admin_id in admin_ids:
+        member = guild.get_member(admin_id)
+        if member:
+            overwrites[member] = discord.PermissionOverwrite(**ADMIN_OVERWRITE)
+
+    for supporter_id in support_ids:
+        member = guild.get_member(supporter_id)
+        if member:
+            overwrites[member] = discord.PermissionOverwrite(**SUPPORT_OVERWRITE)
+    return overwrites
+
+
 # ---------------------------
 # Discord UI-Elemente
 # ---------------------------
 class CategoryDropdown(discord.ui.Select):
-    def __init__(self):
-        settings = load_settings()
+    def __init__(self, guild_id=None):
+        settings = for_guild(load_settings(), guild_id)
         categories = settings.get("ticket_categories", ["Support", "Technik"])
         options = [discord.SelectOption(label=cat, value=cat) for cat in categories]
 
@@ -83,73 +159,63 @@ class CategoryDropdown(discord.ui.Select):
             custom_id="category_dropdown",
         )
 
+    @track_interaction("category_dropdown")
     async def callback(self, interaction: discord.Interaction):
+        """
+        Ticket-Erstellung als Pipeline:
+        1. sofort bestätigen (defer)
+        2. Settings, Staff (DB) und Ticketnummer parallel laden
+        3. Kanal erstellen
+        4. Begrüßung senden, erst danach die Ephemeral-Antwort (nie "✅" für
+           einen Kanal, der gleich wieder gelöscht wird); Ticket + Log schreiben
+        Jede Stufe wird in ticket_create_stage_seconds gemessen.
+        """
+        timer = StageTimer(TICKET_STAGE_SECONDS)
         category_name = self.values[0]
-        settings = load_settings()
         guild = interaction.guild
-
-        # Basis-Kanalrechte
-        overwrites = {
-            guild.default_role: discord.PermissionOverwrite(view_channel=False),
-            interaction.user: discord.PermissionOverwrite(
-                view_channel=True, send_messages=True, attach_files=True, read_message_history=True
-            ),
-        }
-
-        # Admin-/Support-Mitglieder aus DB lesen (robust)
-        with SessionLocal() as session:
-            admin_ids = _fetch_user_ids_by_role(session, RoleEnum.admin)
-            support_ids = _fetch_user_ids_by_role(session, RoleEnum.support)
-
-        # Admin-/Support-Mitglieder Sichtberechtigung geben
-        for admin_id in admin_ids:
-            member = guild.get_member(admin_id)
-            if member:
-                overwrites[member] = discord.PermissionOverwrite(
-                    view_channel=True, manage_messages=True
-                )
-
-        for supporter_id in support_ids:
-            member = guild.get_member(supporter_id)
-            if member:
-                overwrites[member] = discord.PermissionOverwrite(view_channel=True)
-
-        # Ticketnummer + Benutzername im Kanalnamen
-        ticket_number = get_next_ticket_number()
-        safe_username = interaction.user.name.replace(" ", "-").lower()
-        channel_name = f"ticket-{safe_username}-{ticket_number}"
-
-        # Kategorie-Ordner suchen (optional anlegen, falls nicht vorhanden)
+        user = interaction.user
+
+        async with timer.stage("ack"):
+            await interaction.response.defer(ephemeral=True, thinking=True)
+
+        async with timer.stage("prepare"):
+            settings, (admin_ids, support_ids), ticket_number, guild_number = await asyncio.gather(
+                async_storage.load_json(SETTINGS_FILE),
+                async_storage.run_io(None, _load_staff_ids),
+                async_storage.next_ticket_number(),
+                async_storage.next_guild_ticket_number(guild.id),
+            )
+        settings = for_guild(settings, guild.id)
+
+        # Laufende Nummer der Guild + Benutzername im Kanalnamen
+        safe_username = user.name.replace(" ", "-").lower()
+        channel_name = f"ticket-{safe_username}-{guild_number}"
+        overwrites = _build_overwrites(guild, user, settings, admin_ids, support_ids)
+
+        # Kategorie-Ordner suchen
         ticket_parent = discord.utils.get(guild.categories, name="🎫 Tickets")
 
-        # Kanal erstellen
-        channel = await guild.create_text_channel(
-            name=channel_name, overwrites=overwrites, category=ticket_parent
-        )
+        try:
+            async with timer.stage("create_channel"):
+                # Warm-Pool (falls aktiv): vorhandenen Kanal übernehmen statt neu anlegen
+                channel = await ticket_pool.acquire(
+                    guild, name=channel_name, overwrites=overwrites,
+                    topic=f"Ticket #{guild_number} · {category_name} · {user}",
+                )
+                if channel is None:
+                    channel = await guild.create_text_channel(
+                        name=channel_name, overwrites=overwrites, category=ticket_parent
+                    )
+        except discord.HTTPException as e:
+            # Nach defer(thinking=True) wartet der Nutzer sonst ewig auf "denkt nach…"
+            log.error(f"❌ Ticket-Kanal für {user} in {guild.name} nicht erstellt: {e}")
+            await interaction.followup.send(f"❌ Ticket konnte nicht erstellt werden: {e.text or e}", ephemeral=True)
+            return
 
-        # Ticket-Daten speichern
         created_at = datetime.utcnow().isoformat()
-        ticket_data = {
-            "ticket_id": ticket_number,
-            "user": interaction.user.name,
-            "user_id": interaction.user.id,
-            "channel_id": channel.id,
-            "channel_name": channel.name,
-            "category": category_name,
-            "status": "offen",
-            "created_at": created_at,
-        }
-        save_ticket(ticket_data)
-
-        # Private Bestätigung
-        await interaction.response.send_message(
-            f"✅ Dein Ticket wurde erstellt: {channel.mention}", ephemeral=True
-        )
 
         # Begrüßungsnachricht + Buttons
         welcome = settings.get("welcome_text", "Willkommen im Support!")
-        mention_user = interaction.user.mention
-
         embed = discord.Embed(
             title=f"🎫 Ticket – {category_name}",
             description=f"{welcome}\n\n📂 **Kategorie:** {category_name}",
@@ -158,33 +224,68 @@ class CategoryDropdown(discord.ui.Select):
         )
         embed.set_footer(text=f"Ticket-ID: {ticket_number}")
 
-        # View initialisieren mit Ticketinfos
-        view = TicketActionView(interaction.user)
-        view.ticket_id = str(ticket_number)
-        view.channel = channel
-
-        msg = await channel.send(content=mention_user, embed=embed, view=view)
-        # WICHTIG: View kennt ihre Message, damit spätere Button-Updates zuverlässig funktionieren
-        view.message = msg
-
-        # Logging
-        log_ticket_event(
+        # Buttons tragen die Ticket-ID im custom_id → kein View-Objekt pro Ticket
+        view = build_ticket_view(ticket_number)
+
+        async with timer.stage("messages"):
+            try:
+                ticket_message = await channel.send(content=user.mention, embed=embed, view=view)
+            except discord.HTTPException as e:
+                # Ohne Nachricht mit den Buttons ist das Ticket nicht bedienbar → Kanal wieder weg
+                log.error(f"❌ Begrüßung in {channel.name} nicht gesendet: {e}")
+                try:
+                    await channel.delete(reason="Ticket-Erstellung fehlgeschlagen")
+                except discord.HTTPException:
+                    pass
+                await interaction.followup.send(f"❌ Ticket konnte nicht erstellt werden: {e.text or e}", ephemeral=True)
+                return
+            try:
+                await interaction.followup.send(f"✅ Dein Ticket wurde erstellt: {channel.mention}", ephemeral=True)
+                TIME_TO_REPLY_SECONDS.observe(timer.elapsed())
+            except discord.HTTPException as e:
+                log.warning(f"⚠️ Bestätigung für Ticket {ticket_number} nicht gesendet: {e}")
+
+        # Ticket-Daten speichern – inkl. Nachricht mit den Buttons
+        ticket_data = {
+            "ticket_id": ticket_number,
+            "guild_id": guild.id,
+            "number": guild_number,
+            "user": user.name,
+            "user_id": user.id,
+            "channel_id": channel.id,
+            "channel_name": channel.name,
+            "category": category_name,
+            "status": "offen",
+            "created_at": created_at,
+            "message_id": ticket_message.id,
+        }
+        # Abwarten (der Nutzer hat seine Antwort schon): Listener wie die Auto-Zuweisung
+        # schreiben per update_ticket in dasselbe Ticket – die Thread-Pool-Lock garantiert
+        # keine Reihenfolge, ohne await fände update_ticket das Ticket evtl. noch nicht
+        await async_storage.save_ticket(ticket_data)
+        # Timer (Erinnerung / Auto-Close) einplanen → cogs/ticket_timers.py
+        interaction.client.dispatch("ticket_created", ticket_data)
+
+        # Logging (fire-and-forget, blockiert den Loop nicht)
+        async_storage.log_event(
             "ticket_created",
             {
                 "ticket_id": ticket_number,
-                "user": interaction.user.name,
-                "user_id": interaction.user.id,
+                "guild_id": guild.id,
+                "user": user.name,
+                "user_id": user.id,
                 "category": category_name,
                 "channel_id": channel.id,
                 "created_at": created_at,
             },
         )
+        log.debug(f"Ticket {ticket_number} erstellt: {timer.summary()}")
 
 
 class CategoryView(discord.ui.View):
-    def __init__(self):
+    def __init__(self, guild_id=None):
         super().__init__(timeout=None)
-        self.add_item(CategoryDropdown())
+        self.add_item(CategoryDropdown(guild_id))
 
 
 class TicketButton(discord.ui.Button):
@@ -195,9 +296,10 @@ class TicketButton(discord.ui.Button):
             custom_id="ticket_create_button",
         )
 
+    @track_interaction("ticket_button")
     async def callback(self, interaction: discord.Interaction):
         await interaction.response.send_message(
-            "📂 Bitte wähle eine Kategorie zu der du Support brauchst:", view=CategoryView(), ephemeral=True
+            "📂 Bitte wähle eine Kategorie zu der du Support brauchst:", view=CategoryView(interaction.guild_id), ephemeral=True
         )
 
 
@@ -213,36 +315,42 @@ class TicketButtonView(discord.ui.View):
 class TicketCategoryFlow(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.last_panel_data = None
+        self.last_panel_data = {}  # guild_id → zuletzt gesendete Panel-Daten
         self.update_panel.start()
+        self.maintain_pool.start()
 
     def cog_unload(self):
         self.update_panel.cancel()
+        self.maintain_pool.cancel()
 
     @commands.Cog.listener()
     async def on_ready(self):
         # Versuche Panel direkt zu setzen (falls Channel vorhanden)
         await self.ensure_panel_message()
 
-    def build_panel_embed(self, guild: discord.Guild):
+    @commands.Cog.listener()
+    async def on_ipc_settings_changed(self, payload: dict):
+        # Begrüßungstext sofort übernehmen, nicht erst beim nächsten Panel-Update
+        await self.ensure_panel_message()
+
+    @commands.Cog.listener()
+    async def on_ipc_users_changed(self, payload: dict):
+        # Staff-Zählung im Panel hängt an den Rollen in der User-DB
+        await self.ensure_panel_message()
+
+    async def build_panel_embed(self, guild: discord.Guild):
         """
         Baut das Panel-Embed inkl. Online-Zählung für Admins/Supporter.
         Gibt (embed, daten_dict) zurück.
         """
-        settings = load_settings()
+        settings = for_guild(await async_storage.load_json(SETTINGS_FILE), guild.id)
 
-        # Admin-/Support-Mitglieder aus DB lesen (robust)
-        with SessionLocal() as session:
-            admin_ids = _fetch_user_ids_by_role(session, RoleEnum.admin)
-            support_ids = _fetch_user_ids_by_role(session, RoleEnum.support)
+        # Admin-/Support-Mitglieder aus DB lesen (robust, im Storage-Pool)
+        admin_ids, support_ids = await async_storage.run_io(None, _load_staff_ids)
 
         # Online-Zählung (Status != offline)
-        admin_online = sum(
-            1 for m in guild.members if m.id in admin_ids and m.status != discord.Status.offline
-        )
-        support_online = sum(
-            1 for m in guild.members if m.id in support_ids and m.status != discord.Status.offline
-        )
+        admin_online = _count_online(guild, admin_ids)
+        support_online = _count_online(guild, support_ids)
 
         welcome = settings.get("welcome_text", "Willkommen im Support!")
 
@@ -262,23 +370,32 @@ class TicketCategoryFlow(commands.Cog):
 
     async def ensure_panel_message(self):
         """
-        Stellt sicher, dass im konfigurierten Panel-Channel eine Panel-Nachricht
-        mit Button-View existiert und aktualisiert sie bei Änderungen.
+        Stellt sicher, dass in jeder Guild im konfigurierten Panel-Channel
+        (config.json → "ticket_panel_channel_id", pro Guild unter "guilds")
+        eine Panel-Nachricht mit Button-View existiert und aktualisiert sie bei Änderungen.
         """
-        config = load_config()
-        channel_id = config.get("ticket_panel_channel_id")
+        config = await async_storage.load_json(CONFIG_FILE)
+        for guild in self.bot.guilds:
+            try:
+                await self._ensure_guild_panel(guild, for_guild(config, guild.id))
+            except discord.HTTPException as e:
+                log.warning(f"[Panel] Aktualisieren in {guild.name} fehlgeschlagen: {e}")
+
+    async def _ensure_guild_panel(self, guild: discord.Guild, config: dict):
+        channel_id = _to_int_or_none(config.get("ticket_panel_channel_id"))
         if not channel_id:
             return
 
-        channel = self.bot.get_channel(int(channel_id))
+        # Über die Guild nachschlagen: ein globaler Standard-Channel gehört nur zu einer Guild
+        channel = guild.get_channel_or_thread(channel_id)
         if not channel or not isinstance(channel, (discord.TextChannel, discord.Thread)):
             return
 
-        embed, current_data = self.build_panel_embed(channel.guild)
+        embed, current_data = await self.build_panel_embed(guild)
 
         # Nur aktualisieren, wenn sich Daten geändert haben (spart Edit-Events)
-        if current_data != self.last_panel_data:
-            self.last_panel_data = current_data
+        if current_data != self.last_panel_data.get(guild.id):
+            self.last_panel_data[guild.id] = current_data
 
             # Versuche, bestehende Bot-Panel-Nachricht (mit Components) zu finden und zu aktualisieren
             async for msg in channel.history(limit=10):
@@ -289,7 +406,66 @@ class TicketCategoryFlow(commands.Cog):
             # Falls keine vorhandene Panel-Message gefunden wurde → neu senden
             await channel.send(embed=embed, view=TicketButtonView())
 
+    @app_commands.command(name="ticket_backfill", description="Ticket-Kanäle auf Staff-Rollen umstellen (nur Admins)")
+    @app_commands.guild_only()
+    @app_commands.default_permissions(administrator=True)
+    @app_commands.checks.has_permissions(administrator=True)
+    async def ticket_backfill(self, interaction: discord.Interaction):
+        """Stellt bestehende Ticket-Kanäle von Einzel-Overwrites auf Staff-Rollen um (nur Admins)"""
+        guild = interaction.guild
+        settings = for_guild(await async_storage.load_json(SETTINGS_FILE), guild.id)
+        role_overwrites = _staff_role_overwrites(guild, settings)
+        if not role_overwrites:
+            return await interaction.response.send_message(
+                "❌ In den Einstellungen sind keine Admin-/Support-Rollen hinterlegt.", ephemeral=True)
+        # Umstellen dauert (1 s pro Kanal) – länger als die 3 s für die erste Antwort
+        await interaction.response.defer(ephemeral=True, thinking=True)
+
+        admin_ids, support_ids = await async_storage.run_io(None, _load_staff_ids)
+        staff_ids = set(admin_ids) | set(support_ids)
+        tickets = await async_storage.run_io(async_storage.KEY_TICKETS, get_guild_tickets, guild.id)
+
+        converted = 0
+        failed = []  # (Kanal, Fehler) – ein fehlender Recht/gelöschter Kanal stoppt nicht den Rest
+        for ticket in tickets:
+            channel = guild.get_channel(_to_int_or_none(ticket.get("channel_id")) or 0)
+            if channel is None:
+                continue
+            opener_id = _to_int_or_none(ticket.get("user_id"))
+            overwrites = {
+                target: ow for target, ow in channel.overwrites.items()
+                # Einzel-Overwrites von Staff entfernen (Ersteller bleibt)
+                if not (isinstance(target, (discord.Member, discord.Object)) and target.id in staff_ids
+                        and target.id != opener_id)
+            }
+            overwrites.update(role_overwrites)
+            if overwrites == channel.overwrites:
+                continue
+            try:
+                await channel.edit(overwrites=overwrites, reason="Ticket-Backfill: Staff-Rollen statt Einzelrechte")
+                converted += 1
+            except discord.HTTPException as e:
+                log.warning(f"[Backfill] {channel.name} nicht umgestellt: {e}")
+                failed.append((channel, e))
+            await asyncio.sleep(1)  # großzügig unter dem Channel-Edit-Rate-Limit bleiben
+
+        message = f"✅ {converted} Ticket-Kanäle auf Staff-Rollen umgestellt."
+        if failed:
+            lines = [f"• {channel.mention}: {e.text or e.status}" for channel, e in failed[:BACKFILL_MAX_LISTED]]
+            if len(failed) > BACKFILL_MAX_LISTED:
+                lines.append(f"• … und {len(failed) - BACKFILL_MAX_LISTED} weitere")
+            message += f"\n⚠️ {len(failed)} fehlgeschlagen:\n" + "\n".join(lines)
+        await interaction.followup.send(message)
+
+    @ticket_backfill.error
+    async def ticket_backfill_error(self, interaction: discord.Interaction, error):
+        if isinstance(error, app_commands.MissingPermissions):
+            await interaction.response.send_message("❌ Nur Admins dürfen /ticket_backfill verwenden.", ephemeral=True)
+        else:
+            raise error
+
     @tasks.loop(seconds=60)
+    @track_task("update_panel")
     async def update_panel(self):
         # Läuft im Hintergrund und aktualisiert das Panel zyklisch
         await self.ensure_panel_message()
@@ -299,6 +475,34 @@ class TicketCategoryFlow(commands.Cog):
         # Sicherstellen, dass der Bot ready ist, bevor die Loop startet
         await self.bot.wait_until_ready()
 
+    @tasks.loop(seconds=20)
+    @track_task("maintain_pool")
+    async def maintain_pool(self):
+        """
+        Optionaler Warm-Pool (config.json → "ticket_warm_pool_size").
+        Höchstens ein neuer Kanal pro Guild und Durchlauf (≈3/min) – bleibt
+        sicher unter dem Rate-Limit für das Anlegen von Kanälen.
+        """
+        config = await async_storage.load_json(CONFIG_FILE)
+        ticket_pool.target_size = int(config.get("ticket_warm_pool_size") or 0)
+        if not ticket_pool.enabled:
+            return
+        for guild in self.bot.guilds:
+            try:
+                await ticket_pool.replenish_one(guild)
+            except discord.HTTPException as e:
+                log.warning(f"[WarmPool] Nachfüllen in {guild.name} fehlgeschlagen: {e}")
+
+    @maintain_pool.before_loop
+    async def before_maintain_pool(self):
+        await self.bot.wait_until_ready()
+        for guild in self.bot.guilds:
+            ticket_pool.discover(guild)
+
 
 async def setup(bot):
+    # Ein Handler für alle Ticket-Buttons (Claim/Schließen/Wieder öffnen)
+    bot.add_dynamic_items(TicketControl)
+    # Persistente Panel-View (Buttons funktionieren nach Neustart und Hot-Reload weiter)
+    bot.add_view(TicketButtonView())
     await bot.add_cog(TicketCategoryFlow(bot))
@@ -1,18 +1,28 @@
 import discord
+from discord import app_commands
 from discord.ext import commands
 from discord.ui import View, Select
 import os, json
 from datetime import datetime
 
-from utils.ticket_claim_close import TicketActionView
+from utils.ticket_claim_close import build_ticket_view
+from utils.ticket_storage import save_ticket
 from utils.ticket_log import log_ticket_create
+from utils.bot_telemetry import track_interaction
+from utils import async_storage
+from utils.guild_config import for_guild
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 CONFIG_PATH = os.path.join(BASE_DIR, "../config.json")
-TICKET_COUNTER_PATH = os.path.join(BASE_DIR, "../ticket_counter.txt")
 TICKET_DIR = os.path.join(BASE_DIR, "../tickets")
 
 
+def _write_ticket_file(ticket_file: str, ticket_data: dict) -> None:
+    os.makedirs(TICKET_DIR, exist_ok=True)
+    with open(ticket_file, "w", encoding="utf-8") as f:
+        json.dump(ticket_data, f, indent=4)
+
+
 class CategorySelect(discord.ui.Select):
     def __init__(self, categories):
         options = [discord.SelectOption(label=cat, value=cat) for cat in categories]
@@ -23,6 +33,7 @@ class CategorySelect(discord.ui.Select):
             options=options
         )
 
+    @track_interaction("category_select")
     async def callback(self, interaction: discord.Interaction):
         selected = self.values[0]
         await interaction.response.send_message(
@@ -30,24 +41,17 @@ class CategorySelect(discord.ui.Select):
             ephemeral=True
         )
 
-        # Config & Begrüßung
-        with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-            config = json.load(f)
+        # Config & Begrüßung (Datei-I/O im Storage-Pool, nicht im Event-Loop)
+        config = for_guild(await async_storage.load_json(CONFIG_PATH), interaction.guild_id)
         greeting = config.get("default_greeting", "Willkommen im Ticket!")
 
-        # Ticketnummer
-        if os.path.exists(TICKET_COUNTER_PATH):
-            with open(TICKET_COUNTER_PATH, "r") as f:
-                counter = int(f.read())
-        else:
-            counter = 1
-        counter += 1
-        with open(TICKET_COUNTER_PATH, "w") as f:
-            f.write(str(counter))
+        # Ticket-ID (global) + laufende Nummer der Guild – gemeinsame Zähler mit dem Panel-Flow
+        counter = await async_storage.next_ticket_number()
+        number = await async_storage.next_guild_ticket_number(interaction.guild_id)
 
         # Channelname
         username = interaction.user.name.lower().replace(" ", "-")
-        ticket_name = f"ticket-{selected.lower()}-{counter}"[:32]
+        ticket_name = f"ticket-{selected.lower()}-{number}"[:32]
 
         # Rechte
         overwrites = {
@@ -62,17 +66,16 @@ class CategorySelect(discord.ui.Select):
             reason=f"Ticket von {interaction.user} ({selected})"
         )
 
-        # Logging
-        log_ticket_create(channel.name, interaction.user.id, channel.id, interaction.user.display_name)
+        # Logging (fire-and-forget)
+        async_storage.log_with(log_ticket_create, channel.name, interaction.user.id, channel.id, interaction.user.display_name)
 
         # Begrüßung + Buttons senden
         await channel.send(
             f"{interaction.user.mention}\n**Kategorie:** {selected}\n{greeting}",
-            view=TicketActionView(interaction.user)
+            view=build_ticket_view(counter)
         )
 
         # Ticket speichern
-        os.makedirs(TICKET_DIR, exist_ok=True)
         ticket_data = {
             "id": counter,
             "user": str(interaction.user),
@@ -83,8 +86,21 @@ class CategorySelect(discord.ui.Select):
             "channel_id": channel.id
         }
         ticket_file = os.path.join(TICKET_DIR, f"{counter}_{username}.json")
-        with open(ticket_file, "w", encoding="utf-8") as f:
-            json.dump(ticket_data, f, indent=4)
+        async_storage.fire_and_forget(ticket_file, _write_ticket_file, ticket_file, ticket_data)
+
+        # Zusätzlich in tickets.json, damit die Ticket-Buttons das Ticket im Index finden
+        async_storage.fire_and_forget(async_storage.KEY_TICKETS, save_ticket, {
+            "ticket_id": counter,
+            "guild_id": interaction.guild_id,
+            "number": number,
+            "user": str(interaction.user),
+            "user_id": interaction.user.id,
+            "channel_id": channel.id,
+            "channel_name": channel.name,
+            "category": selected,
+            "status": "offen",
+            "created_at": ticket_data["created"],
+        })
 
 
 class CategoryTicketView(View):
@@ -97,15 +113,15 @@ class CategoryTicketCog(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
-    @commands.command()
-    async def kategorie(self, ctx):
+    @app_commands.command(name="kategorie", description="Ticket mit Kategorie-Auswahl erstellen")
+    @app_commands.guild_only()
+    async def kategorie(self, interaction: discord.Interaction):
         """Starte Ticketerstellung mit Kategorie-Auswahl + Button-Logik"""
-        with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-            config = json.load(f)
+        config = for_guild(await async_storage.load_json(CONFIG_PATH), interaction.guild_id)
 
         categories = config.get("ticket_categories", ["Allgemein"])
         view = CategoryTicketView(categories)
-        await ctx.send("Bitte wähle eine Kategorie für dein Ticket:", view=view)
+        await interaction.response.send_message("Bitte wähle eine Kategorie für dein Ticket:", view=view)
 
 
 async def setup(bot):
@@ -0,0 +1,241 @@
+# cogs/ticket_timers.py
+# -*- coding: utf-8 -*-
+
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Dict, Optional, Set
+
+import discord
+from discord.ext import commands
+
+from utils import async_storage, file_lock
+from utils.guild_config import for_guild
+from utils.ticket_storage import get_tickets, update_ticket
+from utils.ticket_claim_close import close_ticket, STATUS_CLOSED, STATUS_OPEN
+from utils.timer_service import TimerService
+from utils.bot_telemetry import track_task
+
+SETTINGS_FILE = "settings.json"
+CONFIG_FILE = "config.json"
+
+# Beides ist opt-in (config.json, 0 = deaktiviert), z.B. 15 Minuten / 72 Stunden
+DEFAULT_REMINDER_MINUTES = 0
+DEFAULT_AUTOCLOSE_HOURS = 0
+
+# Wann die Funktionen zum ersten Mal aktiv waren. Ältere Tickets werden nicht
+# nachträglich erinnert, und ihre Auto-Close-Frist läuft erst ab diesem Zeitpunkt –
+# sonst würde der erste Start alle alten Tickets auf einmal anpingen/schließen.
+STATE_FILE = os.path.join("logs", "ticket_timers.json")
+
+# Aktivität wird sofort im Timer berücksichtigt, aber höchstens alle 5 Minuten
+# pro Ticket in tickets.json geschrieben (reicht für die Wiederherstellung).
+ACTIVITY_WRITE_INTERVAL = 300
+# Auto-Close-Deadline erst umplanen, wenn sie sich um mehr als das verschiebt
+# (sonst ein Heap-Eintrag pro Nachricht)
+AUTOCLOSE_RESCHEDULE_SLACK = 60
+
+REMIND = "remind"
+AUTOCLOSE = "autoclose"
+
+log = logging.getLogger(__name__)
+
+
+def _to_ts(value) -> Optional[float]:
+    """ISO-Zeitstempel aus tickets.json (naiv = UTC) → Unix-Zeit."""
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(str(value))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def _is_open(ticket: dict) -> bool:
+    return ticket.get("status") != STATUS_CLOSED
+
+
+def _active_since(enabled: Dict[str, bool]) -> Dict[str, float]:
+    """Startzeitpunkt je Funktion; beim ersten Aktivieren auf jetzt setzen."""
+    with file_lock.locked(STATE_FILE):
+        state = file_lock.read_json(STATE_FILE, {})
+        missing = [kind for kind, on in enabled.items() if on and kind not in state]
+        if missing:
+            state.update({kind: time.time() for kind in missing})
+            file_lock.write_json(STATE_FILE, state, indent=2)
+    return state
+
+
+class TicketTimers(commands.Cog):
+    """
+    Zeitgesteuerte Ticket-Aufgaben ohne Polling (beide opt-in):
+    - Erinnerung an den Staff, wenn ein Ticket nach N Minuten noch nicht übernommen ist
+      (config.json → "ticket_claim_reminder_minutes")
+    - automatisches Schließen nach N Stunden ohne Nachricht
+      (config.json → "ticket_autoclose_hours")
+
+    Alle Deadlines liegen in einem TimerService (Min-Heap); ein Task schläft bis zur
+    nächsten. Nach einem Neustart werden die Deadlines aus tickets.json rekonstruiert
+    (created_at, claimed_by, reminded_at, last_activity_at).
+    """
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.timers = TimerService(self._on_timer)
+        self.reminder_minutes = DEFAULT_REMINDER_MINUTES
+        self.autoclose_hours = DEFAULT_AUTOCLOSE_HOURS
+        self._open: Set[int] = set()
+        self._activity_written: Dict[int, float] = {}
+        self._since: Dict[str, float] = {}
+        self._startup: Optional[asyncio.Task] = None
+
+    async def cog_load(self):
+        self._startup = asyncio.create_task(self._restore())
+
+    def cog_unload(self):
+        if self._startup:
+            self._startup.cancel()
+        self.timers.stop()
+
+    # ---------------------------
+    # Wiederherstellung nach Neustart
+    # ---------------------------
+    @track_task("ticket_timers_restore")
+    async def _restore(self):
+        await self.bot.wait_until_ready()
+        config = await async_storage.load_json(CONFIG_FILE)
+        self.reminder_minutes = float(config.get("ticket_claim_reminder_minutes", DEFAULT_REMINDER_MINUTES) or 0)
+        self.autoclose_hours = float(config.get("ticket_autoclose_hours", DEFAULT_AUTOCLOSE_HOURS) or 0)
+        if not self.reminder_minutes and not self.autoclose_hours:
+            log.info("⏰ Ticket-Timer deaktiviert (ticket_claim_reminder_minutes / ticket_autoclose_hours)")
+            return
+        self._since = await async_storage.run_io(
+            STATE_FILE, _active_since, {REMIND: bool(self.reminder_minutes), AUTOCLOSE: bool(self.autoclose_hours)}
+        )
+
+        tickets = await async_storage.run_io(async_storage.KEY_TICKETS, get_tickets)
+        for ticket in tickets:
+            if _is_open(ticket) and ticket.get("channel_id"):
+                self._schedule_ticket(ticket)
+        self.timers.start()
+        log.info(f"⏰ Ticket-Timer aktiv: {len(self._open)} offene Tickets, {len(self.timers)} Deadlines")
+
+    def _schedule_ticket(self, ticket: dict) -> None:
+        channel_id = int(ticket["channel_id"])
+        self._open.add(channel_id)
+        created = _to_ts(ticket.get("created_at")) or time.time()
+
+        if (self.reminder_minutes and not ticket.get("claimed_by") and not ticket.get("reminded_at")
+                and created >= self._since.get(REMIND, 0)):
+            self.timers.schedule((REMIND, channel_id), created + self.reminder_minutes * 60)
+
+        if self.autoclose_hours:
+            last = max(created, _to_ts(ticket.get("last_activity_at")) or 0, self._since.get(AUTOCLOSE, 0))
+            self.timers.schedule((AUTOCLOSE, channel_id), last + self.autoclose_hours * 3600)
+
+    def _forget(self, channel_id: int) -> None:
+        self._open.discard(channel_id)
+        self._activity_written.pop(channel_id, None)
+        self.timers.cancel((REMIND, channel_id))
+        self.timers.cancel((AUTOCLOSE, channel_id))
+
+    # ---------------------------
+    # Ereignisse
+    # ---------------------------
+    @commands.Cog.listener()
+    async def on_ticket_created(self, ticket: dict):
+        self._schedule_ticket(ticket)
+
+    @commands.Cog.listener()
+    async def on_ticket_claimed(self, ticket: dict, user):
+        self.timers.cancel((REMIND, int(ticket["channel_id"])))
+
+    @commands.Cog.listener()
+    async def on_ticket_closed(self, ticket: dict):
+        self._forget(int(ticket["channel_id"]))
+
+    @commands.Cog.listener()
+    async def on_ticket_reopened(self, ticket: dict):
+        channel_id = int(ticket["channel_id"])
+        self._open.add(channel_id)
+        self._touch(channel_id)
+        # Wiederöffnen gibt den Claim frei → Erinnerung wieder ab jetzt
+        if self.reminder_minutes:
+            self.timers.schedule((REMIND, channel_id), time.time() + self.reminder_minutes * 60)
+
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        if message.author.bot or message.channel.id not in self._open:
+            return
+        self._touch(message.channel.id)
+
+    def _touch(self, channel_id: int) -> None:
+        """Aktivität: Auto-Close-Deadline verschieben, Zeitstempel gedrosselt speichern."""
+        now = time.time()
+        if self.autoclose_hours:
+            key = (AUTOCLOSE, channel_id)
+            deadline = now + self.autoclose_hours * 3600
+            current = self.timers.deadline(key)
+            if current is None or deadline - current > AUTOCLOSE_RESCHEDULE_SLACK:
+                self.timers.schedule(key, deadline)
+        if now - self._activity_written.get(channel_id, 0) >= ACTIVITY_WRITE_INTERVAL:
+            self._activity_written[channel_id] = now
+            async_storage.fire_and_forget(
+                async_storage.KEY_TICKETS,
+                update_ticket,
+                channel_id,
+                {"last_activity_at": datetime.utcnow().isoformat()},
+            )
+
+    # ---------------------------
+    # Fällige Timer
+    # ---------------------------
+    async def _on_timer(self, key):
+        kind, channel_id = key
+        ticket = await async_storage.find_ticket(channel_id=channel_id)
+        channel = self.bot.get_channel(channel_id)
+        if ticket is None or channel is None or not _is_open(ticket):
+            self._forget(channel_id)
+            return
+        if kind == REMIND:
+            await self._remind(channel, ticket)
+        else:
+            await self._autoclose(channel, ticket)
+
+    @track_task("ticket_claim_reminder")
+    async def _remind(self, channel: discord.TextChannel, ticket: dict):
+        if ticket.get("claimed_by") or ticket.get("status") != STATUS_OPEN:
+            return
+        settings = for_guild(await async_storage.load_json(SETTINGS_FILE), channel.guild.id)
+        role_ids = (settings.get("support_roles") or []) + (settings.get("admin_roles") or [])
+        mentions = "".join(f"<@&{rid}> " for rid in role_ids if str(rid).strip().isdigit())
+        minutes = int(self.reminder_minutes)
+        await channel.send(
+            f"⏰ {mentions}Dieses Ticket ist seit {minutes} Minuten offen und wurde noch nicht übernommen.",
+            allowed_mentions=discord.AllowedMentions(roles=True),
+        )
+        await async_storage.update_ticket(channel.id, {"reminded_at": datetime.utcnow().isoformat()})
+
+    @track_task("ticket_autoclose")
+    async def _autoclose(self, channel: discord.TextChannel, ticket: dict):
+        message = None
+        if ticket.get("message_id"):
+            try:
+                message = await channel.fetch_message(int(ticket["message_id"]))
+            except discord.HTTPException:
+                message = None
+        hours = int(self.autoclose_hours)
+        reason = f"Automatisch geschlossen – keine Aktivität seit {hours} h"
+        await close_ticket(channel, ticket, self.bot.user, reason, message)
+        self._forget(channel.id)
+        self.bot.dispatch("ticket_closed", ticket)
+        await channel.send(f"🔒 Ticket wurde automatisch geschlossen.\n💬 Grund: {reason}")
+
+
+async def setup(bot):
+    await bot.add_cog(TicketTimers(bot))
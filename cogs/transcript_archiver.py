@@ -0,0 +1,61 @@
+# cogs/transcript_archiver.py
+# -*- coding: utf-8 -*-
+
+import asyncio
+import logging
+
+import discord
+from discord.ext import commands
+
+from utils.transcripts import archive_channel, pending_archives
+from utils.bot_telemetry import track_task
+
+log = logging.getLogger(__name__)
+
+
+class TranscriptArchiver(commands.Cog):
+    """
+    Sichert beim Schließen eines Tickets den Kanalverlauf nach transcripts/
+    (siehe utils/transcripts.py). Exporte laufen nacheinander, damit mehrere
+    gleichzeitig geschlossene Tickets das History-Rate-Limit nicht ausreizen.
+    Abgebrochene Exporte werden nach einem Neustart fortgesetzt.
+    """
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self._slot = asyncio.Semaphore(1)
+        self._running = set()
+
+    def _start(self, channel_id: int, ticket_id) -> None:
+        if ticket_id in self._running:
+            return
+        self._running.add(ticket_id)
+        asyncio.create_task(self._archive(channel_id, ticket_id))
+
+    @track_task("ticket_transcript")
+    async def _archive(self, channel_id: int, ticket_id):
+        try:
+            async with self._slot:
+                channel = self.bot.get_channel(channel_id)
+                if channel is None:
+                    log.warning(f"[Transcripts] Kanal {channel_id} für Ticket {ticket_id} nicht gefunden")
+                    return
+                state = await archive_channel(channel, ticket_id)
+                log.info(f"🗂️ Transkript Ticket {ticket_id}: {state.get('count', 0)} Nachrichten archiviert")
+        except discord.HTTPException as e:
+            log.error(f"[Transcripts] Export von Ticket {ticket_id} abgebrochen: {e}")
+        finally:
+            self._running.discard(ticket_id)
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        for state in pending_archives():
+            self._start(int(state["channel_id"]), state["ticket_id"])
+
+    @commands.Cog.listener()
+    async def on_ticket_closed(self, ticket: dict):
+        self._start(int(ticket["channel_id"]), ticket.get("ticket_id"))
+
+
+async def setup(bot):
+    await bot.add_cog(TranscriptArchiver(bot))
@@ -1,7 +1,10 @@
 import os
-from sqlalchemy import create_engine
+import time
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker, declarative_base
 
+from utils.metrics import histogram
+
 DATABASE_URL = os.environ.get("DATABASE_URL", "sqlite:///./database.db")
 connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
 
@@ -9,6 +12,24 @@ engine = create_engine(DATABASE_URL, connect_args=connect_args)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+DB_QUERY_SECONDS = histogram("db_query_seconds", "Dauer von SQL-Statements", ("statement",))
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("query_start")
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    # Nur das Verb als Label (SELECT/INSERT/…) – hält die Kardinalität klein
+    verb = statement.lstrip().split(None, 1)[0].upper() if statement else "?"
+    DB_QUERY_SECONDS.labels(statement=verb).observe(elapsed)
+
 
 def get_db():
     db = SessionLocal()
@@ -20,4 +41,8 @@ def get_db():
 
 def init_db():
     import models  # noqa: F401
-    Base.metadata.create_all(bind=engine)
\ No newline at end of file
+    from utils import file_lock
+
+    # Mehrere Worker starten gleichzeitig – Tabellen nur einmal anlegen
+    with file_lock.locked("database"):
+        Base.metadata.create_all(bind=engine)
\ No newline at end of file
@@ -1,25 +1,28 @@
 # main.py
 from fastapi import FastAPI, Request, Form, Depends, UploadFile, File, HTTPException
-from fastapi.responses import HTMLResponse, RedirectResponse, FileResponse
+from fastapi.responses import HTMLResponse, RedirectResponse, FileResponse, PlainTextResponse, JSONResponse, StreamingResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from starlette.middleware.sessions import SessionMiddleware
 from starlette.status import HTTP_302_FOUND
 from typing import Optional, List, Dict, Any
+from contextlib import asynccontextmanager
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 import bcrypt
-from database import get_db, init_db
+from database import get_db, init_db, engine
 from models import User, RoleEnum, Document
-from utils.auth import require_role, ROLE_ADMIN, ROLE_SUPPORT, ROLE_USER, is_logged_in, jinja_context_injector
-import json
-import uvicorn
+from utils.auth import require_role, ROLE_ADMIN, ROLE_SUPPORT, ROLE_USER, is_logged_in, jinja_context_injector, user_has_any_role
+from utils import metrics, file_lock, ipc, startup_profile
+from utils.loop_watchdog import maybe_start_watchdog
+from utils import ticket_search, ticket_index, ticket_analytics, event_store, self_update, guild_config
+from utils.transcripts import read_transcript, load_state as load_transcript_state, archive_path as transcript_archive_path
+from starlette.concurrency import run_in_threadpool
 import os
 from datetime import datetime
-from urllib.parse import urlparse
+from urllib.parse import urlparse, urlencode
 import hmac
 import hashlib
-import subprocess
 import uuid
 
 # 🔸 Abwesenheiten-Storage (falls genutzt)
@@ -40,8 +43,27 @@ from utils.invite_keys import (
     mark_used as mark_invite_used
 )
 
-app = FastAPI()
-init_db()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Alles mit Datei-/DB-Zugriff erst beim Serverstart – ``import main`` bleibt
+    # dadurch billig (Tests, Tools, run_all.py)
+    with startup_profile.phase("init_db"):
+        init_db()
+    with startup_profile.phase("docs_dir"):
+        os.makedirs(DOCS_DIR, exist_ok=True)
+    with startup_profile.phase("templates"):
+        warm_templates()
+    with startup_profile.phase("db_pool"):
+        prime_db_pool()
+    # Optional: LOOP_WATCHDOG=1 misst den Loop-Lag und loggt blockierende Aufrufe
+    maybe_start_watchdog("web")
+    # Update, das mit einem Worker gestorben ist oder noch vorgemerkt war, fortsetzen
+    self_update.resume()
+    yield
+
+
+app = FastAPI(lifespan=lifespan)
 
 # Router
 from routers.member_form import router as member_form_router
@@ -52,17 +74,27 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 TEMPLATES_DIR = os.path.join(BASE_DIR, "web", "templates")
 STATIC_DIR = os.path.join(BASE_DIR, "web", "static")
 SETTINGS_PATH = os.path.join(BASE_DIR, "settings.json")
-ROLES_CACHE_PATH = os.path.join(BASE_DIR, "utils", "roles_cache.json")
 
 # 🔸 Dokumenten-Verzeichnis
 DOCS_DIR = os.path.join(BASE_DIR, "user_documents")
-os.makedirs(DOCS_DIR, exist_ok=True)
 
 templates = Jinja2Templates(directory=TEMPLATES_DIR)
 templates.env.globals['now'] = datetime.now
 templates.env.globals.update(jinja_context_injector())
 
 
+def warm_templates() -> None:
+    # Alle Seiten einmal kompilieren, sonst zahlt der erste Aufruf jeder Seite das Parsen
+    for name in templates.env.list_templates(extensions=["html"]):
+        templates.env.get_template(name)
+
+
+def prime_db_pool() -> None:
+    # Erste Verbindung (SQLite-Datei öffnen, Dialekt initialisieren) vor dem ersten Login aufbauen
+    with engine.connect() as conn:
+        conn.exec_driver_sql("SELECT 1")
+
+
 def _ensure_defaults(data: Dict[str, Any]) -> Dict[str, Any]:
     defaults = {
         "welcome_text": "Willkommen im Ticket! Beschreibe kurz dein Anliegen.",
@@ -74,36 +106,58 @@ def _ensure_defaults(data: Dict[str, Any]) -> Dict[str, Any]:
     return {**defaults, **(data or {})}
 
 
+@metrics.track_store("settings", "load")
 def load_settings() -> Dict[str, Any]:
-    if not os.path.exists(SETTINGS_PATH):
-        return _ensure_defaults({})
-    with open(SETTINGS_PATH, "r", encoding="utf-8") as f:
-        try:
-            data = json.load(f)
-        except json.JSONDecodeError:
-            data = {}
-    return _ensure_defaults(data)
+    # Pro Worker gecacht; ein os.stat pro Aufruf erkennt Änderungen anderer Worker/des Bots
+    return _ensure_defaults(file_lock.read_json(SETTINGS_PATH, {}, cached=True))
 
 
+@metrics.track_store("settings", "save")
 def save_settings(settings: Dict[str, Any]) -> None:
-    data = _ensure_defaults(settings)
-    with open(SETTINGS_PATH, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=4, ensure_ascii=False)
+    file_lock.write_json(SETTINGS_PATH, _ensure_defaults(settings), indent=4, ensure_ascii=False)
+
 
+def selected_guild(request: Request) -> Optional[str]:
+    """Im Guild-Wähler gewählter Server (None = Standard für alle Server)."""
+    guild_id = request.session.get("guild_id")
+    return guild_id if guild_id and guild_id in guild_config.known_guilds() else None
 
+
+templates.env.globals.update(known_guilds=guild_config.known_guilds, selected_guild=selected_guild)
+
+
+@metrics.track_store("tickets", "load")
 def get_tickets():
-    path = os.path.join(BASE_DIR, "tickets", "tickets.json")
-    if os.path.exists(path):
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    return []
+    # Nur lesend verwenden – pro Prozess gecacht, bis der Bot tickets.json ersetzt
+    return file_lock.read_json(os.path.join(BASE_DIR, "tickets", "tickets.json"), [], cached=True)
 
 
 app.add_middleware(SessionMiddleware, secret_key="your_secret_key", same_site="lax")
+app.add_middleware(metrics.MetricsMiddleware)  # äußerste Schicht → misst die volle Latenz
 app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
 
 ALL_ROLES = [r.value for r in RoleEnum]
 
+# 🔸 Metriken
+BCRYPT_SECONDS = metrics.histogram("bcrypt_seconds", "Dauer von bcrypt-Operationen", ("op",))
+DOCUMENT_BYTES = metrics.counter("document_bytes", "Übertragene Dokument-Bytes", ("direction",))
+LOCAL_HOSTS = {"127.0.0.1", "::1", "localhost"}
+# /metrics ohne Login: nur mit Scrape-Token ("Authorization: Bearer <token>") oder –
+# wenn ausdrücklich erlaubt – von localhost. Hinter einem Reverse-Proxy kommt
+# jede Anfrage von 127.0.0.1, daher ist die Ausnahme standardmäßig aus.
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+METRICS_ALLOW_LOCAL = os.environ.get("METRICS_ALLOW_LOCAL", "") in ("1", "true", "yes")
+
+
+def hash_password(password: str) -> str:
+    with metrics.timed(BCRYPT_SECONDS, op="hash"):
+        return bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+
+
+def check_password(password: str, password_hash: str) -> bool:
+    with metrics.timed(BCRYPT_SECONDS, op="check"):
+        return bcrypt.checkpw(password.encode(), password_hash.encode())
+
 
 def _is_safe_path(u: str) -> bool:
     if not u:
@@ -144,7 +198,7 @@ async def login(
         return templates.TemplateResponse("login.html", {"request": request, "error": "Ungültige Zugangsdaten"})
 
     user = db.query(User).filter_by(username=username).first()
-    if not user or not bcrypt.checkpw(password.encode(), user.password_hash.encode()):
+    if not user or not check_password(password, user.password_hash):
         return templates.TemplateResponse("login.html", {"request": request, "error": "Ungültige Zugangsdaten"})
 
     request.session["logged_in"] = True
@@ -194,7 +248,7 @@ async def register_submit(
     if db.query(User).filter(User.username == username).first():
         return templates.TemplateResponse("register.html", {"request": request, "error": "Benutzername bereits vergeben."})
 
-    hashed = bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+    hashed = hash_password(password)
     user = User(username=username, password_hash=hashed, role=RoleEnum("user"), discord_id="")
 
     db.add(user)
@@ -256,12 +310,12 @@ async def change_password(
 ):
     username = request.session.get("username")
     user = db.query(User).filter_by(username=username).first()
-    if not user or not bcrypt.checkpw(current_password.encode(), user.password_hash.encode()):
+    if not user or not check_password(current_password, user.password_hash):
         return templates.TemplateResponse("account.html", {"request": request, "error": "Aktuelles Passwort ist falsch."})
     if new_password != confirm_password:
         return templates.TemplateResponse("account.html", {"request": request, "error": "Die Passwörter stimmen nicht überein."})
 
-    user.password_hash = bcrypt.hashpw(new_password.encode(), bcrypt.gensalt()).decode()
+    user.password_hash = hash_password(new_password)
     db.commit()
     request.session["success"] = "Passwort erfolgreich geändert."
     return RedirectResponse(url="/account", status_code=HTTP_302_FOUND)
@@ -319,6 +373,7 @@ async def upload_own_document(
     content = await file.read()
     with open(dest_path, "wb") as f:
         f.write(content)
+    DOCUMENT_BYTES.labels(direction="upload").inc(len(content))
 
     doc = Document(
         user_id=user.id,
@@ -373,14 +428,30 @@ async def admin_dashboard(request: Request):
     return templates.TemplateResponse("dashboard.html", {"request": request, "settings": load_settings()})
 
 
+@app.post("/admin/guild", dependencies=[Depends(require_role(ROLE_ADMIN, ROLE_SUPPORT))])
+async def select_guild(request: Request, guild_id: str = Form(""), next: str = Form("")):
+    # Guild-Wähler: gilt für Einstellungen und Ticketliste dieser Sitzung
+    if guild_id in guild_config.known_guilds():
+        request.session["guild_id"] = guild_id
+    else:
+        request.session.pop("guild_id", None)
+    target = next if _is_safe_path(next) else "/admin/settings"
+    return RedirectResponse(url=target, status_code=HTTP_302_FOUND)
+
+
+# Nicht pro Server: gelten immer für alle Guilds (siehe save_settings_form)
+GLOBAL_SETTINGS = ("absence_channel_id",)
+
+
 @app.get("/admin/settings", response_class=HTMLResponse, dependencies=[Depends(require_role(ROLE_ADMIN, ROLE_SUPPORT))])
 async def settings_page(request: Request):
-    settings = load_settings()
-    all_roles = []
-    roles_path = ROLES_CACHE_PATH
-    if os.path.exists(roles_path):
-        with open(roles_path, "r", encoding="utf-8") as f:
-            all_roles = json.load(f)
+    guild_id = selected_guild(request)
+    # Sicht des gewählten Servers: globale Standards + seine Abweichungen (utils/guild_config.py)
+    raw = file_lock.read_json(SETTINGS_PATH, {}, cached=True)
+    settings = _ensure_defaults(guild_config.for_guild(raw, guild_id))
+    for key in GLOBAL_SETTINGS:
+        settings[key] = raw.get(key, "")
+    all_roles = await run_in_threadpool(guild_config.read_roles, guild_id)
     return templates.TemplateResponse("settings.html", {
         "request": request,
         "settings": settings,
@@ -397,37 +468,142 @@ async def save_settings_form(
     support_roles: Optional[List[str]] = Form(None),
     absence_channel_id: Optional[str] = Form(None),
 ):
-    current = load_settings()
-    if not ticket_categories or all((c or "").strip() == "" for c in ticket_categories):
-        ticket_categories = current.get("ticket_categories", [])
-    else:
-        ticket_categories = [c.strip() for c in ticket_categories if (c or "").strip()]
-
-    admin_roles_int = [int(r) for r in admin_roles] if admin_roles else []
-    support_roles_int = [int(r) for r in support_roles] if support_roles else []
-
-    current.update({
-        "welcome_text": welcome_text or "",
-        "ticket_categories": ticket_categories,
-        "admin_roles": admin_roles_int,
-        "support_roles": support_roles_int,
-        "absence_channel_id": (absence_channel_id or "").strip(),
-    })
-
-    save_settings(current)
+    guild_id = selected_guild(request)
+    with file_lock.locked(SETTINGS_PATH):
+        raw = file_lock.read_json(SETTINGS_PATH, {})
+        current = _ensure_defaults(guild_config.for_guild(raw, guild_id))
+        if not ticket_categories or all((c or "").strip() == "" for c in ticket_categories):
+            ticket_categories = current.get("ticket_categories", [])
+        else:
+            ticket_categories = [c.strip() for c in ticket_categories if (c or "").strip()]
+
+        admin_roles_int = [int(r) for r in admin_roles] if admin_roles else []
+        support_roles_int = [int(r) for r in support_roles] if support_roles else []
+
+        # Mit gewähltem Server nur dessen Partition ändern, sonst die globalen Standards
+        guild_config.update_guild(raw, guild_id, {
+            "welcome_text": welcome_text or "",
+            "ticket_categories": ticket_categories,
+            "admin_roles": admin_roles_int,
+            "support_roles": support_roles_int,
+        })
+        # Abwesenheiten kommen aus dem Webpanel und gehören zu keinem Server →
+        # immer global; früher in eine Partition geschriebene Werte entfernen
+        raw["absence_channel_id"] = (absence_channel_id or "").strip()
+        partition = (raw.get(guild_config.GUILDS_KEY) or {}).get(guild_config.guild_key(guild_id)) or {}
+        for key in GLOBAL_SETTINGS:
+            partition.pop(key, None)
+
+        save_settings(raw)
+    await ipc.publish(ipc.SETTINGS_CHANGED, {"guild_id": guild_id})
     return RedirectResponse(url="/admin/settings", status_code=HTTP_302_FOUND)
 
 
 @app.get("/admin/tickets", response_class=HTMLResponse, dependencies=[Depends(require_role(ROLE_ADMIN, ROLE_SUPPORT))])
-async def ticket_page(request: Request):
-    tickets = get_tickets()
+async def ticket_page(
+    request: Request,
+    status: str = "",
+    category: str = "",
+    user: str = "",
+    date_from: str = "",
+    date_to: str = "",
+    sort: str = "newest",
+    after: str = "",
+    before: str = "",
+):
+    # Gefiltert/sortiert/paginiert über tickets/index.db statt die ganze tickets.json zu laden
+    filters = {
+        "status": status, "category": category, "user": user.strip(),
+        "date_from": date_from, "date_to": date_to, "sort": sort,
+    }
+    result = await run_in_threadpool(
+        ticket_index.query, **{k: v or None for k, v in filters.items()}, after=after or None, before=before or None,
+        guild=selected_guild(request),
+    )
     return templates.TemplateResponse("tickets.html", {
         "request": request,
-        "tickets": tickets,
+        "tickets": result["tickets"],
+        "result": result,
+        "filters": filters,
+        "filter_query": urlencode({k: v for k, v in filters.items() if v}),
         "settings": load_settings()
     })
 
 
+@app.get("/admin/tickets/search", response_class=HTMLResponse, dependencies=[Depends(require_role(ROLE_ADMIN, ROLE_SUPPORT))])
+async def ticket_search_page(request: Request, q: str = "", kind: str = "", page: int = 1):
+    per_page = 20
+    page = max(page, 1)
+    results, total = await run_in_threadpool(ticket_search.search, q, kind or None, page, per_page)
+    return templates.TemplateResponse("ticket_search.html", {
+        "request": request,
+        "q": q,
+        "kind": kind,
+        "results": results,
+        "total": total,
+        "count_limit": ticket_search.COUNT_LIMIT,
+        "page": page,
+        "pages": max(1, -(-total // per_page)),
+    })
+
+
+@app.get("/admin/tickets/analytics", dependencies=[Depends(require_role(ROLE_ADMIN, ROLE_SUPPORT))])
+async def ticket_analytics_page(request: Request, format: str = "html"):
+    # Liest nur die vom Bot gepflegten Aggregate (logs/ticket_analytics.json), kein Log-Replay
+    data = await run_in_threadpool(lambda: ticket_analytics.summary(ticket_analytics.load()))
+    if format == "json":
+        return JSONResponse(data)
+    return templates.TemplateResponse("ticket_analytics.html", {
+        "request": request,
+        "data": data,
+        "settings": load_settings(),
+    })
+
+
+@app.get("/admin/events", dependencies=[Depends(require_role(ROLE_ADMIN, ROLE_SUPPORT))])
+async def event_log_page(request: Request, channel_id: str = "", user_id: str = "", event_type: str = "",
+                         since: str = "", until: str = "", cursor: str = "", format: str = "html"):
+    filters = {"channel_id": channel_id.strip(), "user_id": user_id.strip(), "event_type": event_type,
+               "since": since, "until": until}
+    # Liest nur die Tagespartitionen im Zeitraum (logs/events/), nie das ganze Log
+    result = await run_in_threadpool(
+        event_store.page_events, **{k: v or None for k, v in filters.items()}, cursor=cursor or None
+    )
+    if format == "json":
+        return JSONResponse(result)
+    return templates.TemplateResponse("events.html", {
+        "request": request,
+        "result": result,
+        "filters": filters,
+        "filter_query": urlencode({k: v for k, v in filters.items() if v}),
+        "settings": load_settings(),
+    })
+
+
+@app.get("/admin/tickets/{ticket_id}", response_class=HTMLResponse, dependencies=[Depends(require_role(ROLE_ADMIN, ROLE_SUPPORT))])
+async def ticket_detail_page(request: Request, ticket_id: str):
+    ticket = next((t for t in get_tickets() if str(t.get("ticket_id", t.get("id"))) == ticket_id), None)
+    if ticket is None:
+        raise HTTPException(status_code=404, detail="Ticket nicht gefunden")
+    # Transkript kommt aus transcripts/ (vom Bot beim Schließen archiviert), nicht von Discord
+    transcript = await run_in_threadpool(read_transcript, ticket_id)
+    return templates.TemplateResponse("ticket_detail.html", {
+        "request": request,
+        "user": request.session.get("username"),
+        "ticket": ticket,
+        "transcript": transcript,
+        "transcript_state": load_transcript_state(ticket_id),
+    })
+
+
+@app.get("/admin/tickets/{ticket_id}/transcript", dependencies=[Depends(require_role(ROLE_ADMIN, ROLE_SUPPORT))])
+async def ticket_transcript_download(ticket_id: str):
+    path = transcript_archive_path(ticket_id)
+    if not ticket_id.isdigit() or not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Kein Transkript vorhanden")
+    return FileResponse(path, media_type="application/gzip", filename=f"ticket-{ticket_id}.jsonl.gz")
+
+
 @app.get("/admin/training", response_class=HTMLResponse)
 async def training_page(request: Request):
     tickets = get_tickets()
@@ -457,13 +633,16 @@ async def absences_add(
     reason: str = Form("")
 ):
     submitted_by = request.session.get("username", "Adminpanel")
-    add_absence(user_display=user_display, start_date=start_date, end_date=end_date, reason=reason, submitted_by=submitted_by)
+    item = add_absence(user_display=user_display, start_date=start_date, end_date=end_date, reason=reason, submitted_by=submitted_by)
+    # Bot postet sofort statt beim nächsten Durchlauf
+    await ipc.publish(ipc.ABSENCES_CHANGED, {"added": (item or {}).get("id")})
     return RedirectResponse(url="/admin/absences", status_code=HTTP_302_FOUND)
 
 
 @app.post("/admin/absences/delete/{absence_id}", dependencies=[Depends(require_role(ROLE_ADMIN, ROLE_SUPPORT))])
 async def absences_delete_route(absence_id: int):
-    delete_absence(absence_id)
+    if delete_absence(absence_id):
+        await ipc.publish(ipc.ABSENCES_CHANGED, {"deleted": absence_id})
     return RedirectResponse(url="/admin/absences", status_code=HTTP_302_FOUND)
 
 
@@ -508,7 +687,7 @@ async def create_user(
         request.session["flash_error"] = f"Ungültige Rolle: {role}. Erlaubt: {', '.join(valid_roles)}"
         return RedirectResponse(url="/admin/users", status_code=HTTP_302_FOUND)
 
-    hashed = bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+    hashed = hash_password(password)
     user = User(username=username, password_hash=hashed, discord_id=discord_id or "", role=RoleEnum(role))
     db.add(user)
     try:
@@ -518,6 +697,7 @@ async def create_user(
         request.session["flash_error"] = "Anlegen fehlgeschlagen: UNIQUE-Verletzung."
         return RedirectResponse(url="/admin/users", status_code=HTTP_302_FOUND)
 
+    await ipc.publish(ipc.USERS_CHANGED, {"user_id": user.id})
     request.session["flash_success"] = f"Benutzer '{username}' wurde angelegt."
     return RedirectResponse(url="/admin/users", status_code=HTTP_302_FOUND)
 
@@ -572,7 +752,7 @@ async def edit_user(
     user.discord_id = (discord_id or "").strip()
 
     if new_password:
-        user.password_hash = bcrypt.hashpw(new_password.encode(), bcrypt.gensalt()).decode()
+        user.password_hash = hash_password(new_password)
 
     try:
         db.commit()
@@ -581,6 +761,7 @@ async def edit_user(
         request.session["flash_error"] = "Änderung fehlgeschlagen (Datenbankfehler)."
         return RedirectResponse(url=f"/admin/users/edit/{user_id}", status_code=HTTP_302_FOUND)
 
+    await ipc.publish(ipc.USERS_CHANGED, {"user_id": user_id})
     request.session["flash_success"] = f"Benutzer '{username}' wurde aktualisiert."
     return RedirectResponse(url="/admin/users", status_code=HTTP_302_FOUND)
 
@@ -605,6 +786,7 @@ async def delete_user(user_id: int, request: Request, db: Session = Depends(get_
         request.session["flash_error"] = "Löschen fehlgeschlagen (Datenbankfehler)."
         return RedirectResponse(url="/admin/users", status_code=HTTP_302_FOUND)
 
+    await ipc.publish(ipc.USERS_CHANGED, {"user_id": user_id})
     request.session["flash_success"] = f"Benutzer '{user.username}' wurde gelöscht."
     return RedirectResponse(url="/admin/users", status_code=HTTP_302_FOUND)
 
@@ -622,12 +804,14 @@ async def keys_page(request: Request):
 async def keys_create(request: Request, note: str = Form("")):
     created_by = request.session.get("username", "system")
     create_invite_key(created_by=created_by, note=note)
+    await ipc.publish(ipc.INVITE_KEYS_CHANGED)
     return RedirectResponse(url="/admin/keys", status_code=HTTP_302_FOUND)
 
 
 @app.post("/admin/keys/revoke", dependencies=[Depends(require_role(ROLE_ADMIN, ROLE_SUPPORT))])
 async def keys_revoke(request: Request, code: str = Form(...)):
-    revoke_invite_key(code)
+    if revoke_invite_key(code):
+        await ipc.publish(ipc.INVITE_KEYS_CHANGED)
     return RedirectResponse(url="/admin/keys", status_code=HTTP_302_FOUND)
 
 
@@ -680,6 +864,7 @@ async def admin_upload_user_document(
     content = await file.read()
     with open(dest_path, "wb") as f:
         f.write(content)
+    DOCUMENT_BYTES.labels(direction="upload").inc(len(content))
 
     doc = Document(
         user_id=user.id,
@@ -752,6 +937,8 @@ async def download_document(
     if not os.path.exists(file_path):
         raise HTTPException(status_code=404, detail="Datei nicht mehr vorhanden")
 
+    DOCUMENT_BYTES.labels(direction="download").inc(os.path.getsize(file_path))
+
     return FileResponse(
         file_path,
         media_type=doc.content_type or "application/octet-stream",
@@ -759,6 +946,21 @@ async def download_document(
     )
 
 
+# -----------------------
+# Metriken (Prometheus)
+# -----------------------
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics_endpoint(request: Request):
+    # Eingeloggte Admins, Scraper mit METRICS_TOKEN oder (opt-in) localhost
+    auth = request.headers.get("Authorization", "")
+    token_ok = bool(METRICS_TOKEN) and hmac.compare_digest(auth, f"Bearer {METRICS_TOKEN}")
+    client_host = request.client.host if request.client else ""
+    local_ok = METRICS_ALLOW_LOCAL and client_host in LOCAL_HOSTS
+    if not (token_ok or local_ok or user_has_any_role(request, ROLE_ADMIN)):
+        raise HTTPException(status_code=403, detail="Kein Zugriff")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
 # --- GitHub-Webhook / Update ---
 WEBHOOK_SECRET = b"supersecretwebhook"
 
@@ -775,18 +977,60 @@ async def update_code(request: Request):
     body = await request.body()
     if not signature or not verify_signature(body, signature):
         return {"status": "error", "message": "Invalid signature"}
-    try:
-        result = subprocess.run(
-            ["cmd", "/c", "git fetch --all && git reset --hard origin/main && git submodule update --init --recursive"],
-            cwd="C:/Users/Administrator/discord_bot",
-            capture_output=True,
-            text=True,
-            timeout=20
-        )
-        return {"status": "success", "stdout": result.stdout, "stderr": result.stderr}
-    except subprocess.TimeoutExpired:
-        return {"status": "error", "message": "git pull timed out"}
+    # git läuft im Hintergrund (utils/self_update.py) – der Server blockiert nicht
+    job = self_update.enqueue()
+    return JSONResponse(
+        {"status": "accepted", **job, "log": f"/admin/updates/{job['job_id']}/log"},
+        status_code=202,
+    )
+
+
+@app.get("/admin/updates/{job_id}", dependencies=[Depends(require_role(ROLE_ADMIN))])
+async def update_status(job_id: str):
+    status = await run_in_threadpool(self_update.job_status, job_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="Update-Job nicht gefunden")
+    return JSONResponse(status)
+
+
+@app.get("/admin/updates/{job_id}/log", dependencies=[Depends(require_role(ROLE_ADMIN))])
+async def update_log(job_id: str):
+    # Live wie tail -f, bis der Job fertig ist
+    if not os.path.exists(self_update.log_path(job_id)):
+        raise HTTPException(status_code=404, detail="Update-Job nicht gefunden")
+    return StreamingResponse(self_update.follow_log(job_id), media_type="text/plain; charset=utf-8")
 
 
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Webpanel")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=int(os.environ.get("WEB_WORKERS", 0)),
+                        help="Produktivbetrieb: Anzahl Worker-Prozesse (ohne Reload); 0 = Entwicklung mit Reload")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Import- und Init-Zeiten ausgeben und beenden")
+    args = parser.parse_args()
+    if args.profile_startup:
+        import asyncio
+
+        async def _run_lifespan():
+            async with app.router.lifespan_context(app):
+                pass
+
+        asyncio.run(_run_lifespan())
+        startup_profile.print_report("main")
+        raise SystemExit(0)
+
+    if args.workers:
+        # Alle Datei-Stores sind über utils/file_lock prozessübergreifend abgesichert;
+        # nach einem Self-Update werden die Worker nacheinander ersetzt
+        self_update.run_workers("main:app", host=args.host, port=args.port, workers=args.workers)
+    else:
+        import uvicorn  # nur zum Starten nötig, nicht beim Import (Tests, run_all.py)
+
+        # Der Reloader startet den Worker bei jeder .py-Änderung neu – auch mitten
+        # im Self-Update. git daher in einem eigenen Prozess ausführen
+        os.environ[self_update.DETACH_ENV] = "1"
+        uvicorn.run("main:app", host=args.host, port=args.port, reload=True)
@@ -7,6 +7,8 @@ from fastapi.responses import RedirectResponse
 from fastapi.templating import Jinja2Templates
 from starlette import status
 from utils.auth import require_role, require_login, ROLE_ADMIN, ROLE_SUPPORT, ROLE_USER
+from utils.metrics import track_store
+from utils import file_lock
 import os, json
 from datetime import datetime
 
@@ -24,6 +26,7 @@ HEADERS_FILE = os.path.join(UTILS_DIR, "member_headers.json")
 PLAYERS_FILE = os.path.join(UTILS_DIR, "players.json")
 
 # ------- Helpers -------
+@track_store("member_form", "load")
 def _load_json(path: str, default):
     if not os.path.exists(path):
         return default
@@ -33,9 +36,9 @@ def _load_json(path: str, default):
     except Exception:
         return default
 
+@track_store("member_form", "save")
 def _save_json(path: str, data) -> None:
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    file_lock.write_json(path, data, ensure_ascii=False, indent=2)
 
 def load_headers():
     return _load_json(HEADERS_FILE, [])
@@ -48,10 +51,11 @@ def load_submissions():
     return _load_json(DATA_FILE, [])
 
 def add_submission(entry: dict) -> None:
-    items = load_submissions()
-    entry["id"] = len(items) + 1
-    items.append(entry)
-    _save_json(DATA_FILE, items)
+    with file_lock.locked(DATA_FILE):
+        items = load_submissions()
+        entry["id"] = len(items) + 1
+        items.append(entry)
+        _save_json(DATA_FILE, items)
 
 def _to_float(v):
     try:
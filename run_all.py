@@ -0,0 +1,91 @@
+# run_all.py
+# -*- coding: utf-8 -*-
+"""
+Optionaler Ein-Prozess-Betrieb: Discord-Bot und Webpanel in einem Event-Loop.
+
+    python run_all.py [--host 0.0.0.0] [--port 8000]
+
+Gegenüber ``python bot.py`` + ``python main.py`` teilen sich beide Seiten hier
+Prozess-Caches (Settings/Keys/Abwesenheiten über utils/file_lock, Ticket-Index,
+Metrik-Registry – /metrics zeigt Bot und Web zusammen) und Web-Änderungen gehen
+ohne Socket direkt als ``on_ipc_<topic>`` an die Cogs. Die Datei-Stores bleiben
+die Quelle, d.h. die Zwei-Prozess-Variante funktioniert weiterhin parallel dazu:
+der IPC-Socket läuft auch hier (für ein separates ``main.py --workers``), und
+``logs/ipc_spool.jsonl`` wird nach dem Login wie in bot.py zugestellt.
+
+Blockierende Web-Handler (bcrypt, Datei-I/O) bremsen hier auch den Bot – für
+viele Web-Nutzer bleibt ``main.py --workers N`` + ``bot.py`` die bessere Wahl.
+
+Strg+C / SIGTERM beendet erst den Webserver (laufende Requests dürfen fertig
+werden), dann den Bot, danach werden offene Hintergrund-Schreibvorgänge geleert.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import logging
+import signal
+
+import uvicorn
+
+import bot as bot_process
+import main as web
+from utils import async_storage, ipc, ticket_analytics
+from utils.loop_watchdog import maybe_start_watchdog
+
+log = logging.getLogger("run_all")
+
+
+class _WebServer(uvicorn.Server):
+    @contextlib.contextmanager
+    def capture_signals(self):
+        # uvicorn würde das Signal nach dem Herunterfahren erneut auslösen und damit
+        # das Beenden des Bots abbrechen – run() setzt die Handler selbst.
+        yield
+
+
+async def run(host: str, port: int) -> None:
+    client = bot_process.bot
+    server = _WebServer(uvicorn.Config(web.app, host=host, port=port, log_level="info"))
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, server.handle_exit)
+
+    async with client:
+        maybe_start_watchdog("bot", bot_process.config.get("loop_watchdog"))
+        await bot_process.load_cogs()
+        # Wie bot.py: erst nach dem Login zustellen, vorher (und offline) Gespooltes nachliefern
+        ipc_server = ipc.IPCServer(lambda topic, payload: client.dispatch(f"ipc_{topic}", payload), ready=False)
+        await ipc_server.start()
+        ipc.set_local_handler(ipc_server.accept)
+
+        async def open_ipc():
+            await client.wait_until_ready()
+            await ipc_server.open()
+        ipc_task = asyncio.create_task(open_ipc())
+
+        bot_task = asyncio.create_task(client.start(bot_process.token))
+        # Stirbt der Bot (z.B. ungültiges Token), auch den Webserver beenden
+        bot_task.add_done_callback(lambda _: setattr(server, "should_exit", True))
+        try:
+            await server.serve()
+        finally:
+            ipc.set_local_handler(None)
+            ipc_task.cancel()
+            await ipc_server.stop()
+            await client.close()
+            with contextlib.suppress(asyncio.CancelledError, Exception):
+                await bot_task
+            await async_storage.drain()
+            ticket_analytics.flush()
+            log.info("👋 Bot und Webpanel beendet")
+        if bot_task.done() and not bot_task.cancelled() and bot_task.exception():
+            raise bot_task.exception()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bot + Webpanel in einem Prozess")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+    log.info("=== STARTE Bot + Webpanel (ein Prozess) ===")
+    asyncio.run(run(args.host, args.port))
@@ -0,0 +1,45 @@
+import sys
+
+import pytest
+
+from cogs import cog_reloader
+
+
+def test_reload_plan_follows_importers_in_dependency_order():
+    graph = cog_reloader.import_graph()
+    extensions = ["cogs.ticket_button_category_flow", "cogs.ticket_assignment",
+                  "cogs.ticket_category_button", "cogs.ticket_timers", "cogs.perf_monitor"]
+
+    modules, cogs, restart = cog_reloader.reload_plan(["utils.ticket_claim_close"], extensions, graph)
+    assert modules == ["utils.ticket_claim_close"]
+    assert set(cogs) == {"cogs.ticket_button_category_flow", "cogs.ticket_assignment",
+                         "cogs.ticket_category_button", "cogs.ticket_timers"}
+    # ticket_assignment importiert aus ticket_button_category_flow → danach
+    assert cogs.index("cogs.ticket_button_category_flow") < cogs.index("cogs.ticket_assignment")
+    assert restart == []
+
+    # Zustandsbehaftete Module nur per Neustart, ihre Importeure bleiben unberührt
+    modules, cogs, restart = cog_reloader.reload_plan(["utils.ticket_storage"], extensions, graph)
+    assert (modules, cogs, restart) == ([], [], ["utils.ticket_storage"])
+
+    # Der Reloader würde beim Entladen seinen eigenen Watcher-Task abbrechen
+    plan = cog_reloader.reload_plan(["cogs.cog_reloader"], extensions + ["cogs.cog_reloader"], graph)
+    assert plan == ([], [], ["cogs.cog_reloader"])
+
+
+def test_reload_module_rolls_back_on_error(tmp_path, monkeypatch):
+    (tmp_path / "hot_demo.py").write_text("VALUE = 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    import hot_demo
+
+    try:
+        (tmp_path / "hot_demo.py").write_text("VALUE = 2\nNEW = True\n")
+        cog_reloader.reload_module("hot_demo")
+        assert (hot_demo.VALUE, hot_demo.NEW) == (2, True)
+
+        (tmp_path / "hot_demo.py").write_text("VALUE = 3\nraise RuntimeError('kaputt')\n")
+        with pytest.raises(RuntimeError):
+            cog_reloader.reload_module("hot_demo")
+        assert (hot_demo.VALUE, hot_demo.NEW) == (2, True)
+    finally:
+        sys.modules.pop("hot_demo", None)
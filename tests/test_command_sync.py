@@ -0,0 +1,56 @@
+import asyncio
+
+import discord
+from discord import app_commands
+
+from utils import command_sync
+
+
+class _FakeBot:
+    def __init__(self):
+        self.application_id = 42
+        self.tree = app_commands.CommandTree(discord.Client(intents=discord.Intents.none()))
+        self.syncs = 0
+
+        async def sync(guild=None):
+            self.syncs += 1
+            return self.tree.get_commands(guild=guild)
+
+        self.tree.sync = sync
+
+
+def _add(tree, name, description="Test"):
+    async def callback(interaction: discord.Interaction):
+        pass
+    tree.add_command(app_commands.Command(name=name, description=description, callback=callback))
+
+
+def test_hash_is_stable_and_tracks_changes():
+    bot = _FakeBot()
+    _add(bot.tree, "perf")
+    _add(bot.tree, "kategorie")
+    first = command_sync.tree_hash(bot.tree)
+
+    other = _FakeBot()
+    _add(other.tree, "kategorie")
+    _add(other.tree, "perf")
+    assert command_sync.tree_hash(other.tree) == first  # Reihenfolge egal
+
+    bot.tree.remove_command("perf")
+    _add(bot.tree, "perf", description="Neu")
+    assert command_sync.tree_hash(bot.tree) != first
+
+
+def test_sync_only_when_tree_changed(tmp_path, monkeypatch):
+    monkeypatch.setattr(command_sync, "STATE_FILE", str(tmp_path / "command_sync.json"))
+    bot = _FakeBot()
+    _add(bot.tree, "perf")
+
+    assert asyncio.run(command_sync.sync_if_changed(bot)) is True
+    assert asyncio.run(command_sync.sync_if_changed(bot)) is False
+    assert bot.syncs == 1
+
+    _add(bot.tree, "reload")
+    assert asyncio.run(command_sync.sync_if_changed(bot)) is True
+    assert asyncio.run(command_sync.sync_if_changed(bot, force=True)) is True
+    assert bot.syncs == 3
@@ -0,0 +1,47 @@
+import gzip
+import json
+from datetime import date
+
+from utils import event_store
+
+
+def _event(time, kind="ticket_claimed", channel=1, user=10):
+    return {"time": time, "event_type": kind, "data": {"channel_id": channel, "user_id": user}}
+
+
+def test_query_pages_and_compaction(tmp_path, monkeypatch):
+    monkeypatch.setattr(event_store, "EVENTS_DIR", str(tmp_path / "events"))
+    for day in ("2025-01-30", "2025-01-31", "2025-02-01"):
+        for minute in range(60):
+            event_store.append(_event(f"{day}T10:{minute:02d}:00", channel=minute % 3, user=100 + minute % 2))
+
+    window = list(event_store.query_events(channel_id=1, since="2025-01-31T10:30:00", until="2025-01-31"))
+    assert [e["time"][-5:] for e in window] == [f"{m:02d}:00" for m in range(31, 60, 3)]
+
+    seen, cursor = [], None
+    while True:
+        page = event_store.page_events(user_id=101, since="2025-01-31", cursor=cursor, limit=7)
+        seen += page["events"]
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+    assert len(seen) == 60 and len({e["time"] for e in seen}) == 60
+
+    stats = event_store.compact(archive_after_days=0, today=date(2025, 2, 2))
+    assert stats["archived_months"] == 1 and stats["archived_days"] == 2
+    with gzip.open(tmp_path / "events" / "2025-01.jsonl.gz", "rt", encoding="utf-8") as f:
+        assert sum(1 for _ in f) == 120
+    archived = list(event_store.query_events(event_type="ticket_claimed", since="2025-01-31T10:58:00", until="2025-02-01T10:00:30"))
+    assert [e["time"] for e in archived] == ["2025-01-31T10:58:00", "2025-01-31T10:59:00", "2025-02-01T10:00:00"]
+
+
+def test_migrate_legacy(tmp_path, monkeypatch):
+    monkeypatch.setattr(event_store, "EVENTS_DIR", str(tmp_path / "events"))
+    monkeypatch.setattr(event_store, "LEGACY_FILE", str(tmp_path / "ticket_events.json"))
+    (tmp_path / "ticket_events.json").write_text(json.dumps([_event("2025-03-02T08:00:00"), _event("2025-03-01T09:00:00")]))
+    event_store.append(_event("2025-03-02T07:00:00", kind="ticket_created"))
+
+    assert event_store.migrate_legacy() == 2
+    assert [e["time"] for e in event_store.iter_all()] == [
+        "2025-03-01T09:00:00", "2025-03-02T07:00:00", "2025-03-02T08:00:00"]
+    assert event_store.migrate_legacy() == 0
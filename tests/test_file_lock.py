@@ -0,0 +1,70 @@
+import multiprocessing
+import threading
+
+from utils import absence_storage, file_lock, invite_keys
+
+WORKERS = 4
+PER_WORKER = 25
+
+
+def _submit_absences(path, worker):
+    absence_storage.ABSENCE_FILE = path
+    for i in range(PER_WORKER):
+        absence_storage.add_absence(f"worker{worker}", "2025-03-01", "2025-03-02", f"#{i}")
+
+
+def _redeem(path, code, results):
+    invite_keys.INVITE_FILE = path
+    results.put(invite_keys.mark_used(code, "x"))
+
+
+def test_concurrent_processes_lose_no_writes(tmp_path):
+    path = str(tmp_path / "absences.json")
+    procs = [multiprocessing.Process(target=_submit_absences, args=(path, w)) for w in range(WORKERS)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join(60)
+        assert p.exitcode == 0
+
+    data = file_lock.read_json(path)
+    assert len(data["items"]) == WORKERS * PER_WORKER
+    assert sorted(it["id"] for it in data["items"]) == list(range(1, WORKERS * PER_WORKER + 1))
+
+
+def test_invite_key_redeemed_once(tmp_path, monkeypatch):
+    path = str(tmp_path / "invite_keys.json")
+    monkeypatch.setattr(invite_keys, "INVITE_FILE", path)
+    invite_keys.create_key("admin", code="ABC")
+
+    results = multiprocessing.Queue()
+    procs = [multiprocessing.Process(target=_redeem, args=(path, "ABC", results)) for _ in range(WORKERS)]
+    for p in procs:
+        p.start()
+    outcomes = [results.get(timeout=60) for _ in procs]
+    for p in procs:
+        p.join(60)
+    assert outcomes.count(True) == 1
+
+
+def test_cached_read_sees_other_writer_and_lock_is_reentrant(tmp_path):
+    path = str(tmp_path / "settings.json")
+    file_lock.write_json(path, {"a": 1})
+    assert file_lock.read_json(path, cached=True) == {"a": 1}
+
+    done = []
+
+    def other_thread():
+        with file_lock.locked(path):
+            done.append(1)
+
+    with file_lock.locked(path):
+        with file_lock.locked(path):
+            t = threading.Thread(target=other_thread)
+            t.start()
+            t.join(0.2)
+            assert not done  # anderer Thread wartet
+        file_lock.write_json(path, {"a": 2})
+    t.join(5)
+    assert done
+    assert file_lock.read_json(path, cached=True) == {"a": 2}
@@ -0,0 +1,51 @@
+from types import SimpleNamespace
+
+from utils import guild_config, ticket_counter, ticket_index, ticket_storage
+
+
+def test_guild_partition_overrides_global_defaults():
+    data = {"welcome_text": "Hallo", "ticket_categories": ["Support"]}
+    guild_config.update_guild(data, 123, {"ticket_categories": ["Technik"]})
+    guild_config.update_guild(data, None, {"welcome_text": "Moin"})
+
+    assert guild_config.for_guild(data, 123) == {"welcome_text": "Moin", "ticket_categories": ["Technik"]}
+    assert guild_config.for_guild(data, "456") == {"welcome_text": "Moin", "ticket_categories": ["Support"]}
+    assert "guilds" not in guild_config.for_guild(data, None)
+
+
+def test_guild_counters_and_role_caches(tmp_path, monkeypatch):
+    monkeypatch.setattr(ticket_counter, "TICKET_COUNTER_FILE", str(tmp_path / "ticket_counter.txt"))
+    monkeypatch.setattr(ticket_counter, "GUILD_COUNTER_DIR", str(tmp_path / "counters"))
+    (tmp_path / "ticket_counter.txt").write_text("41")
+
+    # Erste Guild zählt beim bisherigen globalen Stand weiter, weitere Guilds beginnen bei 1
+    assert ticket_counter.get_next_guild_ticket_number(1) == 42
+    assert ticket_counter.get_next_guild_ticket_number(2) == 1
+    assert ticket_counter.get_next_guild_ticket_number(1) == 43
+    assert ticket_counter.get_next_ticket_number() == 42
+
+    monkeypatch.setattr(guild_config, "ROLES_CACHE_DIR", str(tmp_path / "roles"))
+    monkeypatch.setattr(guild_config, "GUILD_REGISTRY_FILE", str(tmp_path / "guilds.json"))
+    guild_config.register_guilds([SimpleNamespace(id=1, name="A"), SimpleNamespace(id=2, name="B")], replace=True)
+    guild_config.write_roles(1, [{"id": 10, "name": "Admin"}])
+    guild_config.write_roles(2, [{"id": 20, "name": "Mod"}])
+    assert guild_config.read_roles(2) == [{"id": 20, "name": "Mod"}]
+    assert {r["id"] for r in guild_config.read_roles()} == {10, 20}
+
+    guild_config.forget_guild(2)
+    assert guild_config.known_guilds() == {"1": "A"}
+    assert guild_config.read_roles(2) == []
+
+
+def test_ticket_index_filters_by_guild(tmp_path, monkeypatch):
+    monkeypatch.setattr(ticket_storage, "TICKETS_FILE", str(tmp_path / "tickets.json"))
+    monkeypatch.setattr(ticket_index, "INDEX_DB", str(tmp_path / "index.db"))
+    monkeypatch.setattr(ticket_storage, "_write_listeners", [ticket_index.upsert])
+
+    ticket_storage.save_ticket({"ticket_id": 1, "channel_id": 101, "status": "offen"})  # Altbestand
+    ticket_storage.save_ticket({"ticket_id": 2, "channel_id": 102, "status": "offen", "guild_id": 7})
+    ticket_storage.save_ticket({"ticket_id": 3, "channel_id": 103, "status": "offen", "guild_id": 8})
+
+    assert [t["ticket_id"] for t in ticket_index.query(guild="7", sort="id_asc")["tickets"]] == [1, 2]
+    assert [t["ticket_id"] for t in ticket_storage.get_guild_tickets(8)] == [3, 1]
+    assert [t["ticket_id"] for t in ticket_storage.get_guild_tickets(8, include_legacy=False)] == [3]
@@ -0,0 +1,68 @@
+import asyncio
+
+from utils import ipc
+
+
+def test_publish_delivers_or_spools(tmp_path, monkeypatch):
+    monkeypatch.setattr(ipc, "SPOOL_FILE", str(tmp_path / "spool.jsonl"))
+    monkeypatch.setenv("BOT_IPC_ADDRESS", "127.0.0.1:0")
+
+    async def scenario():
+        received = []
+        # Bot offline → Nachrichten landen im Spool
+        monkeypatch.setenv("BOT_IPC_ADDRESS", "127.0.0.1:1")
+        assert await ipc.publish(ipc.SETTINGS_CHANGED) is False
+        assert await ipc.publish(ipc.ABSENCES_CHANGED, {"added": 7}) is False
+
+        server = ipc.IPCServer(lambda topic, payload: received.append((topic, payload)))
+        monkeypatch.setenv("BOT_IPC_ADDRESS", "127.0.0.1:0")
+        await server.start()
+        port = server._server.sockets[0].getsockname()[1]
+        assert received == [(ipc.SETTINGS_CHANGED, {}), (ipc.ABSENCES_CHANGED, {"added": 7})]
+
+        monkeypatch.setenv("BOT_IPC_ADDRESS", f"127.0.0.1:{port}")
+        assert await ipc.publish(ipc.USERS_CHANGED, {"user_id": 3}) is True
+        assert received[-1] == (ipc.USERS_CHANGED, {"user_id": 3})
+        await server.stop()
+
+    asyncio.run(scenario())
+    assert not (tmp_path / "spool.jsonl").exists()
+
+
+def test_server_holds_messages_until_open(tmp_path, monkeypatch):
+    spool = tmp_path / "spool.jsonl"
+    monkeypatch.setattr(ipc, "SPOOL_FILE", str(spool))
+    monkeypatch.setenv("BOT_IPC_ADDRESS", "127.0.0.1:1")
+
+    async def scenario():
+        received = []
+        assert await ipc.publish(ipc.ABSENCES_CHANGED, {"added": 1}) is False
+
+        # Bot noch nicht eingeloggt: annehmen, aber nicht zustellen und den Spool behalten
+        server = ipc.IPCServer(lambda topic, payload: received.append((topic, payload)), ready=False)
+        monkeypatch.setenv("BOT_IPC_ADDRESS", "127.0.0.1:0")
+        await server.start()
+        port = server._server.sockets[0].getsockname()[1]
+        monkeypatch.setenv("BOT_IPC_ADDRESS", f"127.0.0.1:{port}")
+        assert await ipc.publish(ipc.ABSENCES_CHANGED, {"added": 2}) is True
+        server.accept(ipc.ABSENCES_CHANGED, {"added": 3})  # run_all.py: lokal, ohne Socket
+        assert received == [] and len(spool.read_text().splitlines()) == 3
+
+        await server.open()
+        assert received == [(ipc.ABSENCES_CHANGED, {"added": n}) for n in (1, 2, 3)]
+        server.accept(ipc.USERS_CHANGED, {})
+        assert received[-1] == (ipc.USERS_CHANGED, {})
+        await server.stop()
+
+    asyncio.run(scenario())
+    assert not spool.exists()
+
+
+def test_ack_keeps_lines_appended_during_delivery(tmp_path, monkeypatch):
+    monkeypatch.setattr(ipc, "SPOOL_FILE", str(tmp_path / "spool.jsonl"))
+    ipc._spool({"topic": "a"})
+    messages, lines = ipc.read_spool()
+    ipc._spool({"topic": "b"})  # kommt während der Zustellung dazu
+    ipc.ack_spool(lines)
+    assert messages == [{"topic": "a"}]
+    assert ipc.read_spool() == ([{"topic": "b"}], 1)
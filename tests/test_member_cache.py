@@ -0,0 +1,52 @@
+import asyncio
+
+import discord
+
+from utils.member_cache import MemberCache
+
+GUILD_ID, BOT_ID = 1000, 999
+
+
+def _member_data(uid):
+    return {"user": {"id": str(uid), "username": f"u{uid}", "discriminator": "0", "avatar": None},
+            "roles": [], "joined_at": None, "deaf": False, "mute": False, "flags": 0}
+
+
+def _guild(cache: MemberCache):
+    intents = discord.Intents.default()
+    intents.members = True
+    client = discord.Client(intents=intents, **cache.client_options())
+    state = client._connection
+    state.user = discord.ClientUser(state=state, data={**_member_data(BOT_ID)["user"], "bot": True})
+    guild = discord.Guild(state=state, data={
+        "id": str(GUILD_ID), "name": "g", "member_count": 10, "members": [_member_data(BOT_ID)],
+        "roles": [], "channels": [], "emojis": [], "stickers": [], "features": [],
+    })
+    return guild, state
+
+
+def test_bounded_cache_keeps_staff_and_recent_users():
+    cache = MemberCache()
+    cache.configure({"member_cache": {"mode": "bounded", "recent_size": 2}})
+    assert cache.client_options()["chunk_guilds_at_startup"] is False
+    guild, state = _guild(cache)
+    cache._pinned[GUILD_ID] = {1}
+
+    for uid in (1, 2, 3, 4):
+        cache.remember(discord.Member(data=_member_data(uid), guild=guild, state=state))
+    # 1 ist Staff (bleibt trotz Verdrängung), 2 ist der älteste Nutzer → raus
+    assert {m.id for m in guild.members} == {BOT_ID, 1, 3, 4}
+
+    # Treffer frischt den LRU auf: 3 wird jünger als 4, beim nächsten Nutzer fliegt 4
+    assert asyncio.run(cache.get_member(guild, 3)).id == 3
+    cache.remember(discord.Member(data=_member_data(5), guild=guild, state=state))
+    assert {m.id for m in guild.members} == {BOT_ID, 1, 3, 5}
+
+
+def test_full_mode_is_default_and_leaves_client_untouched():
+    cache = MemberCache()
+    cache.configure({})
+    assert cache.client_options() == {}
+    guild, state = _guild(cache)
+    cache.remember(discord.Member(data=_member_data(7), guild=guild, state=state))
+    assert guild.get_member(7) is None  # LRU nur im bounded-Modus
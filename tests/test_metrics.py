@@ -0,0 +1,50 @@
+from utils import metrics
+
+
+def test_histogram_render_is_cumulative():
+    hist = metrics.histogram("test_render_seconds", "Test", ("op",), buckets=(0.1, 1.0))
+    hist.labels(op="load").observe(0.05)
+    hist.labels(op="load").observe(0.5)
+    hist.labels(op="load").observe(5)
+
+    text = metrics.render()
+    assert 'test_render_seconds_bucket{op="load",le="0.1"} 1' in text
+    assert 'test_render_seconds_bucket{op="load",le="1"} 2' in text
+    assert 'test_render_seconds_bucket{op="load",le="+Inf"} 3' in text
+    assert 'test_render_seconds_count{op="load"} 3' in text
+
+
+def test_track_store_counts_calls():
+    @metrics.track_store("test_store", "load")
+    def load():
+        return 42
+
+    assert load() == 42
+    assert load() == 42
+    child = metrics.STORE_SECONDS.labels(store="test_store", op="load")
+    assert child.count == 2
+
+
+def test_rate_limit_counter_counts_each_429_once():
+    import asyncio
+    import logging
+
+    from utils import bot_telemetry
+
+    logger = logging.getLogger("test.discord.http")
+    logger.propagate = False
+    logger.addHandler(bot_telemetry._RateLimitCounter(level=logging.WARNING))
+    route = bot_telemetry.RATE_LIMITS.labels(scope="route")
+    glob = bot_telemetry.RATE_LIMITS.labels(scope="global")
+    before = (route.value, glob.value)
+
+    async def scenario():
+        # so loggt discord.http einen Routen- und einen globalen 429
+        logger.warning("We are being rate limited. %s %s responded with 429. Retrying in %.2f seconds.", "GET", "/a", 1)
+        await asyncio.sleep(0)
+        logger.warning("We are being rate limited. %s %s responded with 429. Retrying in %.2f seconds.", "GET", "/b", 1)
+        logger.warning("Global rate limit has been hit. Retrying in %.2f seconds.", 1)
+        await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+    assert (route.value - before[0], glob.value - before[1]) == (1, 1)
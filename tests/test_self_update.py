@@ -0,0 +1,94 @@
+import asyncio
+import subprocess
+
+from utils import ipc, self_update
+
+
+def git(cwd, *args):
+    subprocess.run(["git", "-c", "user.name=t", "-c", "user.email=t@t", *args],
+                   cwd=cwd, check=True, capture_output=True)
+
+
+def test_update_job_pulls_and_triggers_reloads(tmp_path, monkeypatch):
+    origin, clone = tmp_path / "origin", tmp_path / "clone"
+    origin.mkdir()
+    git(origin, "init", "-b", "main")
+    (origin / "cogs").mkdir()
+    (origin / "cogs" / "demo.py").write_text("A = 1\n")
+    git(origin, "add", ".")
+    git(origin, "commit", "-m", "eins")
+    git(tmp_path, "clone", str(origin), str(clone))
+
+    updates = tmp_path / "updates"
+    monkeypatch.setattr(self_update, "REPO_DIR", str(clone))
+    monkeypatch.setattr(self_update, "UPDATES_DIR", str(updates))
+    monkeypatch.setattr(self_update, "STATE_FILE", str(updates / "state.json"))
+    monkeypatch.setattr(self_update, "RELOAD_REQUEST_FILE", str(updates / "web_reload.request"))
+    reload_states = []
+    request_web_reload = self_update.request_web_reload
+
+    def record_reload():
+        # Neustart erst anfordern, wenn kein Job mehr läuft (sonst killt er den eigenen Worker)
+        reload_states.append(self_update.file_lock.read_json(self_update.STATE_FILE, {}))
+        request_web_reload()
+    monkeypatch.setattr(self_update, "request_web_reload", record_reload)
+    received = []
+    ipc.set_local_handler(lambda topic, payload: received.append((topic, payload)))
+
+    (origin / "cogs" / "demo.py").write_text("A = 2\n")
+    (origin / "main.py").write_text("")
+    git(origin, "add", ".")
+    git(origin, "commit", "-m", "zwei")
+
+    async def scenario():
+        first = self_update.enqueue()
+        second = self_update.enqueue()  # während des Laufs → nur vorgemerkt
+        assert first["queued"] is False
+        assert second == {"job_id": first["job_id"], "queued": True}
+        while self_update._tasks:
+            await asyncio.gather(*self_update._tasks)
+        return first["job_id"]
+
+    try:
+        job_id = asyncio.run(scenario())
+    finally:
+        ipc.set_local_handler(None)
+
+    status = self_update.job_status(job_id)
+    assert status["state"] == self_update.STATE_SUCCESS
+    assert (clone / "cogs" / "demo.py").read_text() == "A = 2\n"
+    assert received == [(ipc.CODE_UPDATED, {"files": ["cogs/demo.py"]})]
+    assert (updates / "web_reload.request").exists()  # main.py geändert
+    assert reload_states == [{"running": None, "pending": False}]
+    # Der vorgemerkte Folgejob lief danach und fand nichts mehr zu tun
+    logs = sorted(p.name for p in updates.glob("*.log"))
+    assert len(logs) == 2
+    assert self_update.job_status(logs[1][:-4])["state"] == self_update.STATE_SUCCESS
+
+
+def test_orphaned_job_is_restarted_instead_of_queued(tmp_path, monkeypatch):
+    updates = tmp_path / "updates"
+    monkeypatch.setattr(self_update, "UPDATES_DIR", str(updates))
+    monkeypatch.setattr(self_update, "STATE_FILE", str(updates / "state.json"))
+    started = []
+    monkeypatch.setattr(self_update, "_start", started.append)
+
+    # Worker ist mitten im Job gestorben (z.B. uvicorn-Reload durch git reset)
+    dead = subprocess.Popen(["git", "--version"], stdout=subprocess.DEVNULL)
+    dead.wait()
+    updates.mkdir()
+    (updates / "orphan.log").write_text("$ git fetch --all\n")
+    self_update.file_lock.write_json(self_update.STATE_FILE, {
+        **self_update._running_state("orphan", pid=dead.pid), "pending": True})
+
+    job_id = self_update.resume()
+    assert started == [job_id] and job_id != "orphan"
+    assert self_update.job_status("orphan")["state"] == self_update.STATE_FAILED
+    state = self_update.file_lock.read_json(self_update.STATE_FILE, {})
+    assert state["running"] == job_id and state["pending"] is False
+
+    # Besitzer lebt (dieser Prozess mit laufendem Task) → nur vormerken, nichts übernehmen
+    monkeypatch.setattr(self_update, "_tasks", {object()})
+    assert self_update.resume() is None
+    assert self_update.enqueue() == {"job_id": job_id, "queued": True}
+    assert started == [job_id]
@@ -0,0 +1,57 @@
+import random
+
+from utils import ticket_analytics
+from utils.ticket_analytics import QuantileSketch, TicketAnalytics
+
+
+def test_sketch_quantiles_within_accuracy_and_mergeable():
+    rng = random.Random(7)
+    values = [rng.expovariate(1 / 600) for _ in range(5000)]
+    a, b = QuantileSketch(), QuantileSketch()
+    for i, v in enumerate(values):
+        (a if i % 2 else b).add(v)
+    merged = QuantileSketch.from_dict(a.to_dict()).merge(b)
+
+    exact = sorted(values)
+    for q in (0.5, 0.9, 0.99):
+        expected = exact[int(q * (len(exact) - 1))]
+        assert abs(merged.quantile(q) - expected) / expected <= 0.02
+    assert merged.count == 5000
+
+
+def test_apply_events_and_summary(tmp_path):
+    def event(kind, minute, **data):
+        return {"time": f"2025-03-01T12:{minute:02d}:00", "event_type": kind, "data": {"channel_id": 1, **data}}
+
+    analytics = ticket_analytics.rebuild([
+        event("ticket_created", 0, category="Technik", created_at="2025-03-01T12:00:00"),
+        event("ticket_claimed", 10, username="Mod"),
+        event("ticket_closed", 30),
+        event("ticket_closed", 40),  # doppeltes Schließen zählt nicht
+    ])
+    path = str(tmp_path / "analytics.json")
+    analytics.save(path)
+    result = ticket_analytics.summary(ticket_analytics.load(path))
+
+    assert result["counts"]["created"] == {"Technik": 1} and result["counts"]["closed"] == {"Technik": 1}
+    assert abs(result["time_to_claim"]["supporter"]["Mod"]["p50"] - 600) < 6
+    assert abs(result["time_to_close"]["category"]["Technik"]["mean"] - 1800) < 1
+    assert result["open_tickets"] == 0 and result["by_hour_of_day"][12] == 1
+    assert isinstance(TicketAnalytics.from_dict(analytics.to_dict()), TicketAnalytics)
+
+
+def test_live_listener_saves_throttled_and_swallows_errors(tmp_path, monkeypatch):
+    path = tmp_path / "analytics.json"
+    monkeypatch.setattr(ticket_analytics, "ANALYTICS_FILE", str(path))
+    monkeypatch.setattr(ticket_analytics, "SAVE_INTERVAL", 3600)
+    monkeypatch.setattr(ticket_analytics, "_live", TicketAnalytics())
+    listener = ticket_analytics._safe(ticket_analytics._on_event)
+
+    for minute in range(3):
+        listener({"time": f"2025-03-01T12:0{minute}:00", "event_type": "ticket_created",
+                  "data": {"channel_id": minute + 1, "category": "Support"}})
+    assert not path.exists()  # noch nicht gespeichert, Timer läuft
+    listener(None)  # kaputter Eintrag → geloggt statt an log_ticket_event durchgereicht
+
+    ticket_analytics.flush()
+    assert ticket_analytics.load(str(path)).counts["created"] == {"Support": 3}
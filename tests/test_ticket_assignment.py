@@ -0,0 +1,24 @@
+from utils.ticket_assignment import AssignmentScheduler
+
+
+def test_least_loaded_round_robin_and_cap():
+    sched = AssignmentScheduler(cap=2)
+    sched.set_supporters([1, 2, 3], {"Technik": [3]})
+    for uid in (1, 2, 3):
+        sched.set_online(uid, True)
+    sched.rebuild_load([{"status": "offen", "claimed_by": 1}, {"status": "geschlossen", "claimed_by": 2}], "geschlossen")
+
+    # 2 und 3 haben Last 0 → Round-Robin, danach 1 (Last 1)
+    assert [sched.pick(), sched.pick()] == [2, 3]
+    assert sched.pick() == 1
+    assert sched.pick("Technik") == 3
+    assert sched.pick("Technik") is None
+    assert sched.pick() == 2
+    # alle am Limit
+    assert sched.pick() is None
+
+    sched.released(2)
+    sched.set_online(2, False)
+    assert sched.pick() is None
+    sched.set_online(2, True)
+    assert sched.pick() == 2
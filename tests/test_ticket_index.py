@@ -0,0 +1,34 @@
+from utils import ticket_index, ticket_storage
+
+
+def test_filters_counts_and_keyset_pagination(tmp_path, monkeypatch):
+    monkeypatch.setattr(ticket_storage, "TICKETS_FILE", str(tmp_path / "tickets.json"))
+    monkeypatch.setattr(ticket_index, "INDEX_DB", str(tmp_path / "index.db"))
+    monkeypatch.setattr(ticket_storage, "_write_listeners", [ticket_index.upsert])
+
+    for i in range(1, 8):
+        ticket_storage.save_ticket({
+            "ticket_id": i, "user": "Max" if i % 2 else "anna", "user_id": 100 + i, "channel_id": 1000 + i,
+            "category": "Technik" if i <= 3 else "Support", "status": "offen",
+            "created_at": f"2025-03-0{i}T12:00:00",
+        })
+    ticket_storage.update_ticket(1002, {"status": "Geclaimt von Mod"})
+    ticket_storage.update_ticket(1003, {"status": "geschlossen"})
+
+    first = ticket_index.query(limit=3)
+    assert [t["ticket_id"] for t in first["tickets"]] == [7, 6, 5]
+    assert first["total"] == 7 and first["by_status"] == {"offen": 5, "geclaimt": 1, "geschlossen": 1}
+    assert first["prev_cursor"] is None
+
+    second = ticket_index.query(limit=3, after=first["next_cursor"])
+    assert [t["ticket_id"] for t in second["tickets"]] == [4, 3, 2]
+    back = ticket_index.query(limit=3, before=second["prev_cursor"])
+    assert [t["ticket_id"] for t in back["tickets"]] == [7, 6, 5]
+
+    technik = ticket_index.query(category="Technik", status="offen", sort="id_asc")
+    assert [t["ticket_id"] for t in technik["tickets"]] == [1] and technik["total"] == 1
+
+    assert [t["ticket_id"] for t in ticket_index.query(user="ma", sort="oldest")["tickets"]] == [1, 3, 5, 7]
+    assert [t["ticket_id"] for t in ticket_index.query(user="104")["tickets"]] == [4]
+    ranged = ticket_index.query(date_from="2025-03-02", date_to="2025-03-04")
+    assert [t["ticket_id"] for t in ranged["tickets"]] == [4, 3, 2]
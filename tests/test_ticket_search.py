@@ -0,0 +1,30 @@
+from utils import ticket_search
+
+
+def test_incremental_index_and_ranked_search(tmp_path, monkeypatch):
+    monkeypatch.setattr(ticket_search, "SEARCH_DB", str(tmp_path / "search.db"))
+
+    ticket_search.index_event({"time": "2025-03-01T10:00:00", "event_type": "ticket_created",
+                               "data": {"ticket_id": 5, "channel_id": 50, "user": "max",
+                                        "category": "Technik", "channel_name": "ticket-max-5"}})
+    ticket_search.index_event({"time": "2025-03-02T10:00:00", "event_type": "ticket_closed",
+                               "data": {"ticket_id": 5, "channel_id": 50, "reason": "Cheater gemeldet & gebannt"}})
+    ticket_search.index_messages(5, 50, [
+        {"id": 1, "author": "max", "content": "Ich möchte einen Cheater-Report abgeben <script>"},
+        {"id": 2, "author": "mod", "content": "Danke, wir schauen uns das an"},
+    ])
+
+    hits, total = ticket_search.search("cheat")
+    assert total == 2
+    assert {h["kind"] for h in hits} == {"event", "message"}
+    assert all(h["ticket_id"] == "5" for h in hits)
+    assert "<mark>Cheater-Report</mark>" in next(h["snippet"] for h in hits if h["kind"] == "message")
+    assert "&lt;script&gt;" in next(h["snippet"] for h in hits if h["kind"] == "message")
+
+    hits, total = ticket_search.search("cheat", kind="event")
+    assert total == 1 and "gebannt" in hits[0]["snippet"]
+
+    # Suchwörter treffen nicht die Art-Spalte; FTS-Syntax im Suchtext ist harmlos
+    assert ticket_search.search("message")[1] == 0
+    assert ticket_search.search('technik OR "')[1] == 0
+    assert ticket_search.search("technik")[0][0]["kind"] == "ticket"
@@ -0,0 +1,17 @@
+from utils import ticket_storage
+
+
+def test_index_lookup_follows_file_changes(tmp_path, monkeypatch):
+    monkeypatch.setattr(ticket_storage, "TICKETS_FILE", str(tmp_path / "tickets.json"))
+
+    assert ticket_storage.get_ticket_by_channel(100) is None
+
+    ticket_storage.save_ticket({"ticket_id": 1, "channel_id": 100, "user_id": 5, "status": "offen"})
+    ticket_storage.save_ticket({"ticket_id": 2, "channel_id": 200, "user_id": 6, "status": "offen"})
+
+    assert ticket_storage.get_ticket_by_channel(100)["ticket_id"] == 1
+    assert ticket_storage.get_ticket("2")["channel_id"] == 200
+
+    ticket_storage.update_ticket(200, {"status": "geschlossen", "claimed_by": 7})
+    assert ticket_storage.get_ticket(2)["status"] == "geschlossen"
+    assert ticket_storage.get_ticket_by_channel(200)["claimed_by"] == 7
@@ -0,0 +1,46 @@
+import asyncio
+import time
+
+from utils.timer_service import TimerService
+
+
+def test_fires_in_deadline_order_and_honours_reschedule():
+    fired = []
+
+    async def scenario():
+        async def handler(key):
+            fired.append(key)
+
+        timers = TimerService(handler)
+        timers.start()
+        now = time.time()
+        timers.schedule("b", now + 0.10)
+        timers.schedule("a", now + 0.05)
+        timers.schedule("c", now + 0.02)
+        timers.schedule("c", now + 0.15)   # verschoben → alter Eintrag verfällt
+        timers.schedule("d", now + 0.03)
+        timers.cancel("d")
+        await asyncio.sleep(0.3)
+        timers.stop()
+        return len(timers)
+
+    assert asyncio.run(scenario()) == 0
+    assert fired == ["a", "b", "c"]
+
+
+def test_rescheduling_does_not_grow_heap():
+    async def handler(key):
+        pass
+
+    async def scenario():
+        timers = TimerService(handler)
+        now = time.time()
+        for i in range(1000):  # z.B. eine Nachricht nach der anderen im selben Ticket
+            timers.schedule("ticket", now + 3600 + i)
+        timers.schedule("other", now + 60)
+        return timers
+
+    timers = asyncio.run(scenario())
+    assert len(timers) == 2
+    assert len(timers._heap) <= 2 * 64
+    assert timers.deadline("ticket") == max(d for d, _, k in timers._heap if k == "ticket")
@@ -0,0 +1,33 @@
+import os
+
+from utils import transcripts
+
+
+def test_append_resume_and_truncate_partial_member(tmp_path, monkeypatch):
+    monkeypatch.setattr(transcripts, "TRANSCRIPT_DIR", str(tmp_path))
+
+    transcripts.append_page(7, 100, [{"id": 1, "content": "a"}, {"id": 2, "content": "b"}])
+    size = os.path.getsize(transcripts.archive_path(7))
+
+    # Absturz mitten im nächsten Member simulieren: Müll hinter dem letzten Checkpoint
+    with open(transcripts.archive_path(7), "ab") as f:
+        f.write(b"\x1f\x8b\x08\x00garbage")
+    assert transcripts.load_state(7)["bytes"] == size
+    assert [r["id"] for r in transcripts.read_transcript(7)] == [1, 2]
+
+    state = transcripts.append_page(7, 100, [{"id": 3, "content": "c"}], complete=True)
+    assert state["count"] == 3 and state["complete"] and state["last_message_id"] == 3
+    assert [r["id"] for r in transcripts.read_transcript(7)] == [1, 2, 3]
+    assert transcripts.pending_archives() == []
+
+
+def test_begin_archive_is_pending_until_first_page(tmp_path, monkeypatch):
+    monkeypatch.setattr(transcripts, "TRANSCRIPT_DIR", str(tmp_path))
+
+    transcripts.begin_archive(8, 200)
+    # Abbruch vor der ersten Seite → beim Neustart fortsetzbar
+    assert [(s["ticket_id"], s["channel_id"]) for s in transcripts.pending_archives()] == [(8, 200)]
+    assert transcripts.archived_tickets() == []
+
+    transcripts.append_page(8, 200, [{"id": 1, "content": "a"}], complete=True)
+    assert transcripts.pending_archives() == []
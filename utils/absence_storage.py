@@ -2,32 +2,30 @@
 # -*- coding: utf-8 -*-
 
 import os
-import json
 from datetime import datetime
 from typing import Dict, List, Optional
 
+from utils import file_lock
+from utils.metrics import track_store
+
 DATA_DIR = "utils"
 os.makedirs(DATA_DIR, exist_ok=True)
 ABSENCE_FILE = os.path.join(DATA_DIR, "absences.json")
 
 
-def _load() -> Dict:
-    if not os.path.exists(ABSENCE_FILE):
-        return {"last_id": 0, "items": []}
-    with open(ABSENCE_FILE, "r", encoding="utf-8") as f:
-        try:
-            return json.load(f)
-        except json.JSONDecodeError:
-            return {"last_id": 0, "items": []}
+@track_store("absences", "load")
+def _load(cached: bool = False) -> Dict:
+    # cached=True nur für reine Leser – das Objekt wird zwischen Aufrufen geteilt
+    return file_lock.read_json(ABSENCE_FILE, {"last_id": 0, "items": []}, cached=cached)
 
 
+@track_store("absences", "save")
 def _save(payload: Dict) -> None:
-    with open(ABSENCE_FILE, "w", encoding="utf-8") as f:
-        json.dump(payload, f, ensure_ascii=False, indent=2)
+    file_lock.write_json(ABSENCE_FILE, payload, ensure_ascii=False, indent=2)
 
 
 def list_absences() -> List[Dict]:
-    data = _load()
+    data = _load(cached=True)
     # Sort: newest first by created_at
     return sorted(data["items"], key=lambda x: x.get("created_at", ""), reverse=True)
 
@@ -42,53 +40,52 @@ def add_absence(
     """
     Dates as ISO strings: 'YYYY-MM-DD' (UI liefert das so).
     """
-    data = _load()
-    new_id = int(data.get("last_id", 0)) + 1
-    now = datetime.utcnow().isoformat()
-
-    item = {
-        "id": new_id,
-        "user_display": user_display.strip(),
-        "start_date": start_date.strip(),
-        "end_date": end_date.strip(),
-        "reason": reason.strip(),
-        "submitted_by": (submitted_by or "").strip(),
-        "created_at": now,
-        "posted": False,          # noch nicht nach Discord gepostet
-        "posted_at": None,        # ISO-Zeitstempel, wenn gepostet
-        "message_id": None,       # optionale spätere Nutzung
-        "channel_id": None        # optionale spätere Nutzung
-    }
-
-    data["last_id"] = new_id
-    data["items"].append(item)
-    _save(data)
+    with file_lock.locked(ABSENCE_FILE):
+        data = _load()
+        new_id = int(data.get("last_id", 0)) + 1
+        now = datetime.utcnow().isoformat()
+
+        item = {
+            "id": new_id,
+            "user_display": user_display.strip(),
+            "start_date": start_date.strip(),
+            "end_date": end_date.strip(),
+            "reason": reason.strip(),
+            "submitted_by": (submitted_by or "").strip(),
+            "created_at": now,
+            "posted": False,          # noch nicht nach Discord gepostet
+            "posted_at": None,        # ISO-Zeitstempel, wenn gepostet
+            "message_id": None,       # optionale spätere Nutzung
+            "channel_id": None        # optionale spätere Nutzung
+        }
+
+        data["last_id"] = new_id
+        data["items"].append(item)
+        _save(data)
     return item
 
 
 def mark_posted(absence_id: int, channel_id: Optional[int] = None, message_id: Optional[int] = None) -> None:
-    data = _load()
-    changed = False
-    for it in data["items"]:
-        if int(it["id"]) == int(absence_id):
-            it["posted"] = True
-            it["posted_at"] = datetime.utcnow().isoformat()
-            if channel_id is not None:
-                it["channel_id"] = int(channel_id)
-            if message_id is not None:
-                it["message_id"] = int(message_id)
-            changed = True
-            break
-    if changed:
-        _save(data)
+    with file_lock.locked(ABSENCE_FILE):
+        data = _load()
+        for it in data["items"]:
+            if int(it["id"]) == int(absence_id):
+                it["posted"] = True
+                it["posted_at"] = datetime.utcnow().isoformat()
+                if channel_id is not None:
+                    it["channel_id"] = int(channel_id)
+                if message_id is not None:
+                    it["message_id"] = int(message_id)
+                _save(data)
+                break
 
 
 def delete_absence(absence_id: int) -> bool:
-    data = _load()
-    before = len(data["items"])
-    data["items"] = [it for it in data["items"] if int(it.get("id", -1)) != int(absence_id)]
-    after = len(data["items"])
-    if after != before:
-        _save(data)
-        return True
+    with file_lock.locked(ABSENCE_FILE):
+        data = _load()
+        before = len(data["items"])
+        data["items"] = [it for it in data["items"] if int(it.get("id", -1)) != int(absence_id)]
+        if len(data["items"]) != before:
+            _save(data)
+            return True
     return False
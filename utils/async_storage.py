@@ -0,0 +1,139 @@
+# utils/async_storage.py
+# -*- coding: utf-8 -*-
+"""
+Async-Fassade für die (synchronen) Datei- und DB-Stores des Bots.
+
+Alle Zugriffe laufen in einem eigenen Thread-Pool, damit der Discord-Event-Loop
+nie auf die Platte wartet. Zugriffe auf dieselbe Datei werden über eine Sperre
+pro Schlüssel serialisiert – so können sich z.B. zwei gleichzeitige
+Schreibvorgänge auf tickets.json nicht gegenseitig überschreiben.
+
+- ``await run_io(key, func, ...)``: Ergebnis wird gebraucht (z.B. Ticketnummer)
+- ``fire_and_forget(key, func, ...)``: Ergebnis egal (z.B. Log-Einträge)
+"""
+
+from __future__ import annotations
+import asyncio
+import functools
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Set
+
+from utils.ticket_counter import get_next_ticket_number, get_next_guild_ticket_number
+from utils.ticket_storage import (
+    save_ticket as _save_ticket,
+    set_ticket_status_by_channel,
+    update_ticket as _update_ticket,
+    get_ticket as _get_ticket,
+    get_ticket_by_channel as _get_ticket_by_channel,
+)
+from utils.ticket_log import log_ticket_event
+
+log = logging.getLogger(__name__)
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="storage-io")
+_locks: Dict[str, threading.Lock] = {}
+_locks_guard = threading.Lock()
+_pending: Set[asyncio.Task] = set()
+
+# Schlüssel = eine Datei bzw. ein Store
+KEY_COUNTER = "ticket_counter"
+KEY_TICKETS = "tickets"
+KEY_TICKET_LOG = "ticket_log"
+
+
+def _lock_for(key: str) -> threading.Lock:
+    lock = _locks.get(key)
+    if lock is None:
+        with _locks_guard:
+            lock = _locks.setdefault(key, threading.Lock())
+    return lock
+
+
+def _call_locked(key: Optional[str], func: Callable, args, kwargs):
+    if key is None:
+        return func(*args, **kwargs)
+    with _lock_for(key):
+        return func(*args, **kwargs)
+
+
+async def run_io(key: Optional[str], func: Callable, *args, **kwargs) -> Any:
+    """Führt ``func`` im Storage-Pool aus; ``key=None`` = keine Serialisierung (z.B. DB)."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(_call_locked, key, func, args, kwargs))
+
+
+def fire_and_forget(key: Optional[str], func: Callable, *args, **kwargs) -> asyncio.Task:
+    """Startet einen Store-Zugriff im Hintergrund; Fehler werden geloggt statt verschluckt."""
+    task = asyncio.get_running_loop().create_task(run_io(key, func, *args, **kwargs))
+    _pending.add(task)
+
+    def _done(t: asyncio.Task) -> None:
+        _pending.discard(t)
+        if not t.cancelled() and t.exception():
+            log.error(f"[async_storage] Hintergrund-Schreibvorgang fehlgeschlagen ({key}): {t.exception()}")
+
+    task.add_done_callback(_done)
+    return task
+
+
+async def drain() -> None:
+    """Wartet auf alle offenen Hintergrund-Schreibvorgänge (z.B. beim Shutdown)."""
+    if _pending:
+        await asyncio.gather(*list(_pending), return_exceptions=True)
+
+
+# ---------------------------
+# Bequeme Wrapper
+# ---------------------------
+def _load_json_file(path: str, default: Any) -> Any:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
+
+
+async def load_json(path: str, default: Any = None) -> Any:
+    return await run_io(path, _load_json_file, path, {} if default is None else default)
+
+
+async def next_ticket_number() -> int:
+    return await run_io(KEY_COUNTER, get_next_ticket_number)
+
+
+async def next_guild_ticket_number(guild_id: int) -> int:
+    return await run_io(KEY_COUNTER, get_next_guild_ticket_number, guild_id)
+
+
+async def save_ticket(ticket: Dict) -> None:
+    await run_io(KEY_TICKETS, _save_ticket, ticket)
+
+
+async def set_ticket_status(channel_id: int, status: str) -> None:
+    await run_io(KEY_TICKETS, set_ticket_status_by_channel, channel_id, status)
+
+
+async def update_ticket(channel_id: int, fields: Dict) -> Optional[Dict]:
+    return await run_io(KEY_TICKETS, _update_ticket, channel_id, fields)
+
+
+async def find_ticket(ticket_id=None, channel_id: Optional[int] = None) -> Optional[Dict]:
+    """Lookup über den In-Memory-Index aus utils.ticket_storage (ID bevorzugt, sonst Channel)."""
+    def _lookup():
+        ticket = _get_ticket(ticket_id) if ticket_id is not None else None
+        if ticket is None and channel_id is not None:
+            ticket = _get_ticket_by_channel(channel_id)
+        return ticket
+    return await run_io(KEY_TICKETS, _lookup)
+
+
+def log_event(event_type: str, data: dict) -> asyncio.Task:
+    return fire_and_forget(KEY_TICKET_LOG, log_ticket_event, event_type, data)
+
+
+def log_with(func: Callable, *args, **kwargs) -> asyncio.Task:
+    """Für die Kompatibilitäts-Wrapper aus utils.ticket_log (log_ticket_close …)."""
+    return fire_and_forget(KEY_TICKET_LOG, func, *args, **kwargs)
@@ -0,0 +1,206 @@
+# utils/bot_telemetry.py
+# -*- coding: utf-8 -*-
+"""
+Performance-Telemetrie für den Bot.
+
+- ``track_interaction(name)``: Dekorator für Button-/Select-/Modal-Callbacks
+- ``track_task(name)``: Dekorator für ``tasks.loop``-Iterationen
+- ``install_http_instrumentation(bot)``: misst alle ausgehenden Discord-API-Calls
+  und zählt 429-Rate-Limits (über die Warnungen von ``discord.http``)
+
+Alles landet in der gemeinsamen Registry aus ``utils.metrics``.
+"""
+
+from __future__ import annotations
+import asyncio
+import functools
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import Callable, Set
+
+from utils import metrics
+
+INTERACTION_SECONDS = metrics.histogram(
+    "bot_interaction_seconds", "Dauer von Interaction-Handlern", ("handler",)
+)
+INTERACTION_ERRORS = metrics.counter(
+    "bot_interaction_errors", "Fehlgeschlagene Interaction-Handler", ("handler",)
+)
+TASK_SECONDS = metrics.histogram(
+    "bot_task_seconds", "Dauer einer tasks.loop-Iteration", ("task",)
+)
+TASK_ERRORS = metrics.counter(
+    "bot_task_errors", "Fehlgeschlagene tasks.loop-Iterationen", ("task",)
+)
+HTTP_SECONDS = metrics.histogram(
+    "discord_http_seconds", "Dauer ausgehender Discord-API-Requests", ("method", "route")
+)
+HTTP_ERRORS = metrics.counter(
+    "discord_http_errors", "Discord-API-Fehler nach HTTP-Status", ("method", "route", "status")
+)
+RATE_LIMITS = metrics.counter(
+    "discord_rate_limits", "Von Discord gemeldete Rate-Limits (429) inkl. Retries", ("scope",)
+)
+
+# Gauges werden periodisch vom PerfMonitor-Cog befüllt
+GATEWAY_LATENCY = metrics.gauge("discord_gateway_latency_seconds", "Heartbeat-Latenz zum Gateway")
+SHARD_LATENCY = metrics.gauge("discord_shard_latency_seconds", "Heartbeat-Latenz pro Shard (AutoShardedBot)",
+                              ("shard",))
+CACHE_SIZE = metrics.gauge("discord_cache_size", "Größe der discord.py-Caches", ("cache",))
+
+
+def _wrap(histogram, errors, label_name: str, name: str) -> Callable:
+    def decorator(func):
+        child = histogram.labels(**{label_name: name})
+        err_child = errors.labels(**{label_name: name})
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await func(*args, **kwargs)
+            except Exception:
+                err_child.inc()
+                raise
+            finally:
+                child.observe(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def track_interaction(name: str) -> Callable:
+    return _wrap(INTERACTION_SECONDS, INTERACTION_ERRORS, "handler", name)
+
+
+def track_task(name: str) -> Callable:
+    return _wrap(TASK_SECONDS, TASK_ERRORS, "task", name)
+
+
+class _RateLimitCounter(logging.Handler):
+    """
+    Zählt die 429-Warnungen, die discord.http vor jedem Retry loggt – jeden 429
+    genau einmal. Bei einem globalen Limit folgt auf die Routen-Warnung ("We are
+    being rate limited … Retrying in") direkt "Global rate limit has been hit";
+    ob das passiert, steht erst nach diesem synchronen Schritt fest. Die
+    Routen-Warnung wird daher per ``call_soon`` zugeordnet, die Global-Warnung
+    nimmt sie vorher als ``scope="global"`` an sich.
+    """
+
+    def __init__(self, level=logging.NOTSET):
+        super().__init__(level)
+        self._pending: Set[int] = set()  # id(Task) mit noch nicht zugeordneter Routen-Warnung
+
+    def emit(self, record: logging.LogRecord) -> None:
+        msg = record.getMessage()
+        if msg.startswith("Global rate limit"):
+            self._pending.discard(_task_key())
+            RATE_LIMITS.labels(scope="global").inc()
+        elif msg.startswith("We are being rate limited"):
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None
+            if loop is None or "Retrying in" not in msg:
+                # Timeout zu lang → RateLimited, danach kommt keine Global-Warnung mehr
+                RATE_LIMITS.labels(scope="route").inc()
+                return
+            key = _task_key()
+            self._pending.add(key)
+            loop.call_soon(self._settle, key)
+
+    def _settle(self, key: int) -> None:
+        if key in self._pending:
+            self._pending.discard(key)
+            RATE_LIMITS.labels(scope="route").inc()
+
+
+def _task_key() -> int:
+    try:
+        return id(asyncio.current_task())
+    except RuntimeError:
+        return 0
+
+
+def install_http_instrumentation(bot) -> None:
+    """
+    Umhüllt ``bot.http.request``. Als Label dient das Routen-Template
+    (z.B. ``/channels/{channel_id}/messages``), nicht die konkrete URL.
+    """
+    http = bot.http
+    if getattr(http, "_telemetry_installed", False):
+        return
+    original = http.request
+
+    @functools.wraps(original)
+    async def request(route, *args, **kwargs):
+        method = getattr(route, "method", "?")
+        path = getattr(route, "path", "?")
+        start = time.perf_counter()
+        try:
+            return await original(route, *args, **kwargs)
+        except Exception as e:
+            status = getattr(e, "status", None) or type(e).__name__
+            HTTP_ERRORS.labels(method=method, route=path, status=status).inc()
+            raise
+        finally:
+            HTTP_SECONDS.labels(method=method, route=path).observe(time.perf_counter() - start)
+
+    http.request = request
+    http._telemetry_installed = True
+    logging.getLogger("discord.http").addHandler(_RateLimitCounter(level=logging.WARNING))
+
+
+def sample_bot_gauges(bot) -> None:
+    """Gateway-Latenz und Cache-Größen in die Gauges übernehmen."""
+    latency = bot.latency
+    if latency == latency and latency != float("inf"):  # NaN/inf vor dem ersten Heartbeat
+        GATEWAY_LATENCY.set(latency)
+    for shard_id, shard_latency in getattr(bot, "latencies", []):
+        if shard_latency == shard_latency and shard_latency != float("inf"):
+            SHARD_LATENCY.labels(shard=str(shard_id)).set(shard_latency)
+    CACHE_SIZE.labels(cache="guilds").set(len(bot.guilds))
+    CACHE_SIZE.labels(cache="users").set(len(bot.users))
+    CACHE_SIZE.labels(cache="members").set(sum(len(g.members) for g in bot.guilds))
+    CACHE_SIZE.labels(cache="channels").set(sum(len(g.channels) for g in bot.guilds))
+    CACHE_SIZE.labels(cache="messages").set(len(bot.cached_messages))
+    CACHE_SIZE.labels(cache="persistent_views").set(len(bot.persistent_views))
+
+
+# ---------------------------
+# Ticket-Erstellung (Stufen)
+# ---------------------------
+TICKET_STAGE_SECONDS = metrics.histogram(
+    "ticket_create_stage_seconds", "Dauer der einzelnen Stufen der Ticket-Erstellung", ("stage",)
+)
+TIME_TO_REPLY_SECONDS = metrics.histogram(
+    "ticket_time_to_reply_seconds",
+    "Zeit von der Auswahl bis zur Ephemeral-Antwort (Ziel p95 < 500 ms)",
+    buckets=(0.1, 0.2, 0.3, 0.4, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0),
+)
+
+
+class StageTimer:
+    """Misst benannte Stufen eines Ablaufs und die Gesamtzeit seit Erzeugung."""
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+        self.start = time.perf_counter()
+        self.stages = {}
+
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+    @asynccontextmanager
+    async def stage(self, name: str):
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - begin
+            self.stages[name] = duration
+            self.histogram.labels(stage=name).observe(duration)
+
+    def summary(self) -> str:
+        parts = [f"{name}={d * 1000:.0f}ms" for name, d in self.stages.items()]
+        return ", ".join(parts) + f" (gesamt {self.elapsed() * 1000:.0f}ms)"
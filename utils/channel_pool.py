@@ -0,0 +1,111 @@
+# utils/channel_pool.py
+# -*- coding: utf-8 -*-
+"""
+Warm-Pool vorab erstellter, versteckter Ticket-Kanäle.
+
+Das Anlegen eines Kanals ist der langsamste Schritt der Ticket-Erstellung und
+unterliegt zu Stoßzeiten dem guild-weiten Rate-Limit. Mit aktivem Pool
+(config.json → "ticket_warm_pool_size": N) hält der Bot N versteckte Kanäle
+``pool-xxxx`` unter "🎫 Tickets" bereit. Ein neues Ticket übernimmt einen davon
+und setzt Name, Overwrites und Topic mit einem einzigen ``channel.edit``.
+Nachgefüllt wird im Hintergrund, höchstens ein Kanal pro Durchlauf.
+"""
+
+from __future__ import annotations
+import logging
+import secrets
+import time
+from collections import deque
+from typing import Deque, Dict, Optional
+
+import discord
+
+from utils import metrics
+
+log = logging.getLogger(__name__)
+
+POOL_PREFIX = "pool-"
+TICKET_CATEGORY_NAME = "🎫 Tickets"
+
+POOL_REQUESTS = metrics.counter("ticket_pool_requests", "Ticket-Erstellungen aus dem Warm-Pool", ("result",))
+POOL_FILL_SECONDS = metrics.histogram("ticket_pool_fill_seconds", "Dauer, einen Pool-Kanal anzulegen")
+POOL_CLAIM_SECONDS = metrics.histogram("ticket_pool_claim_seconds", "Dauer, einen Pool-Kanal zu übernehmen")
+POOL_SIZE = metrics.gauge("ticket_pool_size", "Bereitstehende Pool-Kanäle", ("guild",))
+
+
+class WarmChannelPool:
+    def __init__(self):
+        self.target_size = 0
+        self._channels: Dict[int, Deque[int]] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.target_size > 0
+
+    def _queue(self, guild: discord.Guild) -> Deque[int]:
+        return self._channels.setdefault(guild.id, deque())
+
+    def size(self, guild: discord.Guild) -> int:
+        return len(self._queue(guild))
+
+    def discover(self, guild: discord.Guild) -> None:
+        """Nach einem Neustart vorhandene Pool-Kanäle wieder übernehmen."""
+        category = discord.utils.get(guild.categories, name=TICKET_CATEGORY_NAME)
+        if category is None:
+            return
+        queue = self._queue(guild)
+        known = set(queue)
+        for channel in category.text_channels:
+            if channel.name.startswith(POOL_PREFIX) and channel.id not in known:
+                queue.append(channel.id)
+        POOL_SIZE.labels(guild=guild.id).set(len(queue))
+
+    async def replenish_one(self, guild: discord.Guild) -> bool:
+        """Legt höchstens einen Kanal an, falls der Pool unter der Zielgröße liegt."""
+        if self.size(guild) >= self.target_size:
+            return False
+        category = discord.utils.get(guild.categories, name=TICKET_CATEGORY_NAME)
+        if category is None:
+            return False
+
+        start = time.perf_counter()
+        channel = await guild.create_text_channel(
+            name=f"{POOL_PREFIX}{secrets.token_hex(3)}",
+            category=category,
+            overwrites={guild.default_role: discord.PermissionOverwrite(view_channel=False)},
+            reason="Ticket-Warm-Pool",
+        )
+        POOL_FILL_SECONDS.observe(time.perf_counter() - start)
+        self._queue(guild).append(channel.id)
+        POOL_SIZE.labels(guild=guild.id).set(self.size(guild))
+        return True
+
+    async def acquire(self, guild: discord.Guild, *, name: str, overwrites: dict,
+                      topic: Optional[str] = None) -> Optional[discord.TextChannel]:
+        """
+        Übernimmt einen Pool-Kanal als Ticket-Kanal (ein einziger Edit).
+        Gibt None zurück, wenn der Pool leer/aus ist – dann normal anlegen.
+        """
+        if not self.enabled:
+            return None
+        queue = self._queue(guild)
+        while queue:
+            channel = guild.get_channel(queue.popleft())
+            if channel is None:
+                continue  # inzwischen gelöscht
+            start = time.perf_counter()
+            try:
+                edited = await channel.edit(name=name, overwrites=overwrites, topic=topic,
+                                            reason="Ticket aus Warm-Pool")
+            except discord.HTTPException as e:
+                log.warning(f"[WarmPool] Übernahme von {channel.id} fehlgeschlagen: {e}")
+                continue
+            POOL_CLAIM_SECONDS.observe(time.perf_counter() - start)
+            POOL_REQUESTS.labels(result="hit").inc()
+            POOL_SIZE.labels(guild=guild.id).set(len(queue))
+            return edited or channel
+        POOL_REQUESTS.labels(result="miss").inc()
+        return None
+
+
+ticket_pool = WarmChannelPool()
@@ -0,0 +1,67 @@
+# utils/command_sync.py
+# -*- coding: utf-8 -*-
+"""
+Slash-Commands nur dann bei Discord registrieren, wenn sie sich geändert haben.
+
+``tree.sync()`` ersetzt bei jedem Aufruf alle Commands der Anwendung, ist
+langsam und hat ein enges Rate-Limit. Deshalb wird der Command-Baum (Namen,
+Beschreibungen, Optionen, Rechte – also genau das, was an Discord geht)
+kanonisch als JSON gehasht und mit dem Hash des letzten Syncs verglichen
+(``logs/command_sync.json``, pro Anwendung und Scope). Gleich → kein API-Call.
+
+- beim Start aus ``setup_hook`` (bot.py)
+- nach einem Hot-Reload (cogs/cog_reloader.py)
+- ``python bot.py --force-sync`` synchronisiert unabhängig vom Hash
+"""
+
+from __future__ import annotations
+import hashlib
+import json
+import logging
+import os
+from typing import Optional
+
+import discord
+from discord import app_commands
+
+from utils import file_lock, metrics
+
+log = logging.getLogger(__name__)
+
+STATE_FILE = os.path.join("logs", "command_sync.json")
+GLOBAL_SCOPE = "global"
+
+COMMAND_SYNCS = metrics.counter("command_syncs", "Abgleiche des Slash-Command-Baums", ("result",))
+
+
+def tree_payload(tree: app_commands.CommandTree, guild: Optional[discord.abc.Snowflake] = None) -> list:
+    """Was ``tree.sync(guild=...)`` an Discord schicken würde."""
+    commands = [command.to_dict(tree) for command in tree._get_all_commands(guild=guild)]
+    return sorted(commands, key=lambda c: (c.get("type", 1), c["name"]))
+
+
+def tree_hash(tree: app_commands.CommandTree, guild: Optional[discord.abc.Snowflake] = None) -> str:
+    raw = json.dumps(tree_payload(tree, guild), sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+async def sync_if_changed(bot, guild: Optional[discord.abc.Snowflake] = None, force: bool = False) -> bool:
+    """True = synchronisiert, False = unverändert (kein API-Call)."""
+    scope = str(guild.id) if guild is not None else GLOBAL_SCOPE
+    app_key = str(bot.application_id)
+    digest = tree_hash(bot.tree, guild)
+
+    state = file_lock.read_json(STATE_FILE, {})
+    if not force and state.get(app_key, {}).get(scope) == digest:
+        COMMAND_SYNCS.labels(result="skipped").inc()
+        log.info(f"⚡ Slash-Commands unverändert ({scope}) – kein Sync")
+        return False
+
+    synced = await bot.tree.sync(guild=guild)
+    with file_lock.locked(STATE_FILE):
+        state = file_lock.read_json(STATE_FILE, {})
+        state.setdefault(app_key, {})[scope] = digest
+        file_lock.write_json(STATE_FILE, state, indent=2)
+    COMMAND_SYNCS.labels(result="synced").inc()
+    log.info(f"✅ {len(synced)} Slash-Commands synchronisiert ({scope})")
+    return True
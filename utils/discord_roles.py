@@ -1,21 +1,15 @@
-import json
-import os
 from discord import Guild
 
-ROLES_CACHE_FILE = os.path.join(os.path.dirname(__file__), "roles_cache.json")
+from utils.guild_config import read_roles, write_roles
 
 
-def get_cached_roles():
+def get_cached_roles(guild_id=None):
+    """Rollen einer Guild aus utils/roles_cache/ (ohne Guild: alle bekannten)."""
     try:
-        if os.path.exists(ROLES_CACHE_FILE):
-            with open(ROLES_CACHE_FILE, "r", encoding="utf-8") as f:
-                data = json.load(f)
-                if isinstance(data, list):
-                    return data
-                else:
-                    print("[Fehler] roles_cache.json ist kein Array.")
-        else:
-            print(f"[Warnung] Datei nicht gefunden: {ROLES_CACHE_FILE}")
+        data = read_roles(guild_id)
+        if isinstance(data, list):
+            return data
+        print("[Fehler] Rollen-Cache ist kein Array.")
     except Exception as e:
         print(f"[Fehler beim Laden der Rollen] {e}")
     return []
@@ -24,8 +18,7 @@ def get_cached_roles():
 async def cache_roles(guild: Guild):
     try:
         roles = [{"id": role.id, "name": role.name} for role in guild.roles]
-        with open(ROLES_CACHE_FILE, "w", encoding="utf-8") as f:
-            json.dump(roles, f, indent=4, ensure_ascii=False)
+        write_roles(guild.id, roles)
         print(f"[Info] {len(roles)} Rollen wurden erfolgreich im Cache gespeichert.")
     except Exception as e:
         print(f"[Fehler beim Cachen der Rollen] {e}")
@@ -0,0 +1,348 @@
+# utils/event_store.py
+# -*- coding: utf-8 -*-
+"""
+Ticket-Events als zeitlich partitioniertes Log (logs/events/).
+
+- ``YYYY-MM-DD.jsonl`` – eine JSON-Zeile pro Event, nur angehängt. Der einzige
+  Schreiber ist die ticket_log-Queue (async_storage), die Zeilen sind also nach
+  ``time`` sortiert und beginnen immer mit ``{"time": "..."``.
+- ``YYYY-MM.jsonl.gz`` – abgeschlossene Monate nach der Kompaktierung.
+
+Abfragen wählen die Partitionen über den Dateinamen aus, suchen in Tagesdateien
+per Binärsuche (mmap) die erste Zeile ab ``since`` und lesen ab dort nur so weit
+wie nötig. Weitergeblättert wird mit einem Cursor ``<partition>:<offset>``.
+
+Alte logs/ticket_events.json wird von ``migrate_legacy()`` einmalig aufgeteilt.
+"""
+
+from __future__ import annotations
+import argparse
+import calendar
+import gzip
+import json
+import mmap
+import os
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from utils import metrics
+
+EVENTS_DIR = os.path.join("logs", "events")
+LEGACY_FILE = os.path.join("logs", "ticket_events.json")
+
+PAGE_SIZE = 50
+
+# Defaults für die Kompaktierung (config.json: "event_archive_days", "event_retention_days")
+ARCHIVE_AFTER_DAYS = 30
+RETENTION_DAYS = 0  # 0 = Archive nie löschen
+
+EVENT_QUERY_SECONDS = metrics.histogram("ticket_event_query_seconds", "Dauer einer Event-Abfrage (eine Seite)")
+EVENT_PARTITIONS_READ = metrics.counter("ticket_event_partitions_read", "Gelesene Event-Partitionen")
+
+_TIME_PREFIX = b'{"time": "'
+
+
+# ---------------------------
+# Partitionen
+# ---------------------------
+def _day_path(day: str) -> str:
+    return os.path.join(EVENTS_DIR, f"{day}.jsonl")
+
+
+def _month_path(month: str) -> str:
+    return os.path.join(EVENTS_DIR, f"{month}.jsonl.gz")
+
+
+def partitions(since: Optional[str] = None, until: Optional[str] = None) -> List[Tuple[str, str]]:
+    """(key, pfad) aller Partitionen, die [since, until] berühren, zeitlich sortiert."""
+    if not os.path.isdir(EVENTS_DIR):
+        return []
+    first_day, last_day = (since or "")[:10], (until or "9999")[:10]
+    result = []
+    for name in os.listdir(EVENTS_DIR):
+        if name.endswith(".jsonl.gz"):
+            key = name[: -len(".jsonl.gz")]
+            if first_day[:7] <= key <= last_day[:7]:
+                result.append((key, os.path.join(EVENTS_DIR, name)))
+        elif name.endswith(".jsonl"):
+            key = name[: -len(".jsonl")]
+            if first_day <= key <= last_day:
+                result.append((key, os.path.join(EVENTS_DIR, name)))
+    # "2025-03" sortiert vor "2025-03-01" – ein Monatsarchiv kommt also vor Resten desselben Monats
+    return sorted(result)
+
+
+def _line_time(line: bytes) -> str:
+    if line.startswith(_TIME_PREFIX):
+        end = line.find(b'"', len(_TIME_PREFIX))
+        if end > 0:
+            return line[len(_TIME_PREFIX):end].decode("ascii", "replace")
+    try:
+        return json.loads(line).get("time") or ""
+    except (ValueError, AttributeError):
+        return ""
+
+
+# ---------------------------
+# Schreiben (nur über die ticket_log-Queue)
+# ---------------------------
+def _dump(entry: Dict) -> str:
+    # "time" muss vorne stehen, damit _line_time ohne JSON-Parser auskommt
+    ordered = {"time": entry.get("time"), **{k: v for k, v in entry.items() if k != "time"}}
+    return json.dumps(ordered, ensure_ascii=False) + "\n"
+
+
+def append(entry: Dict) -> None:
+    os.makedirs(EVENTS_DIR, exist_ok=True)
+    with open(_day_path(entry["time"][:10]), "a", encoding="utf-8") as f:
+        f.write(_dump(entry))
+
+
+def _write_day(day: str, entries: List[Dict]) -> None:
+    path = _day_path(day)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        for entry in entries:
+            f.write(_dump(entry))
+    os.replace(path + ".tmp", path)
+
+
+def migrate_legacy() -> int:
+    """Teilt logs/ticket_events.json auf Tagespartitionen auf (einmalig, idempotent)."""
+    if not os.path.exists(LEGACY_FILE):
+        return 0
+    try:
+        with open(LEGACY_FILE, "r", encoding="utf-8") as f:
+            legacy = json.load(f)
+    except json.JSONDecodeError:
+        return 0
+    by_day: Dict[str, List[Dict]] = {}
+    for entry in legacy if isinstance(legacy, list) else []:
+        if entry.get("time"):
+            by_day.setdefault(entry["time"][:10], []).append(entry)
+    os.makedirs(EVENTS_DIR, exist_ok=True)
+    for day, entries in by_day.items():
+        # Mit evtl. schon vorhandenen Events desselben Tages zusammenführen, Sortierung erhalten
+        entries = entries + list(_read_partition(_day_path(day)))
+        _write_day(day, sorted(entries, key=lambda e: e["time"]))
+    os.replace(LEGACY_FILE, LEGACY_FILE + ".migrated")
+    return sum(len(e) for e in by_day.values())
+
+
+# ---------------------------
+# Lesen
+# ---------------------------
+def _bisect(mm, since: str) -> int:
+    """Byte-Offset der ersten Zeile mit time >= since."""
+    lo, hi = 0, len(mm)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        start = mm.rfind(b"\n", 0, mid) + 1
+        end = mm.find(b"\n", start)
+        if end < 0:
+            end = len(mm)
+        if _line_time(mm[start:end]) < since:
+            lo = end + 1
+        else:
+            hi = start
+    return min(lo, len(mm))
+
+
+def _iter_day(path: str, since: Optional[str], offset: int) -> Iterator[Tuple[int, bytes]]:
+    """(Offset nach der Zeile, Zeile) ab ``offset`` bzw. der ersten Zeile >= since."""
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos = max(offset, _bisect(mm, since) if since else 0)
+            while pos < size:
+                end = mm.find(b"\n", pos)
+                if end < 0:
+                    return  # letzte Zeile wird gerade geschrieben
+                yield end + 1, mm[pos:end]
+                pos = end + 1
+
+
+def _iter_archive(path: str, offset: int) -> Iterator[Tuple[int, bytes]]:
+    with gzip.open(path, "rb") as f:
+        f.seek(offset)
+        pos = offset
+        for line in f:
+            pos += len(line)
+            if line.endswith(b"\n"):
+                yield pos, line.rstrip(b"\n")
+
+
+def _read_partition(path: str) -> Iterator[Dict]:
+    if not os.path.exists(path):
+        return
+    lines = _iter_archive(path, 0) if path.endswith(".gz") else _iter_day(path, None, 0)
+    for _, line in lines:
+        try:
+            yield json.loads(line)
+        except ValueError:
+            continue
+
+
+def _matches(entry: Dict, channel_id, user_id, event_type) -> bool:
+    data = entry.get("data") or {}
+    if event_type and entry.get("event_type") != event_type:
+        return False
+    if channel_id and str(data.get("channel_id")) != str(channel_id):
+        return False
+    if user_id and str(data.get("user_id")) != str(user_id):
+        return False
+    return True
+
+
+def _scan(channel_id=None, user_id=None, event_type=None, since: Optional[str] = None,
+          until: Optional[str] = None, cursor: Optional[str] = None) -> Iterator[Tuple[str, Dict]]:
+    start_key, start_offset = None, 0
+    if cursor and ":" in cursor:
+        start_key, _, raw = cursor.rpartition(":")
+        start_offset = int(raw) if raw.isdigit() else 0
+
+    # Billiger Vorfilter auf den Rohbytes, bevor JSON geparst wird (IDs als Zahl oder String)
+    needles = [
+        (f'"{field}": {value}'.encode(), f'"{field}": "{value}"'.encode())
+        for field, value in (("channel_id", channel_id), ("user_id", user_id)) if value
+    ]
+    if event_type:
+        needles.append((f'"event_type": "{event_type}"'.encode(),))
+
+    for key, path in partitions(since, until):
+        if start_key and key < start_key:
+            continue
+        offset = start_offset if key == start_key else 0
+        EVENT_PARTITIONS_READ.inc()
+        lines = _iter_archive(path, offset) if path.endswith(".gz") else _iter_day(path, since, offset)
+        for next_offset, line in lines:
+            when = _line_time(line)
+            if since and when < since:
+                continue
+            if until and when > until:
+                break
+            if any(not any(n in line for n in alternatives) for alternatives in needles):
+                continue
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if _matches(entry, channel_id, user_id, event_type):
+                yield f"{key}:{next_offset}", entry
+
+
+def query_events(channel_id=None, user_id=None, event_type: Optional[str] = None,
+                 since: Optional[str] = None, until: Optional[str] = None) -> Iterator[Dict]:
+    """
+    Streamt passende Events (älteste zuerst). ``since``/``until`` sind ISO-Zeitpunkte
+    oder Tage (``until="2025-03-01"`` schließt den ganzen Tag ein).
+    """
+    since, until = _bounds(since, until)
+    for _, entry in _scan(channel_id, user_id, event_type, since, until):
+        yield entry
+
+
+def page_events(channel_id=None, user_id=None, event_type: Optional[str] = None,
+                since: Optional[str] = None, until: Optional[str] = None,
+                cursor: Optional[str] = None, limit: int = PAGE_SIZE) -> Dict:
+    """Eine Seite für das Web: {"events", "next_cursor"}; ``cursor`` kommt aus der vorherigen Seite."""
+    since, until = _bounds(since, until)
+    events, next_cursor = [], None
+    with metrics.timed(EVENT_QUERY_SECONDS):
+        for position, entry in _scan(channel_id, user_id, event_type, since, until, cursor):
+            if len(events) == limit:
+                break
+            events.append(entry)
+            next_cursor = position
+        else:
+            next_cursor = None
+    return {"events": events, "next_cursor": next_cursor}
+
+
+def _bounds(since: Optional[str], until: Optional[str]) -> Tuple[Optional[str], Optional[str]]:
+    if until and len(until) == 10:
+        until += "T99"  # ganzer Tag
+    return since or None, until or None
+
+
+def iter_all() -> Iterator[Dict]:
+    for _, path in partitions():
+        yield from _read_partition(path)
+
+
+# ---------------------------
+# Kompaktierung / Aufbewahrung
+# ---------------------------
+def _month_end(month: str) -> date:
+    year, mon = int(month[:4]), int(month[5:7])
+    return date(year, mon, calendar.monthrange(year, mon)[1])
+
+
+def compact(archive_after_days: int = ARCHIVE_AFTER_DAYS, retention_days: int = RETENTION_DAYS,
+            today: Optional[date] = None) -> Dict[str, int]:
+    """
+    Rollt Monate, deren letzter Tag älter als ``archive_after_days`` ist, in ein
+    gzip-Archiv und löscht Archive jenseits von ``retention_days``. Nur über die
+    ticket_log-Queue aufrufen (sonst Wettlauf mit append()).
+    """
+    today = today or datetime.utcnow().date()
+    archive_before = today - timedelta(days=archive_after_days)
+    stats = {"archived_days": 0, "archived_months": 0, "deleted": 0}
+
+    days_by_month: Dict[str, List[str]] = {}
+    for key, path in partitions():
+        if len(key) == 10:
+            days_by_month.setdefault(key[:7], []).append(path)
+
+    for month, paths in sorted(days_by_month.items()):
+        if _month_end(month) >= archive_before:
+            continue
+        target = _month_path(month)
+        # Existiert das Archiv schon, ist es vollständig (Abbruch nach os.replace) → nur aufräumen
+        if not os.path.exists(target):
+            with gzip.open(target + ".tmp", "wb") as out:
+                for path in paths:
+                    with open(path, "rb") as f:
+                        for line in f:
+                            if line.endswith(b"\n"):
+                                out.write(line)
+            os.replace(target + ".tmp", target)
+            stats["archived_months"] += 1
+        for path in paths:
+            try:
+                os.remove(path)
+                stats["archived_days"] += 1
+            except PermissionError:
+                pass  # Windows: Datei gerade vom Web geöffnet – nächster Lauf
+
+    if retention_days > 0:
+        keep_from = today - timedelta(days=retention_days)
+        for key, path in partitions():
+            last_day = _month_end(key) if len(key) == 7 else date.fromisoformat(key)
+            if last_day < keep_from:
+                try:
+                    os.remove(path)
+                    stats["deleted"] += 1
+                except PermissionError:
+                    pass
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Partitioniertes Ticket-Event-Log")
+    parser.add_argument("--migrate", action="store_true", help="logs/ticket_events.json aufteilen")
+    parser.add_argument("--compact", action="store_true", help="alte Monate archivieren (Bot dabei stoppen)")
+    parser.add_argument("--channel")
+    parser.add_argument("--user")
+    parser.add_argument("--type")
+    parser.add_argument("--since")
+    parser.add_argument("--until")
+    args = parser.parse_args()
+    if args.migrate:
+        print(f"✅ {migrate_legacy()} Events migriert")
+    if args.compact:
+        print(f"✅ {compact()}")
+    if args.channel or args.user or args.type or args.since or args.until:
+        for event in query_events(args.channel, args.user, args.type, args.since, args.until):
+            print(json.dumps(event, ensure_ascii=False))
@@ -0,0 +1,146 @@
+# utils/file_lock.py
+# -*- coding: utf-8 -*-
+"""
+Prozessübergreifend sichere JSON-Dateien (mehrere uvicorn-Worker + Bot).
+
+- ``locked(path)``: exklusive Advisory-Sperre auf ``<path>.lock`` (fcntl unter
+  Linux, msvcrt unter Windows). Jedes Lesen-Ändern-Schreiben läuft darin.
+- ``write_json``: schreibt in eine temporäre Datei daneben und ersetzt das Ziel
+  per ``os.replace`` – Leser sehen immer entweder die alte oder die neue Datei.
+- ``read_json``: braucht keine Sperre. Mit ``cached=True`` wird pro Prozess
+  geparst und nur neu gelesen, wenn sich (mtime, Größe, Inode) geändert haben –
+  ein ``os.stat`` reicht also, um Änderungen anderer Worker zu bemerken.
+"""
+
+from __future__ import annotations
+import copy
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+LOCK_SUFFIX = ".lock"
+LOCK_POLL = 0.01  # Sekunden zwischen Versuchen (nur Windows)
+REPLACE_RETRIES = 50  # Windows: Ziel kurz von einem Leser geöffnet
+
+_state_lock = threading.Lock()
+_held: Dict[str, Tuple[threading.RLock, list]] = {}  # pfad → (RLock, [tiefe, handle])
+_cache: Dict[str, Tuple[Optional[tuple], Any]] = {}
+
+
+# ---------------------------
+# Sperren
+# ---------------------------
+def _acquire(fh) -> None:
+    if os.name == "nt":
+        while True:
+            try:
+                fh.seek(0)
+                msvcrt.locking(fh.fileno(), msvcrt.LK_NBLCK, 1)
+                return
+            except OSError:
+                time.sleep(LOCK_POLL)
+    fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+
+
+def _release(fh) -> None:
+    if os.name == "nt":
+        fh.seek(0)
+        msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+
+@contextmanager
+def locked(path: str) -> Iterator[None]:
+    """Exklusiv für alle Prozesse und Threads; im selben Thread verschachtelbar."""
+    key = os.path.abspath(path)
+    with _state_lock:
+        rlock, slot = _held.setdefault(key, (threading.RLock(), [0, None]))
+    with rlock:
+        if slot[0] == 0:
+            os.makedirs(os.path.dirname(key) or ".", exist_ok=True)
+            fh = open(key + LOCK_SUFFIX, "a+b")
+            try:
+                _acquire(fh)
+            except BaseException:
+                fh.close()
+                raise
+            slot[1] = fh
+        slot[0] += 1
+        try:
+            yield
+        finally:
+            slot[0] -= 1
+            if slot[0] == 0:
+                fh, slot[1] = slot[1], None
+                try:
+                    _release(fh)
+                finally:
+                    fh.close()
+
+
+# ---------------------------
+# Lesen / Schreiben
+# ---------------------------
+def _stamp(path: str) -> Optional[tuple]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+def read_json(path: str, default: Any = None, cached: bool = False) -> Any:
+    """
+    ``default`` (als Kopie), wenn die Datei fehlt oder kaputt ist. Mit
+    ``cached=True`` wird das gemeinsame Objekt zurückgegeben – nicht verändern.
+    """
+    key = os.path.abspath(path)
+    stamp = _stamp(key)
+    if stamp is None:
+        return copy.deepcopy(default)
+    if cached:
+        hit = _cache.get(key)
+        if hit and hit[0] == stamp:
+            return hit[1]
+    try:
+        with open(key, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return copy.deepcopy(default)
+    if cached:
+        _cache[key] = (stamp, data)
+    return data
+
+
+def write_json(path: str, data: Any, **dump_kwargs) -> None:
+    """Atomar ersetzen (temporäre Datei im selben Verzeichnis + os.replace)."""
+    key = os.path.abspath(path)
+    os.makedirs(os.path.dirname(key) or ".", exist_ok=True)
+    tmp = f"{key}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, **dump_kwargs)
+        f.flush()
+        os.fsync(f.fileno())
+    replace(tmp, key)
+    _cache.pop(key, None)
+
+
+def replace(src: str, dst: str) -> None:
+    """os.replace mit kurzen Wiederholungen (Windows verweigert das, solange ein Leser die Datei offen hat)."""
+    for attempt in range(REPLACE_RETRIES):
+        try:
+            os.replace(src, dst)
+            return
+        except PermissionError:
+            if attempt == REPLACE_RETRIES - 1:
+                raise
+            time.sleep(LOCK_POLL)
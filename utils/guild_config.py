@@ -0,0 +1,109 @@
+# utils/guild_config.py
+# -*- coding: utf-8 -*-
+"""
+Pro-Guild-Partitionierung für settings.json, config.json und den Rollen-Cache.
+
+settings.json und config.json behalten ihre bisherigen Schlüssel als Standard
+für alle Server. Abweichungen pro Server liegen unter ``"guilds"`` → Guild-ID
+und überschreiben nur die dort gesetzten Schlüssel::
+
+    {"welcome_text": "...", "ticket_categories": ["Support"],
+     "guilds": {"123": {"ticket_categories": ["Technik"], "admin_roles": [42]}}}
+
+Eine bestehende Ein-Server-Installation läuft damit unverändert weiter.
+``for_guild(data, guild_id)`` ist ein Dict-Lookup plus flachem Merge.
+
+Der Rollen-Cache liegt pro Guild in ``utils/roles_cache/<guild_id>.json``
+(RoleCacher schreibt nur die Datei der geänderten Guild), die Liste der Server
+für den Guild-Wähler im Webpanel in ``utils/guilds.json``.
+"""
+
+from __future__ import annotations
+import os
+from typing import Any, Dict, Iterable, List, Optional
+
+from utils import file_lock
+
+GUILDS_KEY = "guilds"
+ROLES_CACHE_DIR = os.path.join("utils", "roles_cache")
+LEGACY_ROLES_CACHE = os.path.join("utils", "roles_cache.json")
+GUILD_REGISTRY_FILE = os.path.join("utils", "guilds.json")
+
+
+def guild_key(guild_id) -> Optional[str]:
+    return None if guild_id in (None, "") else str(int(guild_id))
+
+
+# ---------------------------
+# settings.json / config.json
+# ---------------------------
+def for_guild(data: Optional[Dict[str, Any]], guild_id) -> Dict[str, Any]:
+    """Sicht einer Guild: globale Werte, überschrieben von ihrer Partition."""
+    data = data or {}
+    merged = {k: v for k, v in data.items() if k != GUILDS_KEY}
+    key = guild_key(guild_id)
+    if key is not None:
+        merged.update((data.get(GUILDS_KEY) or {}).get(key) or {})
+    return merged
+
+
+def update_guild(data: Dict[str, Any], guild_id, values: Dict[str, Any]) -> Dict[str, Any]:
+    """Werte in die Partition der Guild schreiben (``guild_id=None`` → globale Standards)."""
+    key = guild_key(guild_id)
+    if key is None:
+        data.update(values)
+    else:
+        data.setdefault(GUILDS_KEY, {}).setdefault(key, {}).update(values)
+    return data
+
+
+# ---------------------------
+# Rollen-Cache
+# ---------------------------
+def roles_cache_path(guild_id) -> str:
+    return os.path.join(ROLES_CACHE_DIR, f"{guild_key(guild_id)}.json")
+
+
+def write_roles(guild_id, roles: List[Dict[str, Any]]) -> None:
+    file_lock.write_json(roles_cache_path(guild_id), roles, indent=4, ensure_ascii=False)
+
+
+def read_roles(guild_id=None) -> List[Dict[str, Any]]:
+    """Rollen einer Guild; ohne Guild alle bekannten (IDs sind global eindeutig)."""
+    if guild_key(guild_id) is not None:
+        return file_lock.read_json(roles_cache_path(guild_id), [], cached=True)
+    roles, seen = [], set()
+    paths = [roles_cache_path(gid) for gid in known_guilds()] or [LEGACY_ROLES_CACHE]
+    for path in paths:
+        for role in file_lock.read_json(path, [], cached=True):
+            if role.get("id") not in seen:
+                seen.add(role.get("id"))
+                roles.append(role)
+    return roles
+
+
+# ---------------------------
+# Guild-Registry (Webpanel)
+# ---------------------------
+def known_guilds() -> Dict[str, str]:
+    """Guild-ID → Name der Server, auf denen der Bot zuletzt war."""
+    return file_lock.read_json(GUILD_REGISTRY_FILE, {}, cached=True)
+
+
+def register_guilds(guilds: Iterable, replace: bool = False) -> None:
+    """``guilds``: Objekte mit ``id``/``name``; ``replace`` = vollständige Liste (on_ready)."""
+    with file_lock.locked(GUILD_REGISTRY_FILE):
+        registry = {} if replace else file_lock.read_json(GUILD_REGISTRY_FILE, {})
+        registry.update({str(g.id): g.name for g in guilds})
+        file_lock.write_json(GUILD_REGISTRY_FILE, registry, indent=4, ensure_ascii=False)
+
+
+def forget_guild(guild_id) -> None:
+    with file_lock.locked(GUILD_REGISTRY_FILE):
+        registry = file_lock.read_json(GUILD_REGISTRY_FILE, {})
+        registry.pop(guild_key(guild_id), None)
+        file_lock.write_json(GUILD_REGISTRY_FILE, registry, indent=4, ensure_ascii=False)
+    try:
+        os.remove(roles_cache_path(guild_id))
+    except FileNotFoundError:
+        pass
@@ -2,29 +2,27 @@
 # -*- coding: utf-8 -*-
 
 import os
-import json
 import secrets
 from datetime import datetime
 from typing import Dict, List, Optional
 
+from utils import file_lock
+from utils.metrics import track_store
+
 DATA_DIR = "utils"
 os.makedirs(DATA_DIR, exist_ok=True)
 INVITE_FILE = os.path.join(DATA_DIR, "invite_keys.json")
 
 
-def _load() -> Dict:
-    if not os.path.exists(INVITE_FILE):
-        return {"items": []}
-    with open(INVITE_FILE, "r", encoding="utf-8") as f:
-        try:
-            return json.load(f)
-        except json.JSONDecodeError:
-            return {"items": []}
+@track_store("invite_keys", "load")
+def _load(cached: bool = False) -> Dict:
+    # cached=True nur für reine Leser – das Objekt wird zwischen Aufrufen geteilt
+    return file_lock.read_json(INVITE_FILE, {"items": []}, cached=cached)
 
 
+@track_store("invite_keys", "save")
 def _save(data: Dict) -> None:
-    with open(INVITE_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    file_lock.write_json(INVITE_FILE, data, ensure_ascii=False, indent=2)
 
 
 def _new_code(n: int = 20) -> str:
@@ -34,13 +32,12 @@ def _new_code(n: int = 20) -> str:
 
 
 def list_keys() -> List[Dict]:
-    data = _load()
+    data = _load(cached=True)
     # neueste zuerst
     return sorted(data["items"], key=lambda x: x.get("created_at", ""), reverse=True)
 
 
 def create_key(created_by: str, note: str = "", code: Optional[str] = None) -> Dict:
-    data = _load()
     code = code or _new_code()
     item = {
         "code": code,
@@ -52,29 +49,29 @@ def create_key(created_by: str, note: str = "", code: Optional[str] = None) -> D
         "used_at": None,
         "revoked": False,
     }
-    data["items"].append(item)
-    _save(data)
+    with file_lock.locked(INVITE_FILE):
+        data = _load()
+        data["items"].append(item)
+        _save(data)
     return item
 
 
 def revoke_key(code: str) -> bool:
-    data = _load()
-    changed = False
-    for it in data["items"]:
-        if it["code"] == code and not it.get("used"):
-            it["revoked"] = True
-            changed = True
-            break
-    if changed:
-        _save(data)
-    return changed
+    with file_lock.locked(INVITE_FILE):
+        data = _load()
+        for it in data["items"]:
+            if it["code"] == code and not it.get("used"):
+                it["revoked"] = True
+                _save(data)
+                return True
+    return False
 
 
 def validate_key(code: str) -> bool:
     code = (code or "").strip()
     if not code:
         return False
-    data = _load()
+    data = _load(cached=True)
     for it in data["items"]:
         if it["code"] == code and not it.get("used") and not it.get("revoked"):
             return True
@@ -82,12 +79,14 @@ def validate_key(code: str) -> bool:
 
 
 def mark_used(code: str, username: str) -> bool:
-    data = _load()
-    for it in data["items"]:
-        if it["code"] == code and not it.get("used") and not it.get("revoked"):
-            it["used"] = True
-            it["used_by"] = username
-            it["used_at"] = datetime.utcnow().isoformat()
-            _save(data)
-            return True
+    # Unter der Sperre prüfen + setzen: ein Key kann nicht von zwei Workern gleichzeitig eingelöst werden
+    with file_lock.locked(INVITE_FILE):
+        data = _load()
+        for it in data["items"]:
+            if it["code"] == code and not it.get("used") and not it.get("revoked"):
+                it["used"] = True
+                it["used_by"] = username
+                it["used_at"] = datetime.utcnow().isoformat()
+                _save(data)
+                return True
     return False
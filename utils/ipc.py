@@ -0,0 +1,245 @@
+# utils/ipc.py
+# -*- coding: utf-8 -*-
+"""
+Lokaler Nachrichtenkanal Web → Bot (statt Dateien zu pollen).
+
+Protokoll: pro Verbindung eine JSON-Zeile ``{"topic", "payload", "ts"}``, der Bot
+antwortet nach dem Dispatch mit ``{"ok": true}``. Transport ist ein Unix-Socket
+(Linux) bzw. TCP auf 127.0.0.1 (Windows); überschreibbar per ``BOT_IPC_ADDRESS``
+(``unix:/pfad`` oder ``host:port``).
+
+Ist der Bot nicht erreichbar, landet die Nachricht in ``logs/ipc_spool.jsonl``.
+Der Bot liest den Spool aus, sobald er eingeloggt ist (``IPCServer.open``), und
+nach jeder eingehenden Nachricht. Vorher angenommene Nachrichten landen ebenfalls
+im Spool – vor dem Login sind Guilds/Kanäle noch leer. Einträge werden erst nach
+der Zustellung aus dem Spool entfernt: nichts geht verloren, Nachrichten können
+aber doppelt ankommen (Empfänger laden ohnehin nur neu).
+
+Im Bot wird jede Nachricht als ``bot.dispatch("ipc_<topic>", payload)``
+weitergereicht; Cogs hören mit ``on_ipc_<topic>``. Laufen Bot und Web in einem
+Prozess (run_all.py), geht ``publish`` per ``set_local_handler`` direkt dorthin.
+"""
+
+from __future__ import annotations
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from utils import file_lock, metrics
+
+log = logging.getLogger(__name__)
+
+SOCKET_PATH = "bot_ipc.sock"
+TCP_ADDRESS = ("127.0.0.1", 8799)
+SPOOL_FILE = os.path.join("logs", "ipc_spool.jsonl")
+SEND_TIMEOUT = 1.0
+MAX_LINE = 64 * 1024
+
+# Themen (Web → Bot)
+SETTINGS_CHANGED = "settings_changed"
+ABSENCES_CHANGED = "absences_changed"
+USERS_CHANGED = "users_changed"
+INVITE_KEYS_CHANGED = "invite_keys_changed"
+CODE_UPDATED = "code_updated"  # Self-Update: {"files": [...]} → cogs/cog_reloader.py
+
+IPC_MESSAGES = metrics.counter("ipc_messages", "IPC-Nachrichten", ("topic", "result"))
+
+# Gesetzt im Ein-Prozess-Betrieb: Nachrichten gehen ohne Socket direkt an den Bot
+_local_handler: Optional[Callable[[str, Dict], None]] = None
+
+
+def set_local_handler(handler: Optional[Callable[[str, Dict], None]]) -> None:
+    global _local_handler
+    _local_handler = handler
+
+
+def _address() -> Tuple[str, object]:
+    raw = os.environ.get("BOT_IPC_ADDRESS", "")
+    if raw.startswith("unix:"):
+        return "unix", raw[len("unix:"):]
+    if raw:
+        host, _, port = raw.rpartition(":")
+        return "tcp", (host or "127.0.0.1", int(port))
+    if os.name == "nt":
+        return "tcp", TCP_ADDRESS
+    return "unix", SOCKET_PATH
+
+
+# ---------------------------
+# Spool (Bot offline)
+# ---------------------------
+def _spool(message: Dict) -> None:
+    with file_lock.locked(SPOOL_FILE):
+        os.makedirs(os.path.dirname(SPOOL_FILE) or ".", exist_ok=True)
+        with open(SPOOL_FILE, "a", encoding="utf-8") as f:
+            f.write(json.dumps(message, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def read_spool() -> Tuple[List[Dict], int]:
+    """(Nachrichten älteste zuerst, Anzahl gelesener Zeilen) – der Spool bleibt liegen."""
+    with file_lock.locked(SPOOL_FILE):
+        try:
+            with open(SPOOL_FILE, "r", encoding="utf-8") as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            return [], 0
+    messages = []
+    for line in lines:
+        try:
+            messages.append(json.loads(line))
+        except json.JSONDecodeError:
+            continue
+    return messages, len(lines)
+
+
+def ack_spool(count: int) -> None:
+    """Die ersten ``count`` Zeilen (zugestellt) entfernen; inzwischen Angehängtes bleibt."""
+    with file_lock.locked(SPOOL_FILE):
+        try:
+            with open(SPOOL_FILE, "r", encoding="utf-8") as f:
+                rest = f.readlines()[count:]
+        except FileNotFoundError:
+            return
+        if not rest:
+            os.remove(SPOOL_FILE)
+            return
+        tmp = SPOOL_FILE + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.writelines(rest)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, SPOOL_FILE)
+
+
+# ---------------------------
+# Senden (Web)
+# ---------------------------
+async def _open():
+    kind, address = _address()
+    if kind == "unix":
+        return await asyncio.open_unix_connection(address)
+    return await asyncio.open_connection(*address)
+
+
+async def publish(topic: str, payload: Optional[Dict] = None) -> bool:
+    """Meldet eine Änderung an den Bot. False = Bot offline, Nachricht liegt im Spool."""
+    if _local_handler is not None:
+        _local_handler(topic, payload or {})
+        IPC_MESSAGES.labels(topic=topic, result="local").inc()
+        return True
+    message = {"topic": topic, "payload": payload or {}, "ts": time.time()}
+    writer = None
+    try:
+        reader, writer = await asyncio.wait_for(_open(), SEND_TIMEOUT)
+        writer.write(json.dumps(message, ensure_ascii=False).encode() + b"\n")
+        await writer.drain()
+        reply = await asyncio.wait_for(reader.readline(), SEND_TIMEOUT)
+        if json.loads(reply or b"{}").get("ok"):
+            IPC_MESSAGES.labels(topic=topic, result="sent").inc()
+            return True
+    except (OSError, asyncio.TimeoutError, ValueError):
+        pass
+    finally:
+        if writer is not None:
+            writer.close()
+    await asyncio.get_running_loop().run_in_executor(None, _spool, message)
+    IPC_MESSAGES.labels(topic=topic, result="spooled").inc()
+    return False
+
+
+# ---------------------------
+# Empfangen (Bot)
+# ---------------------------
+class IPCServer:
+    """
+    Nimmt Nachrichten an und ruft ``handler(topic, payload)`` im Event-Loop auf.
+
+    ``ready=False`` (Bot): bis ``open()`` werden Nachrichten nur angenommen und
+    gespoolt, erst danach zugestellt – samt allem, was offline aufgelaufen ist.
+    """
+
+    def __init__(self, handler: Callable[[str, Dict], None], ready: bool = True):
+        self.handler = handler
+        self.ready = ready
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._drain_lock = asyncio.Lock()
+
+    async def start(self) -> None:
+        kind, address = _address()
+        if kind == "unix":
+            if os.path.exists(address):
+                os.remove(address)  # Rest eines abgestürzten Prozesses
+            self._server = await asyncio.start_unix_server(self._serve, address, limit=MAX_LINE)
+        else:
+            self._server = await asyncio.start_server(self._serve, *address, limit=MAX_LINE)
+        log.info(f"📡 IPC bereit ({kind}: {address})")
+        if self.ready:
+            await self.drain_spool()
+
+    async def open(self) -> None:
+        """Ab jetzt zustellen (z.B. nach ``bot.wait_until_ready()``), Spool nachliefern."""
+        self.ready = True
+        await self.drain_spool()
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        kind, address = _address()
+        if kind == "unix" and os.path.exists(address):
+            os.remove(address)
+
+    def accept(self, topic: str, payload: Dict) -> None:
+        """Aus demselben Prozess (run_all.py, ``set_local_handler``) – wie über den Socket."""
+        message = {"topic": topic, "payload": payload, "ts": time.time()}
+        if self.ready:
+            self._deliver(message)
+        else:
+            _spool(message)  # selten: Web-Änderung, bevor der Bot eingeloggt ist
+
+    def _deliver(self, message: Dict) -> None:
+        topic = str(message.get("topic") or "")
+        if not topic:
+            return
+        try:
+            self.handler(topic, message.get("payload") or {})
+            IPC_MESSAGES.labels(topic=topic, result="received").inc()
+        except Exception as e:
+            log.error(f"[IPC] Handler für {topic} fehlgeschlagen: {e}")
+
+    async def drain_spool(self) -> int:
+        loop = asyncio.get_running_loop()
+        async with self._drain_lock:  # sonst stellen zwei Aufrufe dieselben Zeilen zu
+            messages, lines = await loop.run_in_executor(None, read_spool)
+            for message in messages:
+                self._deliver(message)
+            if lines:
+                await loop.run_in_executor(None, ack_spool, lines)
+        if messages:
+            log.info(f"📡 {len(messages)} gespoolte IPC-Nachrichten zugestellt")
+        return len(messages)
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            line = await asyncio.wait_for(reader.readline(), SEND_TIMEOUT * 5)
+            message = json.loads(line)
+            if self.ready:
+                self._deliver(message)
+            else:
+                # Bot noch nicht eingeloggt → aufheben, open() liefert nach
+                await asyncio.get_running_loop().run_in_executor(None, _spool, message)
+            writer.write(b'{"ok": true}\n')
+            await writer.drain()
+        except (ValueError, OSError, asyncio.TimeoutError) as e:
+            log.warning(f"[IPC] Ungültige Nachricht verworfen: {e}")
+        finally:
+            writer.close()
+        # Was während einer Offline-Phase gespoolt wurde, gleich mitnehmen
+        if self.ready and os.path.exists(SPOOL_FILE):
+            await self.drain_spool()
@@ -0,0 +1,133 @@
+# utils/loop_watchdog.py
+# -*- coding: utf-8 -*-
+"""
+Watchdog für Event-Loop-Lag (Bot und Web-App).
+
+Eine Probe-Coroutine schläft in festen Intervallen und misst, wie viel später
+sie wieder aufwacht – das ist der Lag. Ein separater Daemon-Thread prüft, ob
+die Probe zu lange ausbleibt. Ist das der Fall, blockiert gerade jemand den
+Loop: dann wird der Stack des Loop-Threads geloggt, damit der blockierende
+Aufruf (Datei-I/O, bcrypt, DB …) mit Datei und Zeile sichtbar wird.
+
+Aktivierung:
+- Web: Umgebungsvariable ``LOOP_WATCHDOG=1`` (optional ``LOOP_WATCHDOG_THRESHOLD_MS``)
+- Bot: zusätzlich ``"loop_watchdog": {"enabled": true, "threshold_ms": 250}`` in config.json
+  (Kurzform ``"loop_watchdog": true`` = aktiviert mit Standard-Schwelle)
+"""
+
+from __future__ import annotations
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Optional, Union
+
+from utils import metrics
+
+log = logging.getLogger(__name__)
+
+LAG_SECONDS = metrics.histogram(
+    "event_loop_lag_seconds",
+    "Verzögerung des Event-Loops gegenüber dem geplanten Aufwachzeitpunkt",
+    ("process",),
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+LAG_QUANTILES = metrics.gauge(
+    "event_loop_lag_quantile_seconds", "Lag-Perzentile über die letzten Samples", ("process", "quantile")
+)
+STALLS = metrics.counter("event_loop_stalls", "Erkannte Loop-Blockaden über dem Schwellwert", ("process",))
+
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class LoopWatchdog:
+    def __init__(self, name: str, interval: float = 0.1, threshold: float = 0.5, window: int = 600):
+        self.name = name
+        self.interval = interval
+        self.threshold = threshold
+        self._samples: deque = deque(maxlen=window)
+        self._last_beat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lag_child = LAG_SECONDS.labels(process=name)
+        self._stall_child = STALLS.labels(process=name)
+
+    # ---------- Loop-Seite ----------
+    def start(self) -> None:
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._task = asyncio.get_running_loop().create_task(self._probe(), name=f"loop-watchdog-{self.name}")
+        self._thread = threading.Thread(target=self._monitor, name=f"loop-watchdog-{self.name}", daemon=True)
+        self._thread.start()
+        log.info(f"🐶 Loop-Watchdog aktiv ({self.name}, Schwelle {self.threshold * 1000:.0f} ms)")
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+
+    async def _probe(self) -> None:
+        published = 0
+        while True:
+            start = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._last_beat = now
+            lag = max(0.0, now - start - self.interval)
+            self._lag_child.observe(lag)
+            self._samples.append(lag)
+
+            published += 1
+            if published >= 50:  # Perzentile ca. alle 5 s neu berechnen
+                published = 0
+                self._publish_quantiles()
+
+    def _publish_quantiles(self) -> None:
+        ordered = sorted(self._samples)
+        if not ordered:
+            return
+        for q in QUANTILES:
+            idx = min(len(ordered) - 1, int(q * len(ordered)))
+            LAG_QUANTILES.labels(process=self.name, quantile=q).set(ordered[idx])
+
+    # ---------- Thread-Seite ----------
+    def _monitor(self) -> None:
+        reported_beat = None
+        while not self._stop.wait(self.interval):
+            beat = self._last_beat
+            stalled_for = time.monotonic() - beat
+            if stalled_for < self.threshold or beat == reported_beat:
+                continue
+            # Pro Blockade nur einmal melden
+            reported_beat = beat
+            self._stall_child.inc()
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame else "<kein Frame>"
+            log.warning(
+                f"⚠️ Event-Loop ({self.name}) blockiert seit {stalled_for * 1000:.0f} ms – aktueller Stack:\n{stack}"
+            )
+
+
+def maybe_start_watchdog(name: str, options: Union[dict, bool, None] = None) -> Optional[LoopWatchdog]:
+    """
+    Startet den Watchdog, wenn er per Umgebung oder ``options`` (aus config.json)
+    aktiviert ist. Muss innerhalb des laufenden Event-Loops aufgerufen werden.
+
+    ``options``: ``{"enabled": bool, "threshold_ms": float}`` oder nur ``true``/``false``.
+    """
+    if isinstance(options, bool):
+        options = {"enabled": options}
+    options = options or {}
+    enabled = options.get("enabled") or os.environ.get("LOOP_WATCHDOG", "") in ("1", "true", "yes")
+    if not enabled:
+        return None
+    threshold_ms = float(options.get("threshold_ms") or os.environ.get("LOOP_WATCHDOG_THRESHOLD_MS") or 250)
+    watchdog = LoopWatchdog(name, threshold=threshold_ms / 1000.0)
+    watchdog.start()
+    return watchdog
@@ -0,0 +1,156 @@
+# utils/member_cache.py
+# -*- coding: utf-8 -*-
+"""
+Member-Cache-Richtlinie für große Server.
+
+Standardmäßig lädt discord.py beim Start jedes Mitglied aller Guilds per
+Chunking und hält es samt Presence im Speicher. Die Cogs brauchen davon nur
+Staff (Online-Zählung, Auto-Zuweisung, Overwrites) und Ticket-Nutzer.
+
+config.json → ``"member_cache": {"mode": "...", "recent_size": 1000}``
+
+- ``full`` (Standard): bisheriges Verhalten, Chunking beim Start.
+- ``lazy``: kein Chunking beim Start (schnelles on_ready); die Guilds werden
+  danach nacheinander im Hintergrund gechunkt (cogs/member_cache_manager.py).
+- ``bounded``: kein Chunking, neue/aktive Member landen nicht automatisch im
+  Cache. Staff wird nach on_ready gezielt per ``query_members`` (mit Presence)
+  geladen und bleibt angeheftet; zuletzt aktive Ticket-Nutzer liegen in einem
+  LRU pro Guild (``recent_size``), der älteste fliegt raus.
+
+``await member_cache.get_member(guild, user_id)`` funktioniert in allen Modi:
+Cache, sonst ``fetch_member`` (und merken).
+"""
+
+from __future__ import annotations
+import logging
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Set
+
+import discord
+
+from utils import metrics
+
+log = logging.getLogger(__name__)
+
+MODE_FULL = "full"
+MODE_LAZY = "lazy"
+MODE_BOUNDED = "bounded"
+DEFAULT_RECENT_SIZE = 1000
+QUERY_BATCH = 100  # Gateway: höchstens 100 user_ids pro Request
+
+MEMBER_LOOKUPS = metrics.counter("member_cache_lookups", "Member-Abfragen über get_member", ("result",))
+MEMBER_EVICTIONS = metrics.counter("member_cache_evictions", "Aus dem LRU verdrängte Member")
+
+
+class MemberCache:
+    def __init__(self):
+        self.mode = MODE_FULL
+        self.recent_size = DEFAULT_RECENT_SIZE
+        self._pinned: Dict[int, Set[int]] = {}
+        self._recent: Dict[int, "OrderedDict[int, None]"] = {}
+
+    # ---------------------------
+    # Konfiguration
+    # ---------------------------
+    def configure(self, config: dict) -> None:
+        options = config.get("member_cache") or {}
+        mode = options.get("mode", MODE_FULL)
+        if mode not in (MODE_FULL, MODE_LAZY, MODE_BOUNDED):
+            log.warning(f"⚠️ Unbekannter member_cache.mode {mode!r} – verwende {MODE_FULL}")
+            mode = MODE_FULL
+        self.mode = mode
+        self.recent_size = max(0, int(options.get("recent_size", DEFAULT_RECENT_SIZE)))
+
+    def client_options(self) -> dict:
+        """Zusätzliche Argumente für ``commands.Bot(...)``."""
+        if self.mode == MODE_FULL:
+            return {}
+        if self.mode == MODE_LAZY:
+            return {"chunk_guilds_at_startup": False}
+        # Nichts automatisch cachen – nur was pin()/remember() hineinlegen
+        return {"chunk_guilds_at_startup": False, "member_cache_flags": discord.MemberCacheFlags.none()}
+
+    @property
+    def bounded(self) -> bool:
+        return self.mode == MODE_BOUNDED
+
+    # ---------------------------
+    # Staff (angeheftet)
+    # ---------------------------
+    async def pin(self, guild: discord.Guild, user_ids: Iterable[int]) -> int:
+        """Staff festlegen und fehlende nachladen; gibt die Zahl geladener Member zurück."""
+        ids = {int(i) for i in user_ids}
+        previous = self._pinned.get(guild.id, set())
+        self._pinned[guild.id] = ids
+        recent = self._recent.get(guild.id, {})
+        me = guild.me.id if guild.me else None
+        for uid in previous - ids:
+            if uid not in recent and uid != me:
+                guild._remove_member(discord.Object(uid))
+
+        missing = [uid for uid in ids if guild.get_member(uid) is None]
+        presences = guild._state._intents.presences
+        loaded = 0
+        for start in range(0, len(missing), QUERY_BATCH):
+            batch = missing[start:start + QUERY_BATCH]
+            members = await guild.query_members(user_ids=batch, presences=presences, cache=True)
+            loaded += len(members)
+        return loaded
+
+    # ---------------------------
+    # Zuletzt aktive Nutzer (LRU)
+    # ---------------------------
+    def remember(self, member: discord.Member) -> None:
+        if not self.bounded or not isinstance(member, discord.Member):
+            return
+        guild = member.guild
+        if guild.get_member(member.id) is None:
+            guild._add_member(member)
+        recent = self._recent.setdefault(guild.id, OrderedDict())
+        recent[member.id] = None
+        recent.move_to_end(member.id)
+        self._evict(guild, recent)
+
+    def _evict(self, guild: discord.Guild, recent: "OrderedDict[int, None]") -> None:
+        pinned = self._pinned.get(guild.id, set())
+        me = guild.me.id if guild.me else None
+        while len(recent) > self.recent_size:
+            uid, _ = recent.popitem(last=False)
+            if uid in pinned or uid == me:
+                continue
+            guild._remove_member(discord.Object(uid))
+            MEMBER_EVICTIONS.inc()
+
+    async def get_member(self, guild: discord.Guild, user_id: int) -> Optional[discord.Member]:
+        """Aus dem Cache, sonst per API (ein Request) – ``None``, wenn nicht (mehr) auf dem Server."""
+        user_id = int(user_id)
+        member = guild.get_member(user_id)
+        if member is not None:
+            MEMBER_LOOKUPS.labels(result="hit").inc()
+            recent = self._recent.get(guild.id)
+            if recent is not None and user_id in recent:
+                recent.move_to_end(user_id)
+            return member
+        try:
+            member = await guild.fetch_member(user_id)
+        except discord.NotFound:
+            MEMBER_LOOKUPS.labels(result="missing").inc()
+            return None
+        except discord.HTTPException as e:
+            log.warning(f"[MemberCache] fetch_member({user_id}) fehlgeschlagen: {e}")
+            MEMBER_LOOKUPS.labels(result="error").inc()
+            return None
+        MEMBER_LOOKUPS.labels(result="fetch").inc()
+        if self.bounded:
+            self.remember(member)
+        else:
+            guild._add_member(member)
+        return member
+
+    def forget_guild(self, guild_id: int) -> None:
+        self._pinned.pop(guild_id, None)
+        self._recent.pop(guild_id, None)
+
+
+# Singleton für Bot und Cogs
+member_cache = MemberCache()
@@ -11,6 +11,9 @@ import os
 from typing import Any, Dict, List
 from datetime import datetime
 
+from utils import file_lock
+from utils.metrics import track_store
+
 SUBMISSIONS_PATH = os.path.join("utils", "member_submissions.json")
 
 
@@ -21,6 +24,7 @@ def _ensure_file() -> None:
             json.dump([], f, ensure_ascii=False, indent=2)
 
 
+@track_store("member_submissions", "load")
 def load_submissions() -> List[Dict[str, Any]]:
     _ensure_file()
     try:
@@ -33,10 +37,10 @@ def load_submissions() -> List[Dict[str, Any]]:
         return []
 
 
+@track_store("member_submissions", "save")
 def save_submissions(items: List[Dict[str, Any]]) -> None:
     os.makedirs(os.path.dirname(SUBMISSIONS_PATH), exist_ok=True)
-    with open(SUBMISSIONS_PATH, "w", encoding="utf-8") as f:
-        json.dump(items, f, ensure_ascii=False, indent=2)
+    file_lock.write_json(SUBMISSIONS_PATH, items, ensure_ascii=False, indent=2)
 
 
 def add_submission(username: str, payload: Dict[str, Any]) -> Dict[str, Any]:
@@ -44,13 +48,14 @@ def add_submission(username: str, payload: Dict[str, Any]) -> Dict[str, Any]:
     Fügt eine neue Einreichung hinzu.
     payload: die form-Felder als dict
     """
-    items = load_submissions()
-    entry = {
-        "id": len(items) + 1,
-        "username": username,
-        "submitted_at": datetime.utcnow().isoformat() + "Z",
-        "data": payload,
-    }
-    items.append(entry)
-    save_submissions(items)
+    with file_lock.locked(SUBMISSIONS_PATH):
+        items = load_submissions()
+        entry = {
+            "id": len(items) + 1,
+            "username": username,
+            "submitted_at": datetime.utcnow().isoformat() + "Z",
+            "data": payload,
+        }
+        items.append(entry)
+        save_submissions(items)
     return entry
@@ -0,0 +1,323 @@
+# utils/metrics.py
+# -*- coding: utf-8 -*-
+"""
+Schlanke Prometheus-kompatible Metriken (Counter, Gauge, Histogram) ohne
+externe Abhängigkeit.
+
+Alle Metriken leben in einer prozessweiten Registry und werden über
+``render()`` im Prometheus-Textformat ausgegeben. Das Aufzeichnen kostet
+pro Messung nur ein Dict-Lookup, ein ``bisect`` und eine kurze Sperre –
+billig genug, um es in Produktion dauerhaft anzulassen.
+"""
+
+from __future__ import annotations
+import functools
+import inspect
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Standard-Buckets in Sekunden (1 ms … 10 s)
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values, **kwargs):
+        if kwargs:
+            values = tuple(str(kwargs.get(n, "")) for n in self.labelnames)
+        else:
+            values = tuple(str(v) for v in values)
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _samples(self) -> Iterator[Tuple[str, str, float]]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for suffix, labels, value in self._samples():
+            lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return lines
+
+
+class _ValueChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = float(value)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _ValueChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def _samples(self):
+        for values, child in list(self._children.items()):
+            yield "_total", _format_labels(self.labelnames, values), child.value
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.labels().dec(amount)
+
+    def _samples(self):
+        for values, child in list(self._children.items()):
+            yield "", _format_labels(self.labelnames, values), child.value
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum", "count", "_lock")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        idx = bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[idx] += 1
+            self.sum += value
+            self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Grobe Schätzung (obere Bucket-Grenze) – reicht für Übersichten."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, c in zip(self.buckets + (float("inf"),), self.counts):
+            seen += c
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def _samples(self):
+        for values, child in list(self._children.items()):
+            cumulative = 0
+            for bound, c in zip(self.buckets + (float("inf"),), child.counts):
+                cumulative += c
+                le = f'le="{_format_value(bound)}"'
+                yield "_bucket", _format_labels(self.labelnames, values, le), cumulative
+            yield "_sum", _format_labels(self.labelnames, values), child.sum
+            yield "_count", _format_labels(self.labelnames, values), child.count
+
+
+# ---------------------------
+# Registry
+# ---------------------------
+_registry: Dict[str, _Metric] = {}
+_registry_lock = threading.Lock()
+
+
+def _get_or_create(cls, name: str, documentation: str, labelnames: Sequence[str], **kwargs):
+    metric = _registry.get(name)
+    if metric is None:
+        with _registry_lock:
+            metric = _registry.get(name)
+            if metric is None:
+                metric = cls(name, documentation, labelnames, **kwargs)
+                _registry[name] = metric
+    return metric
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    return _get_or_create(Counter, name, documentation, labelnames)
+
+
+def gauge(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+    return _get_or_create(Gauge, name, documentation, labelnames)
+
+
+def histogram(name: str, documentation: str, labelnames: Sequence[str] = (),
+              buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+    return _get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+
+def get_metric(name: str) -> Optional[_Metric]:
+    return _registry.get(name)
+
+
+def render() -> str:
+    """Alle Metriken im Prometheus-Textformat (text/plain; version=0.0.4)."""
+    lines: List[str] = []
+    for metric in list(_registry.values()):
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# ---------------------------
+# Helfer
+# ---------------------------
+@contextmanager
+def timed(metric: Histogram, **labels):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metric.labels(**labels).observe(time.perf_counter() - start)
+
+
+STORE_SECONDS = histogram(
+    "json_store_seconds",
+    "Dauer von Lade-/Speichervorgängen der JSON-Stores",
+    ("store", "op"),
+)
+
+
+def track_store(store: str, op: str) -> Callable:
+    """
+    Dekorator für Lade-/Speicherfunktionen der Datei-Stores.
+    Zeichnet Dauer und (über _count) Anzahl pro Store/Operation auf.
+    """
+    def decorator(func):
+        child = STORE_SECONDS.labels(store=store, op=op)
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    child.observe(time.perf_counter() - start)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                child.observe(time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+# ---------------------------
+# ASGI-Middleware (FastAPI)
+# ---------------------------
+HTTP_REQUESTS = counter("http_requests", "Anzahl HTTP-Requests", ("method", "route", "status"))
+HTTP_SECONDS = histogram("http_request_seconds", "Latenz der HTTP-Requests", ("method", "route"))
+HTTP_IN_FLIGHT = gauge("http_requests_in_flight", "Aktuell laufende HTTP-Requests")
+HTTP_RESPONSE_BYTES = counter("http_response_bytes", "Ausgelieferte Response-Bytes", ("route",))
+
+
+class MetricsMiddleware:
+    """
+    Reine ASGI-Middleware (kein BaseHTTPMiddleware → kein Extra-Task pro Request).
+    Als Label dient das Routen-Template (z.B. /admin/users/edit/{user_id}),
+    nicht der konkrete Pfad – so bleibt die Kardinalität begrenzt.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        start = time.perf_counter()
+        status_code = 500
+        sent_bytes = 0
+        in_flight = HTTP_IN_FLIGHT.labels()
+        in_flight.inc()
+
+        async def send_wrapper(message):
+            nonlocal status_code, sent_bytes
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                sent_bytes += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_flight.dec()
+            route = scope.get("route")
+            route_path = getattr(route, "path", None) or "unmatched"
+            method = scope.get("method", "GET")
+            HTTP_SECONDS.labels(method=method, route=route_path).observe(time.perf_counter() - start)
+            HTTP_REQUESTS.labels(method=method, route=route_path, status=status_code).inc()
+            if sent_bytes:
+                HTTP_RESPONSE_BYTES.labels(route=route_path).inc(sent_bytes)
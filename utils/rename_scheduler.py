@@ -0,0 +1,79 @@
+# utils/rename_scheduler.py
+# -*- coding: utf-8 -*-
+"""
+Koaleszierender Scheduler für Kanal-Umbenennungen.
+
+Discord erlaubt pro Kanal nur ca. 2 Namensänderungen in 10 Minuten; ein
+weiterer ``channel.edit(name=...)`` hängt sonst minutenlang. Hier wird pro
+Kanal nur der *zuletzt gewünschte* Name gemerkt und erst angewendet, wenn das
+Fenster es erlaubt. Schließen → Öffnen → Schließen ergibt so höchstens eine
+einzige Umbenennung auf den Endzustand.
+"""
+
+from __future__ import annotations
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Deque, Dict
+
+import discord
+
+log = logging.getLogger(__name__)
+
+RENAMES_PER_WINDOW = 2
+WINDOW_SECONDS = 600
+
+
+class RenameScheduler:
+    def __init__(self, per_window: int = RENAMES_PER_WINDOW, window: float = WINDOW_SECONDS):
+        self.per_window = per_window
+        self.window = window
+        self._desired: Dict[int, str] = {}
+        self._history: Dict[int, Deque[float]] = {}
+        self._tasks: Dict[int, asyncio.Task] = {}
+
+    def request(self, channel: discord.abc.GuildChannel, name: str) -> None:
+        """Merkt den Zielnamen vor; ein bereits wartender Auftrag übernimmt ihn einfach."""
+        self._desired[channel.id] = name
+        task = self._tasks.get(channel.id)
+        if task is None or task.done():
+            self._tasks[channel.id] = asyncio.get_running_loop().create_task(self._apply(channel))
+
+    def cancel(self, channel_id: int) -> None:
+        self._desired.pop(channel_id, None)
+        task = self._tasks.pop(channel_id, None)
+        if task:
+            task.cancel()
+
+    def _wait_time(self, channel_id: int) -> float:
+        history = self._history.setdefault(channel_id, deque(maxlen=self.per_window))
+        now = time.monotonic()
+        if len(history) < self.per_window:
+            return 0.0
+        return max(0.0, history[0] + self.window - now)
+
+    async def _apply(self, channel: discord.abc.GuildChannel) -> None:
+        try:
+            while True:
+                delay = self._wait_time(channel.id)
+                if delay:
+                    await asyncio.sleep(delay)
+                name = self._desired.get(channel.id)
+                if name is None or name == channel.name:
+                    return
+                await channel.edit(name=name)
+                self._history[channel.id].append(time.monotonic())
+                # Wurde während des edit() ein neuer Name gewünscht? Dann noch eine Runde.
+                if self._desired.get(channel.id) == name:
+                    return
+        except discord.NotFound:
+            pass
+        except Exception as e:
+            log.warning(f"[RenameScheduler] Umbenennen von {channel.id} fehlgeschlagen: {e}")
+        finally:
+            self._tasks.pop(channel.id, None)
+            self._desired.pop(channel.id, None)
+
+
+rename_scheduler = RenameScheduler()
@@ -0,0 +1,401 @@
+# utils/self_update.py
+# -*- coding: utf-8 -*-
+"""
+Self-Update per GitHub-Webhook, ohne dass Webserver oder Bot stehen bleiben.
+
+Ablauf:
+1. ``/update`` prüft die Signatur, ruft ``enqueue()`` auf und antwortet sofort mit 202.
+2. Ein Hintergrund-Task führt git asynchron aus (fetch, reset --hard, submodule
+   update). Jede Ausgabezeile geht ins Log und nach ``logs/updates/<job>.log``;
+   ``follow_log`` liefert sie live an ``/admin/updates/<job>/log``.
+3. Danach:
+   - Web: ``request_web_reload()`` stempelt ``logs/updates/web_reload.request``,
+     aber erst wenn der letzte (Folge-)Job fertig und ``STATE_FILE`` frei ist.
+     Der Supervisor aus ``run_workers`` (``main.py --workers N``) ersetzt dann
+     die Worker nacheinander: der neue nimmt erst Anfragen an, wenn er bereit
+     ist, erst dann wird der alte beendet – keine Downtime.
+   - Bot: ``ipc.CODE_UPDATED`` mit den geänderten Dateien, cogs/cog_reloader.py
+     lädt die betroffenen Cogs per ``reload_extension`` neu.
+
+Es läuft immer nur ein Job (auch über mehrere Worker, siehe ``STATE_FILE``).
+Pushes während eines Jobs werden zu genau einem Folgejob zusammengefasst.
+``STATE_FILE`` merkt sich PID und Host des ausführenden Prozesses: stirbt er
+mitten im Job (Worker-Absturz, Neustart), gilt der Eintrag sofort als verwaist,
+nicht erst nach ``STALE_AFTER``. ``resume()`` (Lifespan in main.py) übernimmt
+solche Jobs und vorgemerkte Folgejobs beim nächsten Start.
+
+Im Entwicklungsmodus (``python main.py`` → uvicorn mit ``reload=True``) würde
+``git reset --hard`` den eigenen Worker neu starten. Dort setzt main.py
+``DETACH_ENV``, und der Job läuft als eigener Prozess
+(``python -m utils.self_update <job_id>``).
+"""
+
+from __future__ import annotations
+import asyncio
+import logging
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+
+from utils import file_lock, ipc, metrics
+
+log = logging.getLogger(__name__)
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+UPDATES_DIR = os.path.join(BASE_DIR, "logs", "updates")
+STATE_FILE = os.path.join(UPDATES_DIR, "state.json")
+RELOAD_REQUEST_FILE = os.path.join(UPDATES_DIR, "web_reload.request")
+
+REPO_DIR = os.environ.get("UPDATE_REPO_DIR", BASE_DIR)
+BRANCH = os.environ.get("UPDATE_BRANCH", "main")
+COMMAND_TIMEOUT = 120  # Sekunden pro git-Befehl
+STALE_AFTER = 15 * 60  # Job-Eintrag gilt danach als verwaist, auch wenn der Prozess noch lebt
+DETACH_ENV = "SELF_UPDATE_DETACHED"  # "1" → Jobs in eigenem Prozess (Reload-Modus)
+
+# Letzte Zeile jedes Job-Logs
+DONE_PREFIX = "== "
+STATE_SUCCESS = "success"
+STATE_FAILED = "failed"
+
+UPDATE_JOBS = metrics.counter("update_jobs", "Self-Update-Jobs", ("result",))
+UPDATE_SECONDS = metrics.histogram("update_job_seconds", "Dauer eines Self-Update-Jobs",
+                                   buckets=(1, 2.5, 5, 10, 20, 30, 60, 120, 300))
+
+_tasks = set()  # Referenzen halten, sonst sammelt der GC laufende Tasks ein
+
+
+# ---------------------------
+# Job-Verwaltung
+# ---------------------------
+def _new_job_id() -> str:
+    return datetime.now().strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:6]
+
+
+def log_path(job_id: str) -> str:
+    # job_id kommt auch aus der URL – nur den Dateinamen verwenden
+    return os.path.join(UPDATES_DIR, os.path.basename(job_id) + ".log")
+
+
+def _running_state(job_id: str, pid: Optional[int] = None) -> Dict:
+    return {"running": job_id, "started": time.time(), "pending": False,
+            "pid": pid or os.getpid(), "host": socket.gethostname()}
+
+
+def _pid_alive(pid: int) -> bool:
+    if os.name == "nt":
+        # os.kill(pid, 0) würde unter Windows den Prozess beenden
+        import ctypes
+        kernel32 = ctypes.windll.kernel32
+        handle = kernel32.OpenProcess(0x1000, False, pid)  # PROCESS_QUERY_LIMITED_INFORMATION
+        if not handle:
+            return False
+        code = ctypes.c_ulong()
+        kernel32.GetExitCodeProcess(handle, ctypes.byref(code))
+        kernel32.CloseHandle(handle)
+        return code.value == 259  # STILL_ACTIVE
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass  # existiert, gehört nur jemand anderem
+    return True
+
+
+def _owner_alive(state: Dict) -> bool:
+    """Läuft der eingetragene Job noch? Ohne PID/auf anderem Host zählt nur das Alter."""
+    if time.time() - state.get("started", 0) >= STALE_AFTER:
+        return False
+    pid = state.get("pid")
+    if not pid or state.get("host") != socket.gethostname():
+        return True
+    if pid == os.getpid():
+        return bool(_tasks)  # gleicher Prozess, aber kein Task mehr → verwaist
+    return _pid_alive(pid)
+
+
+def _abandon(job_id: str) -> None:
+    """Log eines verwaisten Jobs abschließen, damit ``follow_log``/``job_status`` enden."""
+    status = job_status(job_id)
+    if status and status["state"] == "running":
+        with open(log_path(job_id), "a", encoding="utf-8") as f:
+            f.write("❌ Prozess mitten im Job beendet – Update wird neu gestartet\n")
+            f.write(f"{DONE_PREFIX}{STATE_FAILED}\n")
+
+
+def _claim(resume: bool = False) -> Tuple[Optional[str], bool]:
+    """
+    (job_id, neu gestartet?) – läuft schon ein Job, wird nur ein Folgejob vorgemerkt.
+    ``resume=True``: nur einen verwaisten oder vorgemerkten Job übernehmen (sonst ``None``).
+    """
+    with file_lock.locked(STATE_FILE):
+        state = file_lock.read_json(STATE_FILE, {})
+        running = state.get("running")
+        if running and _owner_alive(state):
+            if resume:
+                return None, False
+            state["pending"] = True
+            file_lock.write_json(STATE_FILE, state)
+            return running, False
+        if resume and not running and not state.get("pending"):
+            return None, False
+        if running:
+            # Der Job ist mit seinem Prozess gestorben; git ist idempotent → neu starten
+            log.warning(f"⚠️ Update-Job {running} verwaist (PID {state.get('pid')}) – starte neu")
+            _abandon(running)
+        job_id = _new_job_id()
+        file_lock.write_json(STATE_FILE, _running_state(job_id))
+        return job_id, True
+
+
+def _set_owner(job_id: str, pid: int) -> None:
+    with file_lock.locked(STATE_FILE):
+        state = file_lock.read_json(STATE_FILE, {})
+        if state.get("running") == job_id:
+            state["pid"] = pid
+            file_lock.write_json(STATE_FILE, state)
+
+
+def _finish() -> Optional[str]:
+    """Job austragen; gab es währenddessen Pushes, direkt den Folgejob zurückgeben."""
+    with file_lock.locked(STATE_FILE):
+        state = file_lock.read_json(STATE_FILE, {})
+        if state.get("pending"):
+            job_id = _new_job_id()
+            file_lock.write_json(STATE_FILE, _running_state(job_id))
+            return job_id
+        file_lock.write_json(STATE_FILE, {"running": None, "pending": False})
+        return None
+
+
+def _spawn(job_id: str) -> None:
+    """Job als eigenen Prozess starten, der einen Neustart des Web-Workers überlebt."""
+    kwargs = {}
+    if os.name == "nt":
+        kwargs["creationflags"] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        kwargs["start_new_session"] = True
+    os.makedirs(UPDATES_DIR, exist_ok=True)
+    with open(log_path(job_id), "a", encoding="utf-8") as err:
+        proc = subprocess.Popen([sys.executable, "-m", "utils.self_update", job_id], cwd=BASE_DIR,
+                                stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=err, **kwargs)
+    _set_owner(job_id, proc.pid)
+    # Prozess nach dem Ende einsammeln (sonst Zombie, den _pid_alive für lebendig hält)
+    threading.Thread(target=proc.wait, daemon=True).start()
+
+
+def _start(job_id: str) -> None:
+    if os.environ.get(DETACH_ENV) == "1":
+        _spawn(job_id)
+        return
+    task = asyncio.get_running_loop().create_task(_run(job_id))
+    _tasks.add(task)
+    task.add_done_callback(_tasks.discard)
+
+
+def enqueue() -> Dict:
+    """Vom Webhook aufgerufen (im Event-Loop); gibt sofort zurück."""
+    job_id, started = _claim()
+    if started:
+        _start(job_id)
+    return {"job_id": job_id, "queued": not started}
+
+
+def resume() -> Optional[str]:
+    """Beim Start (Lifespan): verwaisten oder vorgemerkten Job übernehmen."""
+    job_id, started = _claim(resume=True)
+    if started:
+        log.info(f"🔄 Setze Update als Job {job_id} fort")
+        _start(job_id)
+    return job_id
+
+
+# ---------------------------
+# Ausführung
+# ---------------------------
+class _JobLog:
+    def __init__(self, job_id: str):
+        os.makedirs(UPDATES_DIR, exist_ok=True)
+        self.job_id = job_id
+        self._file = open(log_path(job_id), "a", encoding="utf-8")
+
+    def write(self, line: str) -> None:
+        log.info(f"[update {self.job_id}] {line}")
+        self._file.write(line + "\n")
+        self._file.flush()
+
+    def close(self, state: str) -> None:
+        self._file.write(f"{DONE_PREFIX}{state}\n")
+        self._file.close()
+
+
+async def _git(job: _JobLog, *args: str) -> Tuple[int, List[str]]:
+    """git-Befehl ausführen, Ausgabe zeilenweise ins Job-Log streamen."""
+    job.write("$ git " + " ".join(args))
+    proc = await asyncio.create_subprocess_exec(
+        "git", *args, cwd=REPO_DIR,
+        stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT,
+    )
+    lines: List[str] = []
+
+    async def pump():
+        async for raw in proc.stdout:
+            line = raw.decode("utf-8", "replace").rstrip()
+            lines.append(line)
+            job.write(line)
+
+    try:
+        await asyncio.wait_for(asyncio.gather(pump(), proc.wait()), COMMAND_TIMEOUT)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        job.write(f"⏱️ Abgebrochen nach {COMMAND_TIMEOUT} s")
+        return -1, lines
+    return proc.returncode, lines
+
+
+async def _update(job: _JobLog) -> List[str]:
+    """git-Schritte; gibt die geänderten Dateien zurück. Wirft RuntimeError bei Fehlern."""
+    code, out = await _git(job, "rev-parse", "HEAD")
+    if code:
+        raise RuntimeError("git rev-parse fehlgeschlagen")
+    before = out[-1].strip()
+    for args in (("fetch", "--all"),
+                 ("reset", "--hard", f"origin/{BRANCH}"),
+                 ("submodule", "update", "--init", "--recursive")):
+        code, _ = await _git(job, *args)
+        if code:
+            raise RuntimeError(f"git {args[0]} fehlgeschlagen (Exit-Code {code})")
+    code, out = await _git(job, "diff", "--name-only", before, "HEAD")
+    if code:
+        raise RuntimeError("git diff fehlgeschlagen")
+    return [line.strip() for line in out if line.strip()]
+
+
+async def _apply(job: _JobLog, changed: List[str]) -> bool:
+    """
+    Geänderten Code laden: Bot-Cogs per IPC. Gibt zurück, ob die Web-Worker neu
+    starten müssen – das übernimmt ``_run`` erst nach dem letzten Job, sonst
+    beendet der Neustart genau den Worker, in dem der Job noch läuft.
+    """
+    if not changed:
+        job.write("Keine Änderungen – nichts neu zu laden")
+        return False
+    web_reload = any(not path.startswith("cogs/") for path in changed)
+    if web_reload:
+        job.write("🔄 Web-Worker werden nach Abschluss nacheinander neu gestartet")
+    bot_files = [p for p in changed if p.endswith(".py") and p.startswith(("cogs/", "utils/"))]
+    if bot_files:
+        delivered = await ipc.publish(ipc.CODE_UPDATED, {"files": bot_files})
+        job.write(f"🔄 Bot benachrichtigt ({len(bot_files)} Dateien)"
+                  + ("" if delivered else " – Bot offline, Nachricht im Spool"))
+    if any(p in ("bot.py", "run_all.py", "requirements.txt") for p in changed):
+        job.write("⚠️ Einstiegspunkte/Abhängigkeiten geändert – Bot-Neustart nötig")
+    return web_reload
+
+
+async def _run(job_id: Optional[str]) -> None:
+    web_reload = False
+    while job_id:
+        job = _JobLog(job_id)
+        start = time.perf_counter()
+        state = STATE_FAILED
+        try:
+            changed = await _update(job)
+            job.write(f"✅ Stand von origin/{BRANCH} übernommen, {len(changed)} Dateien geändert")
+            web_reload = await _apply(job, changed) or web_reload
+            state = STATE_SUCCESS
+        except Exception as e:
+            job.write(f"❌ Update fehlgeschlagen: {e}")
+        finally:
+            UPDATE_SECONDS.observe(time.perf_counter() - start)
+            UPDATE_JOBS.labels(result=state).inc()
+            job.close(state)
+            job_id = _finish()
+    # Erst jetzt: STATE_FILE ist freigegeben und kein Folgejob steht mehr an
+    if web_reload:
+        request_web_reload()
+
+
+# ---------------------------
+# Status / Log
+# ---------------------------
+def job_status(job_id: str) -> Optional[Dict]:
+    path = log_path(job_id)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    state = "running"
+    if lines and lines[-1].startswith(DONE_PREFIX):
+        state = lines.pop()[len(DONE_PREFIX):]
+    return {"job_id": job_id, "state": state, "log": lines}
+
+
+async def follow_log(job_id: str, poll: float = 0.5) -> AsyncIterator[str]:
+    """Log-Zeilen wie ``tail -f``, bis der Job fertig ist (auch aus anderen Workern)."""
+    last_line = time.monotonic()
+    with open(log_path(job_id), "r", encoding="utf-8") as f:
+        while True:
+            line = f.readline()
+            if not line:
+                if time.monotonic() - last_line > STALE_AFTER:
+                    return  # Worker mit dem Job ist weg
+                await asyncio.sleep(poll)
+                continue
+            last_line = time.monotonic()
+            yield line
+            if line.startswith(DONE_PREFIX):
+                return
+
+
+# ---------------------------
+# Rollierender Worker-Neustart
+# ---------------------------
+def request_web_reload() -> None:
+    os.makedirs(UPDATES_DIR, exist_ok=True)
+    with open(RELOAD_REQUEST_FILE, "w", encoding="utf-8") as f:
+        f.write(datetime.now().isoformat())
+
+
+def _reload_stamp() -> Optional[int]:
+    try:
+        return os.stat(RELOAD_REQUEST_FILE).st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+def run_workers(app: str, host: str, port: int, workers: int) -> None:
+    """
+    Wie ``uvicorn.run(app, workers=N)``, reagiert aber zusätzlich auf
+    ``request_web_reload`` (funktioniert auch unter Windows, wo es kein SIGHUP gibt).
+    """
+    import uvicorn
+    from uvicorn.supervisors import Multiprocess
+
+    class RollingSupervisor(Multiprocess):
+        stamp = _reload_stamp()
+
+        def keep_subprocess_alive(self) -> None:
+            super().keep_subprocess_alive()
+            stamp = _reload_stamp()
+            if stamp != self.stamp and not self.should_exit.is_set():
+                self.stamp = stamp
+                log.info("🔄 Update eingespielt – starte Worker nacheinander neu")
+                self.restart_all()
+
+    config = uvicorn.Config(app, host=host, port=port, workers=workers)
+    sock = config.bind_socket()
+    RollingSupervisor(config, sockets=[sock]).run()
+
+
+if __name__ == "__main__":
+    # Losgelöster Job aus _spawn (Reload-Modus): python -m utils.self_update <job_id>
+    # Kein Logging-Handler: _JobLog schreibt selbst, stderr (Abstürze) geht ins Job-Log
+    asyncio.run(_run(sys.argv[1]))
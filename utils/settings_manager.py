@@ -1,8 +1,11 @@
-import json
 import os
 
+from utils import file_lock
+from utils.metrics import track_store
+
 SETTINGS_FILE = "settings.json"
 
+@track_store("settings", "load")
 def load_settings() -> dict:
     if not os.path.exists(SETTINGS_FILE):
         return {
@@ -12,12 +15,8 @@ def load_settings() -> dict:
             "support_roles": []
         }
 
-    with open(SETTINGS_FILE, "r", encoding="utf-8") as f:
-        try:
-            return json.load(f)
-        except json.JSONDecodeError:
-            return {}
+    return file_lock.read_json(SETTINGS_FILE, {})
 
+@track_store("settings", "save")
 def save_settings(data: dict):
-    with open(SETTINGS_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=4)
+    file_lock.write_json(SETTINGS_FILE, data, indent=4)
@@ -0,0 +1,69 @@
+# utils/startup_profile.py
+# -*- coding: utf-8 -*-
+"""
+Startzeit-Analyse für ``python main.py --profile-startup`` und ``python bot.py --profile-startup``.
+
+- ``import_breakdown(module)``: importiert das Modul in einem frischen Interpreter
+  mit ``-X importtime`` und summiert die Eigenzeiten je Top-Level-Paket – so
+  sieht man, ob fastapi, sqlalchemy, discord oder eigener Code die Zeit frisst.
+- ``phase(name)``: misst Init-Phasen im laufenden Prozess (DB anlegen,
+  Templates kompilieren, Cogs laden …). Die Messung läuft immer mit, sie kostet
+  nur zwei ``perf_counter``-Aufrufe.
+"""
+
+from __future__ import annotations
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Tuple
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (Name, Sekunden) in Startreihenfolge
+PHASES: List[Tuple[str, float]] = []
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        PHASES.append((name, time.perf_counter() - start))
+
+
+def import_breakdown(module: str) -> Tuple[float, List[Tuple[str, float]]]:
+    """(Gesamtzeit, [(Paket, Eigenzeit)] absteigend) für ``import <module>`` in Sekunden."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BASE_DIR, capture_output=True, text=True,
+    )
+    per_package: Dict[str, int] = defaultdict(int)
+    total_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue  # Kopfzeile
+        self_us, cumulative_us, name = int(parts[0]), int(parts[1]), parts[2].strip()
+        per_package[name.split(".")[0]] += self_us
+        if name == module:
+            total_us = max(total_us, cumulative_us)
+    ranked = sorted(per_package.items(), key=lambda item: item[1], reverse=True)
+    return total_us / 1e6, [(name, us / 1e6) for name, us in ranked]
+
+
+def print_report(module: str, top: int = 15) -> None:
+    """Import- und Phasenübersicht auf stdout."""
+    total, packages = import_breakdown(module)
+    print(f"⏱️ import {module}: {total * 1000:7.1f} ms (frischer Interpreter)")
+    for name, seconds in packages[:top]:
+        print(f"   {name:<28} {seconds * 1000:7.1f} ms")
+    if PHASES:
+        print(f"⏱️ Init-Phasen: {sum(s for _, s in PHASES) * 1000:7.1f} ms")
+        for name, seconds in PHASES:
+            print(f"   {name:<28} {seconds * 1000:7.1f} ms")
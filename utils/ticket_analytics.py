@@ -0,0 +1,318 @@
+# utils/ticket_analytics.py
+# -*- coding: utf-8 -*-
+"""
+Laufend gepflegte Ticket-Kennzahlen (logs/ticket_analytics.json).
+
+Statt bei jeder Auswertung logs/ticket_events.json neu abzuspielen, hängt sich
+``install()`` an utils.ticket_log und verarbeitet jedes Event genau einmal:
+
+- Zähler: erstellt/geschlossen je Kategorie, übernommen je Supporter
+- Time-to-Claim / Time-to-Close als Quantil-Sketches je Kategorie und Supporter
+- Ticket-Volumen in Stunden-Buckets (UTC) je Kategorie
+
+Der Zustand ist klein (nur offene Tickets + Aggregate) und wird höchstens alle
+``SAVE_INTERVAL`` Sekunden sowie beim Beenden atomar gespeichert – nicht im
+Takt der Events im Writer-Thread von utils.ticket_log. Das Web liest nur diese Datei.
+Neuaufbau aus dem Log: ``python -m utils.ticket_analytics --rebuild`` (Bot dabei stoppen).
+"""
+
+from __future__ import annotations
+import argparse
+import atexit
+import json
+import logging
+import math
+import os
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional
+
+log = logging.getLogger(__name__)
+
+ANALYTICS_FILE = os.path.join("logs", "ticket_analytics.json")
+SAVE_INTERVAL = 10.0  # Sekunden zwischen zwei Speichervorgängen im Bot
+
+# Relative Genauigkeit der Quantile (1 %)
+SKETCH_ACCURACY = 0.01
+
+
+# ---------------------------
+# Quantil-Sketch
+# ---------------------------
+class QuantileSketch:
+    """
+    Logarithmische Buckets (DDSketch-Prinzip): jeder Wert landet in Bucket
+    ceil(log_gamma(x)). Quantile haben damit höchstens ``accuracy`` relativen
+    Fehler, der Speicher wächst nur logarithmisch mit dem Wertebereich und zwei
+    Sketches lassen sich durch Addieren der Buckets zusammenführen.
+    """
+
+    def __init__(self, accuracy: float = SKETCH_ACCURACY):
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.buckets: Dict[int, int] = defaultdict(int)
+        self.zeros = 0
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        if value <= 0:
+            self.zeros += 1
+        else:
+            self.buckets[math.ceil(math.log(value) / self._log_gamma)] += 1
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        for key, n in other.buckets.items():
+            self.buckets[key] += n
+        self.zeros += other.zeros
+        self.count += other.count
+        self.total += other.total
+        return self
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = q * (self.count - 1)
+        seen = self.zeros
+        if rank < seen:
+            return 0.0
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                return 2 * self.gamma ** key / (self.gamma + 1)
+        return 2 * self.gamma ** max(self.buckets) / (self.gamma + 1)
+
+    def to_dict(self) -> Dict:
+        return {"b": {str(k): v for k, v in self.buckets.items()}, "z": self.zeros,
+                "n": self.count, "s": self.total}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "QuantileSketch":
+        sketch = cls()
+        for k, v in (data.get("b") or {}).items():
+            sketch.buckets[int(k)] = v
+        sketch.zeros, sketch.count, sketch.total = data.get("z", 0), data.get("n", 0), data.get("s", 0.0)
+        return sketch
+
+
+# ---------------------------
+# Aggregate
+# ---------------------------
+def _parse(ts: Optional[str]) -> Optional[datetime]:
+    try:
+        return datetime.fromisoformat(ts) if ts else None
+    except ValueError:
+        return None
+
+
+class TicketAnalytics:
+    METRICS = ("time_to_claim", "time_to_close")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.open: Dict[str, Dict] = {}          # channel_id → {created, category, claimed_at, claimed_by}
+        self.counts: Dict[str, Dict[str, int]] = {"created": {}, "closed": {}, "claimed": {}}
+        self.sketches: Dict[str, Dict[str, QuantileSketch]] = {}  # "time_to_claim:category:Support" → Sketch
+        self.hourly: Dict[str, Dict[str, int]] = {}  # "2025-03-01T14" → {kategorie: anzahl}
+        self.events = 0
+
+    # --- Zustand ---
+    def _sketch(self, metric: str, dimension: str, key) -> QuantileSketch:
+        name = f"{metric}:{dimension}"
+        return self.sketches.setdefault(name, {}).setdefault(str(key), QuantileSketch())
+
+    def _observe(self, metric: str, seconds: float, category, supporter) -> None:
+        self._sketch(metric, "all", "all").add(seconds)
+        self._sketch(metric, "category", category or "?").add(seconds)
+        if supporter:
+            self._sketch(metric, "supporter", supporter).add(seconds)
+
+    def _count(self, kind: str, key) -> None:
+        bucket = self.counts.setdefault(kind, {})
+        bucket[str(key)] = bucket.get(str(key), 0) + 1
+
+    # --- Events ---
+    def apply(self, entry: Dict) -> None:
+        """Verarbeitet einen Log-Eintrag {time, event_type, data}."""
+        event_type = entry.get("event_type")
+        data = entry.get("data") or {}
+        when = _parse(entry.get("time"))
+        channel = str(data.get("channel_id") or "")
+        if when is None or not channel:
+            return
+        self.events += 1
+
+        if event_type == "ticket_created":
+            category = data.get("category") or "?"
+            created = _parse(data.get("created_at")) or when
+            self.open[channel] = {"created": created.isoformat(), "category": category}
+            self._count("created", category)
+            hour = created.strftime("%Y-%m-%dT%H")
+            bucket = self.hourly.setdefault(hour, {})
+            bucket[category] = bucket.get(category, 0) + 1
+
+        elif event_type == "ticket_claimed":
+            state = self.open.get(channel)
+            supporter = data.get("username") or data.get("user_id")
+            self._count("claimed", supporter)
+            if state and not state.get("claimed_at"):
+                state["claimed_at"] = when.isoformat()
+                state["claimed_by"] = supporter
+                seconds = (when - datetime.fromisoformat(state["created"])).total_seconds()
+                self._observe("time_to_claim", seconds, state["category"], supporter)
+
+        elif event_type == "ticket_closed":
+            # Nur das erste Schließen zählt; nach Wiederöffnen wird nicht neu gemessen
+            state = self.open.pop(channel, None)
+            if state:
+                self._count("closed", state["category"])
+                seconds = (when - datetime.fromisoformat(state["created"])).total_seconds()
+                self._observe("time_to_close", seconds, state["category"], state.get("claimed_by"))
+
+    # --- Persistenz ---
+    def to_dict(self) -> Dict:
+        return {
+            "updated_at": datetime.utcnow().isoformat(),
+            "events": self.events,
+            "open": self.open,
+            "counts": self.counts,
+            "hourly": self.hourly,
+            "sketches": {name: {k: s.to_dict() for k, s in group.items()} for name, group in self.sketches.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "TicketAnalytics":
+        analytics = cls()
+        analytics.events = data.get("events", 0)
+        analytics.open = data.get("open") or {}
+        analytics.counts = data.get("counts") or analytics.counts
+        analytics.hourly = data.get("hourly") or {}
+        analytics.sketches = {
+            name: {k: QuantileSketch.from_dict(s) for k, s in group.items()}
+            for name, group in (data.get("sketches") or {}).items()
+        }
+        return analytics
+
+    def save(self, path: Optional[str] = None) -> None:
+        path = path or ANALYTICS_FILE
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+
+def load(path: Optional[str] = None) -> TicketAnalytics:
+    try:
+        with open(path or ANALYTICS_FILE, "r", encoding="utf-8") as f:
+            return TicketAnalytics.from_dict(json.load(f))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return TicketAnalytics()
+
+
+# ---------------------------
+# Auswertung (Web)
+# ---------------------------
+def summary(analytics: TicketAnalytics, hours: int = 48) -> Dict:
+    """Kompakte Kennzahlen (Sekunden) für Dashboard und JSON-Endpunkt."""
+    def stats(sketch: QuantileSketch) -> Dict:
+        return {
+            "count": sketch.count,
+            "p50": sketch.quantile(0.5),
+            "p90": sketch.quantile(0.9),
+            "mean": sketch.total / sketch.count if sketch.count else None,
+        }
+
+    result: Dict = {"updated_events": analytics.events, "open_tickets": len(analytics.open),
+                    "counts": analytics.counts}
+    for metric in TicketAnalytics.METRICS:
+        result[metric] = {
+            dimension: {key: stats(s) for key, s in sorted(analytics.sketches.get(f"{metric}:{dimension}", {}).items())}
+            for dimension in ("all", "category", "supporter")
+        }
+
+    now = datetime.utcnow().replace(minute=0, second=0, microsecond=0)
+    recent = [(now - timedelta(hours=h)).strftime("%Y-%m-%dT%H") for h in range(hours - 1, -1, -1)]
+    result["hourly"] = [{"hour": h, "total": sum(analytics.hourly.get(h, {}).values()),
+                         "by_category": analytics.hourly.get(h, {})} for h in recent]
+    by_hour_of_day = [0] * 24
+    for hour, cats in analytics.hourly.items():
+        by_hour_of_day[int(hour[-2:])] += sum(cats.values())
+    result["by_hour_of_day"] = by_hour_of_day
+    return result
+
+
+# ---------------------------
+# Einbindung (Bot) + Neuaufbau
+# ---------------------------
+_live: Optional[TicketAnalytics] = None
+_save_timer: Optional[threading.Timer] = None
+
+
+def _on_event(entry: Dict) -> None:
+    global _save_timer
+    with _live.lock:
+        _live.apply(entry)
+        if _save_timer is None:
+            # Gedrosselt speichern: alle Events bis zum Ablauf landen in einem Schreibvorgang
+            _save_timer = threading.Timer(SAVE_INTERVAL, flush)
+            _save_timer.daemon = True
+            _save_timer.start()
+
+
+def _safe(listener):
+    def wrapper(*args, **kwargs):
+        try:
+            listener(*args, **kwargs)
+        except Exception as e:
+            log.error(f"[TicketAnalytics] Event nicht verarbeitet: {e}")
+    return wrapper
+
+
+def flush() -> None:
+    """Ausstehende Änderungen sofort speichern (Timer und Shutdown)."""
+    global _save_timer
+    if _live is None:
+        return
+    with _live.lock:
+        if _save_timer is None:
+            return  # nichts ausstehend
+        _save_timer.cancel()
+        _save_timer = None
+        try:
+            _live.save()
+        except OSError as e:
+            log.error(f"[TicketAnalytics] Speichern fehlgeschlagen: {e}")
+
+
+def install() -> None:
+    """Lädt die Aggregate und verarbeitet ab jetzt jedes neue Event (einmal im Bot-Prozess)."""
+    global _live
+    from utils import ticket_log
+
+    _live = load()
+    ticket_log.add_event_listener(_safe(_on_event))
+    atexit.register(flush)
+
+
+def rebuild(entries: Iterable[Dict]) -> TicketAnalytics:
+    analytics = TicketAnalytics()
+    for entry in sorted(entries, key=lambda e: e.get("time") or ""):
+        analytics.apply(entry)
+    return analytics
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ticket-Kennzahlen")
+    parser.add_argument("--rebuild", action="store_true", help="Aggregate aus logs/ticket_events.json neu berechnen")
+    args = parser.parse_args()
+    if args.rebuild:
+        from utils.ticket_log import load_events
+
+        analytics = rebuild(load_events())
+        analytics.save()
+        print(f"✅ {analytics.events} Events verarbeitet, {len(analytics.open)} Tickets noch offen")
+    print(json.dumps(summary(load()), indent=2, ensure_ascii=False, default=str)[:4000])
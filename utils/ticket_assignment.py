@@ -0,0 +1,80 @@
+# utils/ticket_assignment.py
+# -*- coding: utf-8 -*-
+"""
+Automatische Ticket-Zuweisung an den am wenigsten ausgelasteten Supporter.
+
+Der Zustand liegt komplett im Speicher:
+- ``load``: offene, übernommene Tickets pro Supporter (aus tickets.json + Events)
+- ``online``: Supporter mit Status != offline (aus Presence-Events)
+- ``categories``: optionale Zuordnung Kategorie → Supporter-IDs
+
+Auswahl: geringste Last, bei Gleichstand der am längsten nicht mehr Bedachte
+(Round-Robin). Supporter am Limit (``cap``) werden übersprungen. Das Modul kennt
+kein discord – die Anbindung macht cogs/ticket_assignment.py.
+"""
+
+from __future__ import annotations
+import itertools
+from typing import Dict, Iterable, List, Optional, Set
+
+
+class AssignmentScheduler:
+    def __init__(self, cap: int = 5):
+        self.cap = cap
+        self.supporters: Set[int] = set()
+        self.online: Set[int] = set()
+        self.load: Dict[int, int] = {}
+        self.categories: Dict[str, Set[int]] = {}
+        self._last_pick: Dict[int, int] = {}
+        self._seq = itertools.count(1)
+
+    # ---------------------------
+    # Zustand pflegen
+    # ---------------------------
+    def set_supporters(self, ids: Iterable[int], categories: Optional[Dict[str, Iterable]] = None) -> None:
+        self.supporters = {int(i) for i in ids}
+        if categories is not None:
+            self.categories = {name: {int(i) for i in members} for name, members in categories.items()}
+
+    def set_online(self, user_id: int, online: bool) -> None:
+        if online:
+            self.online.add(int(user_id))
+        else:
+            self.online.discard(int(user_id))
+
+    def rebuild_load(self, tickets: Iterable[dict], closed_status: str) -> None:
+        """Last aus dem Ticket-Store: alle nicht geschlossenen Tickets mit claimed_by."""
+        self.load = {}
+        for ticket in tickets:
+            if ticket.get("status") != closed_status and ticket.get("claimed_by"):
+                self.assigned(ticket["claimed_by"])
+
+    def assigned(self, user_id: int) -> None:
+        uid = int(user_id)
+        self.load[uid] = self.load.get(uid, 0) + 1
+
+    def released(self, user_id: int) -> None:
+        uid = int(user_id)
+        if self.load.get(uid, 0) > 0:
+            self.load[uid] -= 1
+
+    # ---------------------------
+    # Auswahl
+    # ---------------------------
+    def candidates(self, category: Optional[str] = None) -> List[int]:
+        pool = self.categories.get(category) if category in self.categories else self.supporters
+        return [uid for uid in pool
+                if uid in self.online and uid in self.supporters and self.load.get(uid, 0) < self.cap]
+
+    def pick(self, category: Optional[str] = None) -> Optional[int]:
+        """Wählt einen Supporter und bucht das Ticket sofort auf ihn (None = niemand frei)."""
+        candidates = self.candidates(category)
+        if not candidates:
+            return None
+        uid = min(candidates, key=lambda u: (self.load.get(u, 0), self._last_pick.get(u, 0)))
+        self._last_pick[uid] = next(self._seq)
+        self.assigned(uid)
+        return uid
+
+
+assignment_scheduler = AssignmentScheduler()
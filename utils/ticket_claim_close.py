@@ -1,22 +1,154 @@
-import re
+import logging
+from datetime import datetime
+
 import discord
-from discord.ui import View, Button, Modal, TextInput
+from discord.ui import View, Modal, TextInput
 from utils.ticket_log import (
-    log_ticket_create,
+    log_ticket_claim,
     log_ticket_close,
     log_ticket_reopen,
-    update_ticket_status
 )
-from utils.ticket_storage import set_ticket_status_by_channel
+from utils import async_storage
+from utils.guild_config import for_guild
+from utils.bot_telemetry import track_interaction
+from utils.rename_scheduler import rename_scheduler
+
+STATUS_OPEN = "offen"
+STATUS_CLOSED = "geschlossen"
+
+CONFIG_FILE = "config.json"
+TICKET_CATEGORY_NAME = "🎫 Tickets"
+ARCHIVE_CATEGORY_NAME = "🗄️ Ticket-Archiv"
+
+log = logging.getLogger(__name__)
+
+
+# ---------------------------
+# View-Aufbau
+# ---------------------------
+def build_ticket_view(ticket_id, status: str = STATUS_OPEN) -> View:
+    """
+    Baut die Ticket-Buttons. Die custom_ids enthalten die Ticket-ID
+    (``ticket:<aktion>:<id>``) – ein einziger registrierter Handler
+    (``TicketControl``) bedient damit alle Tickets, auch nach einem Neustart.
+    Die View selbst wird von discord.py nicht gespeichert (rein dynamisch).
+    """
+    closed = status == STATUS_CLOSED
+    claimed = status.startswith("Geclaimt")
+    view = View(timeout=None)
+    view.add_item(TicketControl("claim", ticket_id, disabled=closed or claimed))
+    view.add_item(TicketControl("close", ticket_id, disabled=closed))
+    view.add_item(TicketControl("reopen", ticket_id, disabled=not closed))
+    return view
+
+
+async def _refresh_buttons(message, ticket_id, status: str) -> None:
+    if message is not None:
+        await message.edit(view=build_ticket_view(ticket_id, status))
+
+
+# ---------------------------
+# Schließen / Wieder öffnen (ohne Umbenennen)
+# ---------------------------
+def _status_embed(message, closed: bool):
+    """Kopie des Ticket-Embeds mit Status-Markierung (grau = geschlossen)."""
+    if message is None or not message.embeds:
+        return None
+    embed = message.embeds[0].copy()
+    title = (embed.title or "").replace("🔒 ", "")
+    embed.title = f"🔒 {title}" if closed else title
+    embed.colour = discord.Color.dark_grey() if closed else discord.Color.green()
+    return embed
+
+
+async def _apply_ticket_state(channel, ticket: dict, message, closed: bool) -> bool:
+    """
+    Sichtbarer Statuswechsel ohne Namensänderung: Kanal in die Archiv-Kategorie
+    verschieben (bzw. zurück, config.json → "ticket_archive_category" /
+    "ticket_category") und dem Ersteller das Schreiben entziehen – alles in einem
+    einzigen channel.edit. Das Embed wird grau markiert. Ein Umbenennen ist
+    optional (config.json → "ticket_rename_on_close") und läuft über den
+    koaleszierenden RenameScheduler.
+
+    Scheitert das Verschieben (z.B. Kategorie voll – max. 50 Kanäle), werden nur
+    die Rechte geändert. False = Kanal konnte gar nicht angepasst werden.
+    """
+    guild = channel.guild
+    config = for_guild(await async_storage.load_json(CONFIG_FILE), guild.id)
+    if closed:
+        target_name = config.get("ticket_archive_category", ARCHIVE_CATEGORY_NAME)
+    else:
+        target_name = config.get("ticket_category", TICKET_CATEGORY_NAME)
+    target_category = discord.utils.get(guild.categories, name=target_name)
+
+    overwrites = dict(channel.overwrites)
+    opener = guild.get_member(int(ticket.get("user_id", 0))) or discord.Object(id=int(ticket.get("user_id", 0)))
+    overwrites[opener] = discord.PermissionOverwrite(
+        view_channel=True, send_messages=not closed, attach_files=not closed, read_message_history=True
+    )
 
+    applied = True
+    try:
+        if target_category is not None and channel.category != target_category:
+            try:
+                await channel.edit(overwrites=overwrites, category=target_category)
+            except discord.HTTPException as e:
+                log.warning(f"⚠️ {channel.name} nicht nach {target_name} verschoben ({e}) – nur Rechte geändert")
+                await channel.edit(overwrites=overwrites)
+        else:
+            await channel.edit(overwrites=overwrites)
+    except discord.HTTPException as e:
+        log.error(f"❌ Rechte für {channel.name} nicht geändert: {e}")
+        applied = False
 
+    if message is not None:
+        try:
+            await message.edit(
+                embed=_status_embed(message, closed) or discord.utils.MISSING,
+                view=build_ticket_view(ticket.get("ticket_id"), STATUS_CLOSED if closed else STATUS_OPEN),
+            )
+        except discord.HTTPException as e:
+            log.warning(f"⚠️ Ticket-Nachricht in {channel.name} nicht aktualisiert: {e}")
+
+    if config.get("ticket_rename_on_close"):
+        base = ticket.get("channel_name") or channel.name
+        rename_scheduler.request(channel, f"geschlossen-{base}" if closed else base)
+    return applied
+
+
+async def close_ticket(channel, ticket: dict, closed_by, reason: str, message=None) -> bool:
+    """Schließt das Ticket im Store immer; False = Kanal konnte nicht angepasst werden."""
+    applied = await _apply_ticket_state(channel, ticket, message, closed=True)
+    await async_storage.update_ticket(channel.id, {
+        "status": STATUS_CLOSED,
+        "closed_at": datetime.utcnow().isoformat(),
+        "closed_by": closed_by.id,
+    })
+    async_storage.log_event("ticket_status_updated", {"ticket_id": ticket.get("ticket_id"), "new_status": STATUS_CLOSED})
+    async_storage.log_with(log_ticket_close, channel.name, closed_by.id, channel.id, reason)
+    return applied
+
+
+async def reopen_ticket(channel, ticket: dict, reopened_by, reason: str, message=None) -> bool:
+    applied = await _apply_ticket_state(channel, ticket, message, closed=False)
+    # Wieder offen = wieder frei zum Übernehmen (Claim-Button ist aktiv)
+    await async_storage.update_ticket(channel.id, {
+        "status": STATUS_OPEN, "closed_at": None, "closed_by": None, "claimed_by": None,
+    })
+    async_storage.log_event("ticket_status_updated", {"ticket_id": ticket.get("ticket_id"), "new_status": STATUS_OPEN})
+    async_storage.log_with(log_ticket_reopen, channel.name, reopened_by.id, channel.id, reason)
+    return applied
+
+
+# ---------------------------
+# Modals
+# ---------------------------
 class CloseModal(Modal):
-    def __init__(self, opener: discord.Member, parent_view: View):
+    def __init__(self, ticket: dict, message: discord.Message):
         super().__init__(title="Grund für Schließung")
-        self.opener = opener
-        self.parent_view = parent_view
-        self.ticket_id = parent_view.ticket_id
-        self.channel = parent_view.channel
+        self.ticket = ticket
+        self.ticket_id = ticket.get("ticket_id")
+        self.message = message
 
         self.reason = TextInput(
             label="Schließungs-Grund",
@@ -27,44 +159,33 @@ class CloseModal(Modal):
         )
         self.add_item(self.reason)
 
+    @track_interaction("close_modal")
     async def on_submit(self, interaction: discord.Interaction):
-        if interaction.user != self.opener:
-            return await interaction.response.send_message(
-                "❌ Nur der Ersteller kann das Ticket schließen.", ephemeral=True
-            )
-
-        old_name = self.channel.name
-        new_name = f"geschlossen-{old_name}"
-        await self.channel.edit(name=new_name, sync_permissions=True)
-
-        update_ticket_status(self.ticket_id, "geschlossen")
-        set_ticket_status_by_channel(self.channel.id, "geschlossen")
-        log_ticket_close(old_name, interaction.user.id, self.channel.id)
-
-        await interaction.response.send_message("✅ Ticket geschlossen.", ephemeral=True)
+        # Erst bestätigen (defer), Ergebnis erst melden, wenn Kanal + Stores aktualisiert sind
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        try:
+            applied = await close_ticket(interaction.channel, self.ticket, interaction.user, self.reason.value, self.message)
+        except Exception:
+            await interaction.followup.send("❌ Ticket konnte nicht geschlossen werden.", ephemeral=True)
+            raise
+        interaction.client.dispatch("ticket_closed", self.ticket)
+        await interaction.followup.send(
+            "✅ Ticket geschlossen." if applied
+            else "⚠️ Ticket geschlossen, aber die Kanalrechte konnten nicht angepasst werden.",
+            ephemeral=True,
+        )
         await interaction.followup.send(
             f"🔒 Ticket wurde von **{interaction.user.display_name}** geschlossen.\n"
             f"💬 Grund: {self.reason.value}"
         )
 
-        # Buttons live updaten
-        for child in self.parent_view.children:
-            if child.custom_id in ("ticket_claim", "ticket_close"):
-                child.disabled = True
-            if child.custom_id == "ticket_reopen":
-                child.disabled = False
-
-        if getattr(self.parent_view, "message", None):
-            await self.parent_view.message.edit(view=self.parent_view)
-
 
 class ReopenModal(Modal):
-    def __init__(self, opener: discord.Member, parent_view: View):
+    def __init__(self, ticket: dict, message: discord.Message):
         super().__init__(title="Grund für Wiederöffnung")
-        self.opener = opener
-        self.parent_view = parent_view
-        self.ticket_id = parent_view.ticket_id
-        self.channel = parent_view.channel
+        self.ticket = ticket
+        self.ticket_id = ticket.get("ticket_id")
+        self.message = message
 
         self.reason = TextInput(
             label="Wiederöffnungs-Grund",
@@ -75,97 +196,106 @@ class ReopenModal(Modal):
         )
         self.add_item(self.reason)
 
+    @track_interaction("reopen_modal")
     async def on_submit(self, interaction: discord.Interaction):
-        if interaction.user != self.opener:
-            return await interaction.response.send_message(
-                "❌ Nur der Ersteller kann das Ticket wieder öffnen.", ephemeral=True
-            )
-
-        old_name = self.channel.name
-        new_name = old_name.replace("geschlossen-", "")
-        await self.channel.edit(name=new_name, sync_permissions=True)
-
-        update_ticket_status(self.ticket_id, "offen")
-        set_ticket_status_by_channel(self.channel.id, "offen")
-        log_ticket_reopen(old_name, interaction.user.id, self.channel.id)
-
-        await interaction.response.send_message("✅ Ticket wieder geöffnet.", ephemeral=True)
+        await interaction.response.defer(ephemeral=True, thinking=True)
+        try:
+            applied = await reopen_ticket(interaction.channel, self.ticket, interaction.user, self.reason.value, self.message)
+        except Exception:
+            await interaction.followup.send("❌ Ticket konnte nicht wieder geöffnet werden.", ephemeral=True)
+            raise
+        interaction.client.dispatch("ticket_reopened", self.ticket)
+        await interaction.followup.send(
+            "✅ Ticket wieder geöffnet." if applied
+            else "⚠️ Ticket wieder geöffnet, aber die Kanalrechte konnten nicht angepasst werden.",
+            ephemeral=True,
+        )
         await interaction.followup.send(
             f"♻️ Ticket wurde von **{interaction.user.display_name}** wieder geöffnet.\n"
             f"💬 Grund: {self.reason.value}"
         )
 
-        for child in self.parent_view.children:
-            if child.custom_id == "ticket_reopen":
-                child.disabled = True
-            if child.custom_id in ("ticket_claim", "ticket_close"):
-                child.disabled = False
 
-        if getattr(self.parent_view, "message", None):
-            await self.parent_view.message.edit(view=self.parent_view)
+# ---------------------------
+# Persistenter, dynamischer Button-Handler
+# ---------------------------
+_BUTTONS = {
+    "claim": ("Übernehmen", discord.ButtonStyle.secondary),
+    "close": ("Schließen", discord.ButtonStyle.danger),
+    "reopen": ("Wieder öffnen", discord.ButtonStyle.primary),
+}
 
 
-class TicketActionView(View):
-    def __init__(self, opener: discord.Member):
-        super().__init__(timeout=None)
-        self.opener = opener
-        self.ticket_id: str | None = None
-        self.channel: discord.TextChannel | None = None
-        self.message: discord.Message | None = None
+class TicketControl(
+    discord.ui.DynamicItem[discord.ui.Button],
+    # Neu: ticket:claim:42 – Alt (vor dem Umbau gesendet): ticket_claim ohne ID
+    template=r"ticket[:_](?P<action>claim|close|reopen)(?::(?P<ticket_id>\d+))?",
+):
+    def __init__(self, action: str, ticket_id=None, disabled: bool = False):
+        label, style = _BUTTONS[action]
+        custom_id = f"ticket:{action}:{ticket_id}" if ticket_id is not None else f"ticket_{action}"
+        super().__init__(discord.ui.Button(label=label, style=style, custom_id=custom_id, disabled=disabled))
+        self.action = action
+        self.ticket_id = ticket_id
 
-    @discord.ui.button(
-        label="Übernehmen",
-        style=discord.ButtonStyle.secondary,
-        custom_id="ticket_claim"
-    )
-    async def claim_button(self, interaction: discord.Interaction, button: Button):
-        self.channel = interaction.channel  # type: ignore
-        m = re.search(r"(?:geschlossen-)?ticket-[\w-]+-(\d+)", self.channel.name)
-        self.ticket_id = m.group(1) if m else None
-
-        # Claim direkt ausführen
-        log_ticket_create(
-            self.channel.name,
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match):
+        return cls(match["action"], match["ticket_id"])
+
+    async def callback(self, interaction: discord.Interaction):
+        # Ticket (Ersteller, Status) aus dem Index – kein Parsen des Kanalnamens
+        ticket = await async_storage.find_ticket(self.ticket_id, interaction.channel_id)
+        if ticket is None:
+            return await interaction.response.send_message(
+                "❌ Zu diesem Kanal ist kein Ticket gespeichert.", ephemeral=True
+            )
+        if self.action == "claim":
+            await self.claim(interaction, ticket)
+        elif self.action == "close":
+            await self.close(interaction, ticket)
+        else:
+            await self.reopen(interaction, ticket)
+
+    @track_interaction("ticket_claim")
+    async def claim(self, interaction: discord.Interaction, ticket: dict):
+        channel = interaction.channel
+        ticket_id = ticket.get("ticket_id")
+
+        # Erst bestätigen, Stores danach (im Storage-Pool)
+        await interaction.response.send_message("✅ Ticket übernommen.", ephemeral=True)
+
+        async_storage.log_with(
+            log_ticket_claim,
+            channel.name,
             interaction.user.id,
-            self.channel.id,
-            interaction.user.display_name
+            channel.id,
+            interaction.user.display_name,
+            ticket_id,
         )
 
         status = f"Geclaimt von {interaction.user.display_name}"
-        set_ticket_status_by_channel(self.channel.id, status)
+        await async_storage.update_ticket(channel.id, {"status": status, "claimed_by": interaction.user.id})
+        interaction.client.dispatch("ticket_claimed", ticket, interaction.user)
 
-        await interaction.response.send_message("✅ Ticket übernommen.", ephemeral=True)
         await interaction.followup.send(
             f"🛡️ Ticket wurde übernommen von **{interaction.user.display_name}**"
         )
 
-        # Buttons in dieser View deaktivieren
-        for child in self.children:
-            if child.custom_id == "ticket_claim":
-                child.disabled = True
+        # Übernehmen-Button deaktivieren
+        await _refresh_buttons(interaction.message, ticket_id, status)
 
-        if getattr(self, "message", None):
-            await self.message.edit(view=self)
+    @track_interaction("ticket_close")
+    async def close(self, interaction: discord.Interaction, ticket: dict):
+        if interaction.user.id != int(ticket.get("user_id", 0)):
+            return await interaction.response.send_message(
+                "❌ Nur der Ersteller kann das Ticket schließen.", ephemeral=True
+            )
+        await interaction.response.send_modal(CloseModal(ticket, interaction.message))
 
-    @discord.ui.button(
-        label="Schließen",
-        style=discord.ButtonStyle.danger,
-        custom_id="ticket_close"
-    )
-    async def close_button(self, interaction: discord.Interaction, button: Button):
-        self.channel = interaction.channel  # type: ignore
-        m = re.search(r"(?:geschlossen-)?ticket-[\w-]+-(\d+)", self.channel.name)
-        self.ticket_id = m.group(1) if m else None
-        await interaction.response.send_modal(CloseModal(self.opener, self))
-
-    @discord.ui.button(
-        label="Wieder öffnen",
-        style=discord.ButtonStyle.primary,
-        custom_id="ticket_reopen",
-        disabled=True
-    )
-    async def reopen_button(self, interaction: discord.Interaction, button: Button):
-        self.channel = interaction.channel  # type: ignore
-        m = re.search(r"(?:geschlossen-)?ticket-[\w-]+-(\d+)", self.channel.name)
-        self.ticket_id = m.group(1) if m else None
-        await interaction.response.send_modal(ReopenModal(self.opener, self))
+    @track_interaction("ticket_reopen")
+    async def reopen(self, interaction: discord.Interaction, ticket: dict):
+        if interaction.user.id != int(ticket.get("user_id", 0)):
+            return await interaction.response.send_message(
+                "❌ Nur der Ersteller kann das Ticket wieder öffnen.", ephemeral=True
+            )
+        await interaction.response.send_modal(ReopenModal(ticket, interaction.message))
@@ -1,18 +1,45 @@
 import os
 
+from utils import file_lock
+
 TICKET_COUNTER_FILE = "ticket_counter.txt"
+# Laufende Nummer pro Guild (Kanalname "ticket-<user>-<nummer>"); die Ticket-ID
+# aus TICKET_COUNTER_FILE bleibt global eindeutig (Buttons, Transkripte, Index)
+GUILD_COUNTER_DIR = os.path.join("tickets", "counters")
+
+
+def _increment(path: str, start: int = 0) -> int:
+    with file_lock.locked(path):
+        if not os.path.exists(path):
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(str(start + 1))
+            return start + 1
+
+        with open(path, "r+", encoding="utf-8") as f:
+            content = f.read().strip()
+            number = int(content) if content.isdigit() else 0
+            number += 1
+            f.seek(0)
+            f.write(str(number))
+            f.truncate()
+            return number
+
 
 def get_next_ticket_number() -> int:
-    if not os.path.exists(TICKET_COUNTER_FILE):
-        with open(TICKET_COUNTER_FILE, "w", encoding="utf-8") as f:
-            f.write("1")
-        return 1
-
-    with open(TICKET_COUNTER_FILE, "r+", encoding="utf-8") as f:
-        content = f.read().strip()
-        number = int(content) if content.isdigit() else 0
-        number += 1
-        f.seek(0)
-        f.write(str(number))
-        f.truncate()
-        return number
+    return _increment(TICKET_COUNTER_FILE)
+
+
+def get_next_guild_ticket_number(guild_id: int) -> int:
+    os.makedirs(GUILD_COUNTER_DIR, exist_ok=True)
+    path = os.path.join(GUILD_COUNTER_DIR, f"{int(guild_id)}.txt")
+    start = 0
+    if not os.path.exists(path) and not os.listdir(GUILD_COUNTER_DIR):
+        # Erster Guild-Zähler nach der Umstellung: die bisherige (einzige) Guild
+        # zählt beim globalen Stand weiter statt wieder bei 1 anzufangen
+        try:
+            with open(TICKET_COUNTER_FILE, "r", encoding="utf-8") as f:
+                content = f.read().strip()
+            start = int(content) if content.isdigit() else 0
+        except FileNotFoundError:
+            pass
+    return _increment(path, start)
@@ -0,0 +1,266 @@
+# utils/ticket_index.py
+# -*- coding: utf-8 -*-
+"""
+Abfrage-Index über tickets.json für /admin/tickets (SQLite, tickets/index.db).
+
+tickets.json bleibt die Quelle; der Index ist nur eine Kopie mit passenden
+B-Baum-Indizes für Filter (Guild, Status, Kategorie, User, Zeitraum), Sortierung und
+Keyset-Pagination. Eine Seite kostet damit unabhängig von der Archivgröße nur
+einen Index-Lookup + 25 Zeilen.
+
+Aktuell gehalten wird er auf zwei Wegen:
+- inkrementell: ``install()`` hängt sich an utils.ticket_storage (jeder Schreibvorgang)
+- Absicherung: ``query()`` vergleicht mtime/Größe von tickets.json mit dem zuletzt
+  gesehenen Stand und synchronisiert nur bei Abweichung komplett neu (z.B. wenn
+  die Datei von Hand geändert wurde).
+"""
+
+from __future__ import annotations
+import logging
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from utils import metrics
+
+log = logging.getLogger(__name__)
+
+INDEX_DB = os.path.join("tickets", "index.db")
+PAGE_SIZE = 25
+
+STATUS_GROUPS = ("offen", "geclaimt", "geschlossen")
+
+# sort-Parameter → (Spalten, Richtung)
+SORTS = {
+    "newest": (("created_at", "ticket_id"), "DESC"),
+    "oldest": (("created_at", "ticket_id"), "ASC"),
+    "id_desc": (("ticket_id",), "DESC"),
+    "id_asc": (("ticket_id",), "ASC"),
+}
+
+INDEX_SYNCS = metrics.counter("ticket_index_full_syncs", "Komplette Neusynchronisierungen des Ticket-Index")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tickets (
+    ticket_id INTEGER PRIMARY KEY,
+    user TEXT COLLATE NOCASE,
+    user_id TEXT,
+    channel_id INTEGER,
+    channel_name TEXT,
+    category TEXT,
+    status TEXT,
+    status_group TEXT,
+    claimed_by TEXT,
+    created_at TEXT,
+    closed_at TEXT,
+    guild_id TEXT
+);
+CREATE INDEX IF NOT EXISTS tickets_created ON tickets(created_at, ticket_id);
+CREATE INDEX IF NOT EXISTS tickets_status ON tickets(status_group, created_at, ticket_id);
+CREATE INDEX IF NOT EXISTS tickets_category ON tickets(category, created_at, ticket_id);
+CREATE INDEX IF NOT EXISTS tickets_category_status ON tickets(category, status_group);
+CREATE INDEX IF NOT EXISTS tickets_user ON tickets(user, created_at, ticket_id);
+CREATE INDEX IF NOT EXISTS tickets_user_id ON tickets(user_id);
+CREATE INDEX IF NOT EXISTS tickets_guild ON tickets(guild_id, created_at, ticket_id);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+_local = threading.local()
+_sync_lock = threading.Lock()
+
+
+def _connect() -> sqlite3.Connection:
+    conn = getattr(_local, "conn", None)
+    if conn is None or getattr(_local, "path", None) != INDEX_DB:
+        os.makedirs(os.path.dirname(INDEX_DB) or ".", exist_ok=True)
+        conn = sqlite3.connect(INDEX_DB, timeout=10)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        columns = {r["name"] for r in conn.execute("PRAGMA table_info(tickets)")}
+        if columns and "guild_id" not in columns:
+            # Index von vor der Multi-Guild-Umstellung: ist nur eine Kopie → neu aufbauen
+            with conn:
+                conn.execute("DROP TABLE tickets")
+                conn.execute("DROP TABLE IF EXISTS meta")
+        conn.executescript(_SCHEMA)
+        _local.conn, _local.path = conn, INDEX_DB
+    return conn
+
+
+def status_group(status: Optional[str]) -> str:
+    status = (status or "").lower()
+    if status.startswith("geclaimt"):
+        return "geclaimt"
+    if status == "geschlossen":
+        return "geschlossen"
+    return "offen"
+
+
+def _row(ticket: Dict) -> Optional[tuple]:
+    tid = ticket.get("ticket_id", ticket.get("id"))
+    try:
+        tid = int(tid)
+    except (TypeError, ValueError):
+        return None
+    as_text = lambda v: None if v is None else str(v)  # noqa: E731
+    return (
+        tid, ticket.get("user"), as_text(ticket.get("user_id")), ticket.get("channel_id"),
+        ticket.get("channel_name"), ticket.get("category"), ticket.get("status"),
+        status_group(ticket.get("status")), as_text(ticket.get("claimed_by")),
+        ticket.get("created_at") or ticket.get("created"), ticket.get("closed_at"),
+        as_text(ticket.get("guild_id")),
+    )
+
+
+_UPSERT = "INSERT OR REPLACE INTO tickets VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+
+
+def _set_stamp(conn: sqlite3.Connection, stamp) -> None:
+    conn.execute("INSERT OR REPLACE INTO meta VALUES ('stamp', ?)", (repr(stamp),))
+
+
+# ---------------------------
+# Schreiben
+# ---------------------------
+def upsert(tickets: List[Dict], stamp=None) -> None:
+    """Listener für utils.ticket_storage: geänderte Tickets + neuer Datei-Stand."""
+    conn = _connect()
+    rows = [r for r in (_row(t) for t in tickets) if r]
+    with conn:
+        conn.executemany(_UPSERT, rows)
+        if stamp is not None:
+            _set_stamp(conn, stamp)
+
+
+def full_sync() -> int:
+    """Index komplett aus tickets.json neu aufbauen."""
+    from utils.ticket_storage import load_tickets, _file_stamp
+
+    with _sync_lock:
+        stamp = _file_stamp()
+        tickets = load_tickets()
+        conn = _connect()
+        with conn:
+            conn.execute("DELETE FROM tickets")
+            conn.executemany(_UPSERT, [r for r in (_row(t) for t in tickets) if r])
+            _set_stamp(conn, stamp)
+        INDEX_SYNCS.inc()
+        return len(tickets)
+
+
+def ensure_fresh() -> None:
+    from utils.ticket_storage import _file_stamp
+
+    row = _connect().execute("SELECT value FROM meta WHERE key = 'stamp'").fetchone()
+    if row is None or row["value"] != repr(_file_stamp()):
+        full_sync()
+
+
+def install() -> None:
+    from utils import ticket_storage
+    ticket_storage.add_write_listener(upsert)
+
+
+# ---------------------------
+# Abfragen
+# ---------------------------
+def _filters(status=None, category=None, user=None, date_from=None, date_to=None,
+             guild=None) -> Tuple[List[str], list]:
+    where, params = [], []
+    if guild:
+        # Tickets von vor der Multi-Guild-Umstellung haben keine guild_id
+        where.append("(guild_id = ? OR guild_id IS NULL)")
+        params.append(str(guild))
+    if status in STATUS_GROUPS:
+        where.append("status_group = ?")
+        params.append(status)
+    if category:
+        where.append("category = ?")
+        params.append(category)
+    if user:
+        if user.isdigit():
+            where.append("user_id = ?")
+            params.append(user)
+        else:
+            # Präfix-Suche über den NOCASE-Index
+            where.append("user LIKE ? ESCAPE '\\'")
+            params.append(user.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%")
+    if date_from:
+        where.append("created_at >= ?")
+        params.append(date_from)
+    if date_to:
+        # Datum ohne Uhrzeit → ganzer Tag inklusive
+        where.append("created_at < ?")
+        params.append(date_to + "T99" if len(date_to) == 10 else date_to)
+    return where, params
+
+
+def _cursor(row: sqlite3.Row, columns) -> str:
+    return "|".join(str(row[c]) for c in columns)
+
+
+def query(status: Optional[str] = None, category: Optional[str] = None, user: Optional[str] = None,
+          date_from: Optional[str] = None, date_to: Optional[str] = None, sort: str = "newest",
+          after: Optional[str] = None, before: Optional[str] = None, limit: int = PAGE_SIZE,
+          guild: Optional[str] = None) -> Dict:
+    """
+    Eine Seite Tickets + Zählungen. ``after``/``before`` sind Keyset-Cursor aus dem
+    vorherigen Ergebnis (``next_cursor``/``prev_cursor``), keine Offsets.
+    ``guild`` beschränkt auf eine Guild (im Webpanel der gewählte Server).
+    """
+    ensure_fresh()
+    conn = _connect()
+    columns, direction = SORTS.get(sort, SORTS["newest"])
+    where, params = _filters(status, category, user, date_from, date_to, guild)
+
+    cursor, backwards = (before, True) if before else (after, False)
+    page_where, page_params = list(where), list(params)
+    if cursor:
+        values = cursor.split("|")
+        if len(values) == len(columns):
+            if "ticket_id" in columns:
+                values[-1] = int(values[-1]) if values[-1].lstrip("-").isdigit() else 0
+            forward_op = "<" if direction == "DESC" else ">"
+            op = {"<": ">", ">": "<"}[forward_op] if backwards else forward_op
+            page_where.append(f"({', '.join(columns)}) {op} ({', '.join('?' * len(columns))})")
+            page_params.extend(values)
+
+    order_dir = direction if not backwards else ("ASC" if direction == "DESC" else "DESC")
+    order = ", ".join(f"{c} {order_dir}" for c in columns)
+    sql_where = f"WHERE {' AND '.join(page_where)}" if page_where else ""
+    rows = conn.execute(
+        f"SELECT * FROM tickets {sql_where} ORDER BY {order} LIMIT ?", (*page_params, limit + 1)
+    ).fetchall()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if backwards:
+        rows.reverse()
+
+    # Zählungen: gesamt nach Filtern + je Statusgruppe (ohne Statusfilter)
+    count_where, count_params = _filters(None, category, user, date_from, date_to, guild)
+    sql_count_where = f"WHERE {' AND '.join(count_where)}" if count_where else ""
+    by_status = {g: 0 for g in STATUS_GROUPS}
+    for r in conn.execute(
+        f"SELECT status_group, COUNT(*) AS n FROM tickets {sql_count_where} GROUP BY status_group", count_params
+    ):
+        by_status[r["status_group"]] = r["n"]
+    total = by_status.get(status, 0) if status in STATUS_GROUPS else sum(by_status.values())
+
+    guild_where, guild_params = _filters(guild=guild)
+    categories = [r[0] for r in conn.execute(
+        f"SELECT DISTINCT category FROM tickets WHERE {' AND '.join(guild_where + ['category IS NOT NULL'])} "
+        "ORDER BY category", guild_params
+    )]
+
+    more_forward = has_more if not backwards else bool(cursor)
+    more_backward = has_more if backwards else bool(cursor)
+    return {
+        "tickets": [dict(r) for r in rows],
+        "total": total,
+        "by_status": by_status,
+        "categories": categories,
+        "next_cursor": _cursor(rows[-1], columns) if rows and more_forward else None,
+        "prev_cursor": _cursor(rows[0], columns) if rows and more_backward else None,
+    }
@@ -2,35 +2,47 @@ import os
 import json
 from datetime import datetime
 
+from utils.metrics import track_store
+from utils import event_store, file_lock
+
 LOGS_DIR = "logs"
+# Nur noch gelesen, bis event_store.migrate_legacy() sie aufgeteilt hat
 LOG_FILE = os.path.join(LOGS_DIR, "ticket_events.json")
 
+# Wird nach jedem geschriebenen Event aufgerufen (z.B. Suchindex)
+_event_listeners = []
+
+
+def add_event_listener(func):
+    """Registriert ``func(log_entry)``; läuft im Thread des Schreibers, muss also schnell sein."""
+    _event_listeners.append(func)
 
+
+def load_events() -> list:
+    """Alle Events (Altdatei + Partitionen). Für gezielte Abfragen event_store.query_events nutzen."""
+    try:
+        with open(LOG_FILE, "r", encoding="utf-8") as f:
+            logs = json.load(f)
+        logs = logs if isinstance(logs, list) else []
+    except (FileNotFoundError, json.JSONDecodeError):
+        logs = []
+    return logs + list(event_store.iter_all())
+
+
+@track_store("ticket_log", "append")
 def log_ticket_event(event_type: str, data: dict):
     """Allgemeine Logging-Funktion für alle Ticket-Events"""
-    os.makedirs(LOGS_DIR, exist_ok=True)
-
     log_entry = {
         "time": datetime.utcnow().isoformat(),
         "event_type": event_type,
         "data": data
     }
 
-    if os.path.exists(LOG_FILE):
-        try:
-            with open(LOG_FILE, "r", encoding="utf-8") as f:
-                logs = json.load(f)
-                if not isinstance(logs, list):
-                    logs = []
-        except json.JSONDecodeError:
-            logs = []
-    else:
-        logs = []
-
-    logs.append(log_entry)
+    # Nur eine Zeile an die Tagespartition anhängen (logs/events/), statt die ganze Datei neu zu schreiben
+    event_store.append(log_entry)
 
-    with open(LOG_FILE, "w", encoding="utf-8") as f:
-        json.dump(logs, f, indent=4, ensure_ascii=False)
+    for listener in _event_listeners:
+        listener(log_entry)
 
 
 # ==== Alte Funktionsnamen als Wrapper ====
@@ -44,6 +56,17 @@ def log_ticket_create(channel_name: str, user_id: int, channel_id: int, username
     })
 
 
+def log_ticket_claim(channel_name: str, user_id: int, channel_id: int, username: str = None, ticket_id=None):
+    """Kompatibilitäts-Funktion für 'ticket_claimed'"""
+    log_ticket_event("ticket_claimed", {
+        "ticket_id": ticket_id,
+        "channel_name": channel_name,
+        "user_id": user_id,
+        "username": username,
+        "channel_id": channel_id
+    })
+
+
 def log_ticket_close(channel_name: str, user_id: int, channel_id: int, reason: str = None):
     """Kompatibilitäts-Funktion für 'ticket_closed'"""
     log_ticket_event("ticket_closed", {
@@ -64,6 +87,7 @@ def log_ticket_reopen(channel_name: str, user_id: int, channel_id: int, reason:
     })
 
 
+@track_store("tickets", "update")
 def update_ticket_status(ticket_id: str, new_status: str):
     """
     Aktualisiert den Status eines Tickets in der tickets.json.
@@ -73,17 +97,17 @@ def update_ticket_status(ticket_id: str, new_status: str):
         if not os.path.exists(tickets_file):
             return
 
-        with open(tickets_file, "r", encoding="utf-8") as f:
-            tickets = json.load(f)
+        with file_lock.locked(tickets_file):
+            with open(tickets_file, "r", encoding="utf-8") as f:
+                tickets = json.load(f)
 
-        # Ticket suchen und Status ändern
-        for ticket in tickets:
-            if str(ticket.get("ticket_id")) == str(ticket_id):
-                ticket["status"] = new_status
-                break
+            # Ticket suchen und Status ändern
+            for ticket in tickets:
+                if str(ticket.get("ticket_id")) == str(ticket_id):
+                    ticket["status"] = new_status
+                    break
 
-        with open(tickets_file, "w", encoding="utf-8") as f:
-            json.dump(tickets, f, indent=4, ensure_ascii=False)
+            file_lock.write_json(tickets_file, tickets, indent=4, ensure_ascii=False)
 
         # Log schreiben
         log_ticket_event("ticket_status_updated", {
@@ -0,0 +1,293 @@
+# utils/ticket_search.py
+# -*- coding: utf-8 -*-
+"""
+Volltextsuche über Tickets, Ticket-Events (Schließ-/Wiederöffnungsgründe …)
+und archivierte Transkripte – SQLite FTS5 in tickets/search.db.
+
+Das Indexieren läuft inkrementell: ``install()`` hängt sich an
+utils.ticket_log (jedes geschriebene Event) und utils.transcripts (jede
+archivierte Seite). Für Altbestände gibt es ``python -m utils.ticket_search --rebuild``.
+
+Aufbau:
+- ``docs``     normale Tabelle: stabiler Schlüssel → rowid + Metadaten
+- ``docs_fts`` FTS5-Tabelle (kind, author, body), rowid = docs.id
+Gerankt (bm25) und gefiltert wird nur im FTS-Index; die Metadaten werden erst
+für die ~20 Treffer der aktuellen Seite dazugeholt. Die Gesamtzahl wird bei
+``COUNT_LIMIT`` gekappt, damit sehr häufige Begriffe nicht alles durchzählen.
+"""
+
+from __future__ import annotations
+import argparse
+import html
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils import metrics
+
+log = logging.getLogger(__name__)
+
+SEARCH_DB = os.path.join("tickets", "search.db")
+
+SNIPPET_WORDS = 24
+
+KIND_TICKET = "ticket"
+KIND_EVENT = "event"
+KIND_MESSAGE = "message"
+
+COUNT_LIMIT = 1000
+
+SEARCH_SECONDS = metrics.histogram("ticket_search_seconds", "Dauer einer Volltextsuche")
+INDEX_DOCS = metrics.counter("ticket_search_indexed", "Indexierte Dokumente", ("kind",))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    id INTEGER PRIMARY KEY,
+    key TEXT UNIQUE NOT NULL,
+    kind TEXT NOT NULL,
+    ticket_id TEXT,
+    channel_id INTEGER,
+    created_at TEXT
+);
+CREATE INDEX IF NOT EXISTS docs_ticket ON docs(ticket_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS docs_fts USING fts5(
+    kind, author, body, tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+_local = threading.local()
+
+
+def _connect() -> sqlite3.Connection:
+    """Eine Verbindung pro Thread (Storage-Pool, Web-Threadpool)."""
+    conn = getattr(_local, "conn", None)
+    if conn is None or getattr(_local, "path", None) != SEARCH_DB:
+        os.makedirs(os.path.dirname(SEARCH_DB) or ".", exist_ok=True)
+        conn = sqlite3.connect(SEARCH_DB, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        _local.conn, _local.path = conn, SEARCH_DB
+    return conn
+
+
+# ---------------------------
+# Schreiben
+# ---------------------------
+def _upsert(conn: sqlite3.Connection, key: str, kind: str, ticket_id, channel_id,
+            created_at: Optional[str], author: str, body: str) -> None:
+    row = conn.execute("SELECT id FROM docs WHERE key = ?", (key,)).fetchone()
+    if row:
+        doc_id = row[0]
+        conn.execute("UPDATE docs SET ticket_id = ?, channel_id = ?, created_at = ? WHERE id = ?",
+                     (None if ticket_id is None else str(ticket_id), channel_id, created_at, doc_id))
+        conn.execute("DELETE FROM docs_fts WHERE rowid = ?", (doc_id,))
+    else:
+        doc_id = conn.execute(
+            "INSERT INTO docs (key, kind, ticket_id, channel_id, created_at) VALUES (?, ?, ?, ?, ?)",
+            (key, kind, None if ticket_id is None else str(ticket_id), channel_id, created_at),
+        ).lastrowid
+    conn.execute("INSERT INTO docs_fts (rowid, kind, author, body) VALUES (?, ?, ?, ?)",
+                 (doc_id, kind, author or "", body or ""))
+    INDEX_DOCS.labels(kind=kind).inc()
+
+
+def _ticket_id_for_channel(channel_id) -> Optional[str]:
+    from utils.ticket_storage import get_ticket_by_channel
+    ticket = get_ticket_by_channel(channel_id) if channel_id else None
+    return None if ticket is None else str(ticket.get("ticket_id"))
+
+
+def index_ticket(ticket: Dict, conn: Optional[sqlite3.Connection] = None) -> None:
+    own = conn is None
+    conn = conn or _connect()
+    body = " ".join(str(ticket.get(k) or "") for k in ("channel_name", "category", "user"))
+    _upsert(conn, f"ticket:{ticket.get('ticket_id')}", KIND_TICKET, ticket.get("ticket_id"),
+            ticket.get("channel_id"), ticket.get("created_at"), ticket.get("user") or "", body)
+    if own:
+        conn.commit()
+
+
+def index_event(entry: Dict, conn: Optional[sqlite3.Connection] = None) -> None:
+    """Listener für utils.ticket_log – ein Log-Eintrag {time, event_type, data}."""
+    own = conn is None
+    conn = conn or _connect()
+    data = entry.get("data") or {}
+    event_type = entry.get("event_type", "")
+    channel_id = data.get("channel_id")
+    ticket_id = data.get("ticket_id") or _ticket_id_for_channel(channel_id)
+
+    if event_type == "ticket_created":
+        index_ticket({**data, "ticket_id": ticket_id, "user": data.get("user") or data.get("username"),
+                      "created_at": data.get("created_at") or entry.get("time")}, conn)
+    else:
+        text = " ".join(str(v) for v in (event_type, data.get("reason"), data.get("new_status"),
+                                         data.get("channel_name")) if v)
+        key = f"event:{entry.get('time')}:{event_type}:{channel_id or ticket_id}"
+        _upsert(conn, key, KIND_EVENT, ticket_id, channel_id, entry.get("time"),
+                data.get("username") or "", text)
+    if own:
+        conn.commit()
+
+
+def index_messages(ticket_id, channel_id: int, records: Iterable[Dict],
+                   conn: Optional[sqlite3.Connection] = None) -> None:
+    """Listener für utils.transcripts – eine archivierte Seite."""
+    own = conn is None
+    conn = conn or _connect()
+    for r in records:
+        attachments = " ".join(a.get("filename", "") for a in r.get("attachments") or [])
+        embeds = " ".join(f"{e.get('title') or ''} {e.get('description') or ''}" for e in r.get("embeds") or [])
+        _upsert(conn, f"msg:{r['id']}", KIND_MESSAGE, ticket_id, channel_id, r.get("created_at"),
+                r.get("author") or "", " ".join(p for p in (r.get("content"), embeds, attachments) if p))
+    if own:
+        conn.commit()
+
+
+def _safe(listener):
+    def wrapper(*args, **kwargs):
+        try:
+            listener(*args, **kwargs)
+        except Exception as e:
+            log.error(f"[TicketSearch] Indexieren fehlgeschlagen: {e}")
+    return wrapper
+
+
+def install() -> None:
+    """Hängt den Index an Event-Log und Transkript-Archiv (einmal im Bot-Prozess)."""
+    from utils import ticket_log, transcripts
+    ticket_log.add_event_listener(_safe(index_event))
+    transcripts.add_page_listener(_safe(index_messages))
+
+
+# ---------------------------
+# Suchen
+# ---------------------------
+def _fts_query(text: str, kind: Optional[str] = None) -> str:
+    """
+    Freitext → FTS5-Ausdruck: alle Wörter müssen in Autor/Text vorkommen, das
+    letzte auch als Präfix. Die Art (ticket/event/message) filtert im Index selbst.
+    """
+    words = [w.replace('"', "") for w in text.split()]
+    words = [w for w in words if w]
+    if not words:
+        return ""
+    terms = [f'"{w}"' for w in words]
+    terms[-1] += "*"
+    query = "{author body} : (" + " ".join(terms) + ")"
+    if kind:
+        query = f'kind : "{kind}" AND {query}'
+    return query
+
+
+def _snippet_html(body: str, words: List[str], width: int = SNIPPET_WORDS) -> str:
+    """
+    Textausschnitt um den ersten Treffer, Treffer als <mark>. Bewusst in Python
+    statt FTS5-snippet(): das müsste die Trefferliste pro Zeile neu auswerten.
+    """
+    needles = [w.replace('"', "").casefold() for w in words if w.replace('"', "")]
+    tokens = body.split()
+
+    def hit(token: str) -> bool:
+        t = token.casefold().strip(".,:;!?()[]\"'")
+        return any(t.startswith(n) for n in needles)
+
+    first = next((i for i, tok in enumerate(tokens) if hit(tok)), 0)
+    start = max(0, first - width // 3)
+    window = tokens[start:start + width]
+    parts = [f"<mark>{html.escape(t)}</mark>" if hit(t) else html.escape(t) for t in window]
+    prefix = "… " if start > 0 else ""
+    suffix = " …" if start + width < len(tokens) else ""
+    return prefix + " ".join(parts) + suffix
+
+
+def search(text: str, kind: Optional[str] = None, page: int = 1, per_page: int = 20) -> Tuple[List[Dict], int]:
+    """
+    Gibt (Treffer, Gesamtanzahl) zurück; Treffer nach bm25 sortiert (Autor zählt
+    weniger als Text). Die Anzahl ist höchstens COUNT_LIMIT + 1 (= "mehr als …").
+    """
+    query = _fts_query(text, kind)
+    if not query:
+        return [], 0
+    conn = _connect()
+
+    start = time.perf_counter()
+    try:
+        total = conn.execute(
+            "SELECT COUNT(*) FROM (SELECT 1 FROM docs_fts WHERE docs_fts MATCH ? LIMIT ?)",
+            (query, COUNT_LIMIT + 1),
+        ).fetchone()[0]
+        # 1) nur ranken (rowid + Score) – 2) Text/Metadaten nur für die aktuelle Seite
+        ranked = conn.execute(
+            "SELECT rowid, bm25(docs_fts, 0.0, 0.5, 1.0) AS score FROM docs_fts "
+            "WHERE docs_fts MATCH ? ORDER BY score LIMIT ? OFFSET ?",
+            (query, per_page, (max(page, 1) - 1) * per_page),
+        ).fetchall()
+        scores = dict(ranked)
+        marks = ",".join("?" * len(scores))
+        rows = conn.execute(
+            f"""
+            SELECT d.id, d.kind, d.ticket_id, d.channel_id, d.created_at, f.author, f.body
+            FROM docs d JOIN docs_fts f ON f.rowid = d.id
+            WHERE d.id IN ({marks})
+            """,
+            tuple(scores),
+        ).fetchall() if scores else []
+    except sqlite3.OperationalError as e:
+        log.warning(f"[TicketSearch] Ungültige Suche {text!r}: {e}")
+        return [], 0
+    finally:
+        SEARCH_SECONDS.observe(time.perf_counter() - start)
+
+    words = text.split()
+    results = sorted(
+        ({"kind": k, "ticket_id": tid, "channel_id": cid, "created_at": created,
+          "author": author, "snippet": _snippet_html(body, words), "score": scores[doc_id]}
+         for doc_id, k, tid, cid, created, author, body in rows),
+        key=lambda hit: hit["score"],
+    )
+    return results, total
+
+
+# ---------------------------
+# Neuaufbau aus den Dateien
+# ---------------------------
+def rebuild() -> int:
+    """Index komplett neu aus tickets.json, ticket_events.json und transcripts/ aufbauen."""
+    from utils.ticket_storage import load_tickets
+    from utils import ticket_log, transcripts
+
+    conn = _connect()
+    conn.execute("DELETE FROM docs")
+    conn.execute("DELETE FROM docs_fts")
+    count = 0
+    for ticket in load_tickets():
+        index_ticket(ticket, conn)
+        count += 1
+    for entry in ticket_log.load_events():
+        index_event(entry, conn)
+        count += 1
+    for ticket_id, channel_id in transcripts.archived_tickets():
+        records = transcripts.read_transcript(ticket_id)
+        index_messages(ticket_id, channel_id, records, conn)
+        count += len(records)
+    conn.execute("INSERT INTO docs_fts(docs_fts) VALUES ('optimize')")
+    conn.commit()
+    return count
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Ticket-Volltextindex")
+    parser.add_argument("--rebuild", action="store_true", help="Index aus allen Dateien neu aufbauen")
+    parser.add_argument("query", nargs="*", help="Suchbegriffe")
+    args = parser.parse_args()
+    if args.rebuild:
+        print(f"✅ {rebuild()} Dokumente indexiert")
+    if args.query:
+        hits, total = search(" ".join(args.query))
+        print(f"{total} Treffer")
+        for hit in hits:
+            print(f"  #{hit['ticket_id']} [{hit['kind']}] {hit['snippet']}")
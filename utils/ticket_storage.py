@@ -3,8 +3,31 @@ import os
 from datetime import datetime
 from typing import List, Dict, Optional
 
+from utils import file_lock
+from utils.metrics import track_store
+
 TICKETS_FILE = "tickets/tickets.json"
 
+# Werden nach jedem Schreibvorgang aufgerufen: func(geänderte_tickets, datei_stand)
+_write_listeners = []
+
+def add_write_listener(func):
+    _write_listeners.append(func)
+
+def _notify(changed: List[Dict]) -> None:
+    if _write_listeners:
+        stamp = _file_stamp()
+        for listener in _write_listeners:
+            try:
+                listener(changed, stamp)
+            except Exception as e:
+                print(f"[ticket_storage] Listener fehlgeschlagen: {e}")
+
+# In-Memory-Index (channel_id → Ticket, ticket_id → Ticket, guild_id → Tickets).
+# Wird nur neu aufgebaut, wenn sich tickets.json geändert hat (mtime/size).
+_index: Dict = {"stamp": None, "by_channel": {}, "by_id": {}, "by_guild": {}}
+
+@track_store("tickets", "load")
 def load_tickets() -> List[Dict]:
     if not os.path.exists(TICKETS_FILE):
         return []
@@ -14,26 +37,79 @@ def load_tickets() -> List[Dict]:
         except json.JSONDecodeError:
             return []
 
+def _write_tickets(tickets: List[Dict]) -> None:
+    file_lock.write_json(TICKETS_FILE, tickets, indent=4)
+
+@track_store("tickets", "save")
 def save_ticket(ticket: Dict):
-    tickets = load_tickets()
-    tickets.append(ticket)
-    with open(TICKETS_FILE, "w", encoding="utf-8") as f:
-        json.dump(tickets, f, indent=4)
+    with file_lock.locked(TICKETS_FILE):
+        tickets = load_tickets()
+        tickets.append(ticket)
+        _write_tickets(tickets)
+    _notify([ticket])
+
+@track_store("tickets", "update")
+def update_ticket(channel_id: int, fields: Dict) -> Optional[Dict]:
+    """Setzt beliebige Felder eines Tickets (per Channel-ID) und gibt das Ticket zurück."""
+    with file_lock.locked(TICKETS_FILE):
+        tickets = load_tickets()
+        for ticket in tickets:
+            if int(ticket.get("channel_id", 0)) == int(channel_id):
+                ticket.update(fields)
+                _write_tickets(tickets)
+                break
+        else:
+            return None
+    _notify([ticket])
+    return ticket
 
 def update_ticket_status(channel_id: int, new_status: str):
-    tickets = load_tickets()
-    updated = False
-    for ticket in tickets:
-        if ticket["channel_id"] == channel_id:
-            ticket["status"] = new_status
-            updated = True
-            break
-    if updated:
-        with open(TICKETS_FILE, "w", encoding="utf-8") as f:
-            json.dump(tickets, f, indent=4)
+    update_ticket(channel_id, {"status": new_status})
 
 def get_tickets() -> List[Dict]:
     return load_tickets()
 
 def set_ticket_status_by_channel(channel_id: int, status: str):
     update_ticket_status(channel_id, status)
+
+
+# ---------------------------
+# Index-Lookups (O(1) nach dem ersten Laden)
+# ---------------------------
+def _file_stamp():
+    try:
+        st = os.stat(TICKETS_FILE)
+    except FileNotFoundError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+def _ensure_index() -> Dict:
+    stamp = _file_stamp()
+    if stamp != _index["stamp"]:
+        tickets = load_tickets()
+        by_channel, by_id, by_guild = {}, {}, {}
+        for t in tickets:
+            if t.get("channel_id") is not None:
+                by_channel[int(t["channel_id"])] = t
+            tid = t.get("ticket_id", t.get("id"))
+            if tid is not None:
+                by_id[str(tid)] = t
+            # Tickets von vor der Multi-Guild-Umstellung haben keine guild_id → None
+            gid = t.get("guild_id")
+            by_guild.setdefault(int(gid) if gid is not None else None, []).append(t)
+        _index.update(stamp=stamp, by_channel=by_channel, by_id=by_id, by_guild=by_guild)
+    return _index
+
+def get_ticket_by_channel(channel_id: int) -> Optional[Dict]:
+    return _ensure_index()["by_channel"].get(int(channel_id))
+
+def get_ticket(ticket_id) -> Optional[Dict]:
+    return _ensure_index()["by_id"].get(str(ticket_id))
+
+def get_guild_tickets(guild_id: Optional[int], include_legacy: bool = True) -> List[Dict]:
+    """Tickets einer Guild; ``include_legacy`` = plus Tickets ohne guild_id (Altbestand)."""
+    by_guild = _ensure_index()["by_guild"]
+    tickets = list(by_guild.get(int(guild_id) if guild_id is not None else None, []))
+    if include_legacy and guild_id is not None:
+        tickets += by_guild.get(None, [])
+    return tickets
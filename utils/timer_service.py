@@ -0,0 +1,108 @@
+# utils/timer_service.py
+# -*- coding: utf-8 -*-
+"""
+Deadline-Scheduler auf Basis eines Min-Heaps.
+
+Statt alle Tickets periodisch zu scannen, liegen alle Deadlines in einem Heap.
+Ein einziger Task schläft exakt bis zur nächsten fälligen Deadline (oder bis
+eine frühere eingeplant wird). Leerlaufkosten sind damit unabhängig von der
+Anzahl offener Tickets.
+
+Umplanen/Abbrechen geschieht per "lazy deletion": Der aktuelle Eintrag pro
+Schlüssel steht in ``_entries``; veraltete Heap-Einträge werden beim Abarbeiten
+einfach übersprungen. ``schedule`` und ``cancel`` sind damit O(log n) bzw. O(1).
+Häufen sich veraltete Einträge (häufiges Umplanen), wird der Heap aus
+``_entries`` neu aufgebaut – seine Größe bleibt so proportional zu den Timern.
+"""
+
+from __future__ import annotations
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Tuple
+
+log = logging.getLogger(__name__)
+
+Handler = Callable[[Hashable], Awaitable[None]]
+
+COMPACT_MIN = 64  # darunter lohnt kein Neuaufbau
+
+
+class TimerService:
+    def __init__(self, handler: Handler, clock: Callable[[], float] = time.time):
+        self._handler = handler
+        self._clock = clock
+        self._heap: List[Tuple[float, int, Hashable]] = []
+        self._entries: Dict[Hashable, Tuple[float, int]] = {}
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run(), name="timer-service")
+
+    def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+
+    def schedule(self, key: Hashable, deadline: float) -> None:
+        """Plant (oder verschiebt) den Timer ``key`` auf den Unix-Zeitpunkt ``deadline``."""
+        seq = next(self._seq)
+        self._entries[key] = (deadline, seq)
+        heapq.heappush(self._heap, (deadline, seq, key))
+        if self._heap[0][1] == seq:
+            # Neue früheste Deadline → schlafenden Task wecken
+            self._wakeup.set()
+        self._compact()
+
+    def cancel(self, key: Hashable) -> None:
+        self._entries.pop(key, None)
+        self._compact()
+
+    def _compact(self) -> None:
+        """Veraltete Einträge entfernen, sobald sie mehr als die Hälfte des Heaps ausmachen."""
+        if len(self._heap) <= max(COMPACT_MIN, 2 * len(self._entries)):
+            return
+        self._heap = [(deadline, seq, key) for key, (deadline, seq) in self._entries.items()]
+        heapq.heapify(self._heap)
+        self._wakeup.set()
+
+    def deadline(self, key: Hashable) -> Optional[float]:
+        entry = self._entries.get(key)
+        return entry[0] if entry else None
+
+    def _discard_stale(self) -> None:
+        while self._heap:
+            deadline, seq, key = self._heap[0]
+            if self._entries.get(key) == (deadline, seq):
+                return
+            heapq.heappop(self._heap)
+
+    async def _run(self) -> None:
+        while True:
+            self._discard_stale()
+            self._wakeup.clear()
+            if not self._heap:
+                await self._wakeup.wait()
+                continue
+
+            delay = self._heap[0][0] - self._clock()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            _, _, key = heapq.heappop(self._heap)
+            self._entries.pop(key, None)
+            try:
+                await self._handler(key)
+            except Exception as e:
+                log.error(f"[TimerService] Handler für {key!r} fehlgeschlagen: {e}")
@@ -0,0 +1,224 @@
+# utils/transcripts.py
+# -*- coding: utf-8 -*-
+"""
+Ticket-Transkripte als komprimierte, nur anhängende Archivdateien.
+
+Pro Ticket gibt es:
+- ``transcripts/<ticket_id>.jsonl.gz`` – eine JSON-Zeile pro Nachricht. Jede
+  Seite (max. 100 Nachrichten) wird als eigenes gzip-Member angehängt; mehrere
+  Member hintereinander sind ein gültiges gzip, ältere Seiten werden nie neu
+  geschrieben.
+- ``transcripts/<ticket_id>.state.json`` – Checkpoint (letzte Nachricht-ID,
+  Anzahl, fertig ja/nein). Ein abgebrochener Export setzt dort wieder an.
+
+Der Checkpoint merkt sich auch die Dateigröße nach der letzten vollständigen
+Seite. Stirbt der Prozess mitten in einer Seite (oder vor dem Checkpoint), wird
+das Archiv vor dem nächsten Anhängen auf diese Größe gekürzt – es bleibt also
+immer ein gültiges gzip ohne doppelte Nachrichten.
+"""
+
+from __future__ import annotations
+import asyncio
+import gzip
+import json
+import logging
+import os
+import zlib
+from datetime import datetime
+from typing import Dict, Iterator, List
+
+from utils import metrics
+
+log = logging.getLogger(__name__)
+
+TRANSCRIPT_DIR = "transcripts"
+PAGE_SIZE = 100
+PAGE_PAUSE = 0.5  # Sekunden zwischen zwei History-Seiten (schont das Rate-Limit)
+
+# Wird nach jeder archivierten Seite aufgerufen: func(ticket_id, channel_id, records)
+_page_listeners = []
+
+TRANSCRIPT_PAGES = metrics.counter("ticket_transcript_pages", "Archivierte History-Seiten")
+TRANSCRIPT_MESSAGES = metrics.counter("ticket_transcript_messages", "Archivierte Nachrichten")
+TRANSCRIPT_SECONDS = metrics.histogram("ticket_transcript_seconds", "Dauer eines Transkript-Exports")
+
+
+def add_page_listener(func) -> None:
+    _page_listeners.append(func)
+
+
+def archive_path(ticket_id) -> str:
+    return os.path.join(TRANSCRIPT_DIR, f"{ticket_id}.jsonl.gz")
+
+
+def _state_path(ticket_id) -> str:
+    return os.path.join(TRANSCRIPT_DIR, f"{ticket_id}.state.json")
+
+
+# ---------------------------
+# Checkpoint
+# ---------------------------
+def load_state(ticket_id) -> Dict:
+    try:
+        with open(_state_path(ticket_id), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _save_state(ticket_id, state: Dict) -> None:
+    os.makedirs(TRANSCRIPT_DIR, exist_ok=True)
+    tmp = _state_path(ticket_id) + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, _state_path(ticket_id))
+
+
+def archived_tickets() -> List[tuple]:
+    """(ticket_id, channel_id) aller Tickets mit Archiv."""
+    if not os.path.isdir(TRANSCRIPT_DIR):
+        return []
+    result = []
+    for name in os.listdir(TRANSCRIPT_DIR):
+        if name.endswith(".state.json"):
+            state = load_state(name[: -len(".state.json")])
+            if state.get("count"):
+                result.append((state.get("ticket_id"), state.get("channel_id")))
+    return result
+
+
+def pending_archives() -> List[Dict]:
+    """Angefangene, nicht abgeschlossene Exporte (zum Fortsetzen nach einem Neustart)."""
+    if not os.path.isdir(TRANSCRIPT_DIR):
+        return []
+    result = []
+    for name in os.listdir(TRANSCRIPT_DIR):
+        if name.endswith(".state.json"):
+            state = load_state(name[: -len(".state.json")])
+            if state and not state.get("complete"):
+                result.append(state)
+    return result
+
+
+# ---------------------------
+# Schreiben (synchron – nur über async_storage.run_io aufrufen)
+# ---------------------------
+def begin_archive(ticket_id, channel_id: int) -> Dict:
+    """
+    Checkpoint vor der ersten Seite als "nicht fertig" markieren – sonst findet
+    ``pending_archives`` einen Export, der vor der ersten Seite abbricht, nie wieder.
+    """
+    state = load_state(ticket_id) or {"ticket_id": ticket_id, "channel_id": channel_id, "count": 0}
+    state["complete"] = False
+    state["updated_at"] = datetime.utcnow().isoformat()
+    _save_state(ticket_id, state)
+    return state
+
+
+def append_page(ticket_id, channel_id: int, records: List[Dict], complete: bool = False) -> Dict:
+    """Hängt eine Seite als gzip-Member an und schreibt danach den Checkpoint."""
+    state = load_state(ticket_id) or {"ticket_id": ticket_id, "channel_id": channel_id, "count": 0}
+    if records:
+        os.makedirs(TRANSCRIPT_DIR, exist_ok=True)
+        path = archive_path(ticket_id)
+        if os.path.exists(path) and os.path.getsize(path) > state.get("bytes", 0):
+            # Reste eines abgebrochenen Schreibvorgangs verwerfen
+            with open(path, "r+b") as f:
+                f.truncate(state.get("bytes", 0))
+        with gzip.open(path, "at", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        state["bytes"] = os.path.getsize(path)
+        state["last_message_id"] = records[-1]["id"]
+        state["count"] = state.get("count", 0) + len(records)
+    state["complete"] = complete
+    state["updated_at"] = datetime.utcnow().isoformat()
+    _save_state(ticket_id, state)
+    if records:
+        for listener in _page_listeners:
+            listener(ticket_id, channel_id, records)
+    return state
+
+
+def message_record(message) -> Dict:
+    """discord.Message → JSON-Zeile (inkl. Anhang-Metadaten, ohne Dateiinhalt)."""
+    return {
+        "id": message.id,
+        "author_id": message.author.id,
+        "author": str(message.author),
+        "bot": message.author.bot,
+        "created_at": message.created_at.isoformat(),
+        "edited_at": message.edited_at.isoformat() if message.edited_at else None,
+        "content": message.content,
+        "attachments": [
+            {
+                "id": a.id,
+                "filename": a.filename,
+                "size": a.size,
+                "content_type": a.content_type,
+                "url": a.url,
+            }
+            for a in message.attachments
+        ],
+        "embeds": [{"title": e.title, "description": e.description} for e in message.embeds],
+    }
+
+
+# ---------------------------
+# Export (Bot)
+# ---------------------------
+async def archive_channel(channel, ticket_id, page_size: int = PAGE_SIZE, pause: float = PAGE_PAUSE) -> Dict:
+    """
+    Streamt die Kanal-History seitenweise (älteste zuerst) ins Archiv. Setzt nach
+    einem Abbruch hinter der letzten gesicherten Nachricht fort. Zwischen den
+    Seiten wird kurz pausiert; 429-Antworten behandelt discord.py selbst.
+    """
+    # Nur der Bot braucht discord/async_storage – das Web liest bloß die Dateien
+    import discord
+    from utils import async_storage
+
+    key = f"transcript:{ticket_id}"
+    state = await async_storage.run_io(key, begin_archive, ticket_id, channel.id)
+    # Auch nach "complete" (Ticket wieder geöffnet) nur Neues anhängen
+    after = discord.Object(id=state["last_message_id"]) if state.get("last_message_id") else None
+    with metrics.timed(TRANSCRIPT_SECONDS):
+        while True:
+            page = [message_record(m) async for m in
+                    channel.history(limit=page_size, after=after, oldest_first=True)]
+            done = len(page) < page_size
+            state = await async_storage.run_io(key, append_page, ticket_id, channel.id, page, done)
+            TRANSCRIPT_PAGES.inc()
+            TRANSCRIPT_MESSAGES.inc(len(page))
+            if done:
+                return state
+            after = discord.Object(id=page[-1]["id"])
+            await asyncio.sleep(pause)
+
+
+# ---------------------------
+# Lesen (Web)
+# ---------------------------
+def iter_transcript(ticket_id) -> Iterator[Dict]:
+    """Liest das Archiv streamend (Duplikate werden sicherheitshalber übersprungen)."""
+    path = archive_path(ticket_id)
+    if not os.path.exists(path):
+        return
+    seen = set()
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if record["id"] in seen:
+                    continue
+                seen.add(record["id"])
+                yield record
+    except (EOFError, zlib.error, gzip.BadGzipFile):
+        # Abgeschnittenes letztes Member (Export läuft gerade/abgebrochen) – Rest ist gültig
+        log.warning(f"[Transcripts] Archiv {path} endet unvollständig")
+
+
+def read_transcript(ticket_id) -> List[Dict]:
+    return list(iter_transcript(ticket_id))